@@ -0,0 +1,77 @@
+"""Compare cold and warm LibreOffice .doc -> .docx conversion latency.
+
+"cold" starts a new LibreOffice process per file, as convert_doc_to_docx does
+without a converter; "warm" forwards each file to one LibreOfficeConverter
+instance, over UNO when the uno module can be imported (run it with
+LibreOffice's own Python, or a Python with python3-uno, to measure that path)
+and by a soffice client otherwise. Needs LibreOffice installed.
+
+    python benchmarks/bench_doc_conversion.py --runs 5
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+import docx
+
+from synthetic import GREEK_WEEKDAYS, employee_names
+from shift_calendar import LibreOfficeConverter, ShiftCalendarCore, find_libreoffice
+from shift_calendar.converter import uno_available
+
+
+def make_doc(directory):
+    """Write a one-month schedule table as .docx and convert it to a Word 97-2003 .doc"""
+    names = employee_names(40)
+    document = docx.Document()
+    table = document.add_table(rows=0, cols=4)
+    for day in range(1, 32):
+        cells = table.add_row().cells
+        cells[0].text = f"{day:02d}"
+        cells[2].text = GREEK_WEEKDAYS[day % 7]
+        cells[3].text = f"{names[day % 40]}\n{names[(day * 7) % 40]}*"
+    docx_path = os.path.join(directory, "schedule.docx")
+    document.save(docx_path)
+
+    subprocess.run([find_libreoffice(), "--headless", "--convert-to", "doc", "--outdir", directory, docx_path],
+                   capture_output=True, timeout=120)
+    doc_path = os.path.join(directory, "schedule.doc")
+    if not os.path.exists(doc_path):
+        raise SystemExit("Could not create the .doc sample with LibreOffice")
+    return doc_path
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    if not shutil.which(find_libreoffice() or ""):
+        raise SystemExit("LibreOffice not found")
+
+    with tempfile.TemporaryDirectory() as directory:
+        doc_path = make_doc(directory)
+        core = ShiftCalendarCore(log=lambda message, sensitive=False, level=None: None)
+
+        cold = [timed(lambda: core.convert_doc_to_docx(doc_path)) for _ in range(args.runs)]
+
+        with LibreOfficeConverter(instances=1) as converter:
+            output_path = os.path.join(directory, "warm.docx")
+            warm = [timed(lambda: converter.convert(doc_path, output_path)) for _ in range(args.runs + 1)]
+
+    print(f"cold (new process per file): median {statistics.median(cold):.2f} s over {args.runs} runs")
+    route = "UNO socket" if uno_available() else "soffice client"
+    print(f"warm first file (includes start-up, {route}): {warm[0]:.2f} s")
+    print(f"warm later files: median {statistics.median(warm[1:]):.2f} s over {args.runs} runs")
+
+
+if __name__ == "__main__":
+    main()
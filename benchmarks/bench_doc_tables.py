@@ -0,0 +1,96 @@
+"""Compare reading .doc tables directly with converting the file through LibreOffice.
+
+The generated schedules (or the .doc files given with --doc) are saved as
+Word 97-2003 .doc files by LibreOffice. Each is then read three ways: by the
+built-in .doc reader, by a new LibreOffice process per file followed by the
+.docx reader (as without a warm instance), and by the warm LibreOffice
+instance followed by the .docx reader. The built-in reader must return the
+same cells as the .docx conversion. Needs LibreOffice.
+
+    python benchmarks/bench_doc_tables.py --employees 30,300 --runs 5
+    python benchmarks/bench_doc_tables.py --doc "ΕΦΗΜΕΡΙΕΣ ΜΑΡΤΙΟΣ 2025.doc"
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+from schedule_docs import write_schedule_set
+from shift_calendar import (LibreOfficeConverter, ShiftCalendarCore, find_libreoffice, read_doc_tables,
+                            read_tables_fast)
+
+
+def save_as_doc(docx_path, directory):
+    """Convert a .docx to a Word 97-2003 .doc with LibreOffice"""
+    subprocess.run([find_libreoffice(), "--headless", "--convert-to", "doc", "--outdir", directory, docx_path],
+                   capture_output=True, timeout=120)
+    doc_path = os.path.join(directory, os.path.splitext(os.path.basename(docx_path))[0] + ".doc")
+    if not os.path.exists(doc_path):
+        raise SystemExit(f"Could not save {docx_path} as .doc with LibreOffice")
+    return doc_path
+
+
+def timed(function, runs):
+    """Median seconds of runs calls, and the last result"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def benchmark_file(doc_path, core, converter, directory, runs):
+    direct, direct_tables = timed(lambda: read_doc_tables(doc_path), runs)
+
+    def cold():
+        return read_tables_fast(core.convert_doc_to_docx(doc_path))
+
+    def warm():
+        output_path = os.path.join(directory, "warm.docx")
+        converter.convert(doc_path, output_path)
+        return read_tables_fast(output_path)
+
+    cold_seconds, converted_tables = timed(cold, runs)
+    warm()  # start the instance outside the timing
+    warm_seconds, _ = timed(warm, runs)
+    rows = sum(len(table) for table in converted_tables)
+    same = direct_tables == converted_tables
+    print(f"{os.path.basename(doc_path)}: {os.path.getsize(doc_path) / 1024:.0f} KiB, {rows} rows, "
+          f"{'same cells' if same else 'DIFFERENT CELLS'}")
+    print(f"  built-in reader:           {direct * 1000:8.1f} ms")
+    print(f"  LibreOffice per file+docx: {cold_seconds * 1000:8.1f} ms ({cold_seconds / direct:.0f}x)")
+    print(f"  warm LibreOffice+docx:     {warm_seconds * 1000:8.1f} ms ({warm_seconds / direct:.0f}x)")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", default="30,300", help="comma-separated numbers of employees to run with")
+    parser.add_argument("--doc", action="append", metavar="FILE", help="read this .doc file instead (can be repeated)")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    if not shutil.which(find_libreoffice() or ""):
+        raise SystemExit("LibreOffice not found")
+
+    core = ShiftCalendarCore(log=lambda message, sensitive=False, level=None: None)
+    same = True
+    with tempfile.TemporaryDirectory() as directory, LibreOfficeConverter() as converter:
+        doc_paths = args.doc or []
+        if not doc_paths:
+            for employees in (int(value) for value in args.employees.split(",")):
+                schedules_dir = os.path.join(directory, str(employees))
+                os.makedirs(schedules_dir)
+                schedules = write_schedule_set(schedules_dir, employees)
+                doc_paths += [save_as_doc(path, schedules_dir) for path in (schedules.main, schedules.cath_lab)]
+        for doc_path in doc_paths:
+            same &= benchmark_file(doc_path, core, converter, directory, args.runs)
+    if not same:
+        raise SystemExit("The built-in reader and the conversion returned different cells")
+
+
+if __name__ == "__main__":
+    main()
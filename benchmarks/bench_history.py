@@ -0,0 +1,92 @@
+"""Compare reading a year of schedules from the documents and from the history database.
+
+Writes twelve generated monthly schedules (main, Cath Lab and EP), processes
+them together into a new history database, then times loading the same year
+back from the database against reading the documents again, and two typical
+questions: one employee's on-call shifts in the year and who covered the ΤΕΠ
+shifts on weekends in the second quarter. The loaded shifts must match the
+ones read from the documents.
+
+    python benchmarks/bench_history.py --employees 30,300 --runs 3
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date
+
+from schedule_docs import write_schedule_set
+from synthetic import MAIN_SHIFT_TYPES
+from shift_calendar import ShiftCalendarCore, find_batch_jobs
+from shift_calendar.history import ShiftHistory
+
+YEAR = 2025
+
+
+def timed(function, runs):
+    """Median seconds of runs calls, and the last result"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def benchmark(employees, directory, runs):
+    for month in range(1, 13):
+        write_schedule_set(directory, employees, start=date(YEAR, month, 1), seed=month)
+    jobs = find_batch_jobs(directory, lambda message, level=None: None)
+    history = ShiftHistory(os.path.join(directory, "history.sqlite3"))
+    quiet = lambda message, sensitive=False, level=None: None
+
+    start = time.perf_counter()
+    ShiftCalendarCore(log=quiet, history=history).process_schedules(jobs)
+    first_run = time.perf_counter() - start
+
+    def from_documents():
+        core = ShiftCalendarCore(log=quiet)
+        core.process_schedules(jobs)
+        return core.all_shifts, core.cath_lab_shifts, core.ep_shifts
+
+    def from_history():
+        core = ShiftCalendarCore(log=quiet, history=history)
+        core.process_history(date(YEAR, 1, 1), date(YEAR + 1, 1, 31))
+        return core.all_shifts, core.cath_lab_shifts, core.ep_shifts
+
+    documents_seconds, read = timed(from_documents, runs)
+    history_seconds, loaded = timed(from_history, runs)
+    employee = read[0][0].employee
+    employee_seconds, on_call = timed(lambda: history.shifts(date(YEAR, 1, 1), date(YEAR, 12, 31), employee,
+                                                             shift_type=MAIN_SHIFT_TYPES[1]), runs)
+    weekend_seconds, weekends = timed(lambda: history.shifts(date(YEAR, 4, 1), date(YEAR, 6, 30),
+                                                             shift_type=MAIN_SHIFT_TYPES[4], weekdays=(5, 6)), runs)
+    same = read == loaded
+    print(f"{employees} employees: {sum(len(shifts) for shifts in read):,} shifts in 12 months, "
+          f"{'same shifts' if same else 'DIFFERENT SHIFTS'}, database {os.path.getsize(history.path) / 1024:.0f} KiB")
+    print(f"  read and store in the history: {first_run * 1000:9.1f} ms")
+    print(f"  read the documents again:      {documents_seconds * 1000:9.1f} ms")
+    print(f"  load the year from history:    {history_seconds * 1000:9.1f} ms "
+          f"({documents_seconds / history_seconds:.0f}x faster)")
+    print(f"  one employee's on-call shifts: {employee_seconds * 1000:9.1f} ms ({len(on_call)} shifts)")
+    print(f"  ΤΕΠ on weekends in Q2:         {weekend_seconds * 1000:9.1f} ms ({len(weekends)} shifts)")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", default="30,300", help="comma-separated numbers of employees to run with")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    same = True
+    for employees in (int(value) for value in args.employees.split(",")):
+        with tempfile.TemporaryDirectory() as directory:
+            same &= benchmark(employees, directory, args.runs)
+    if not same:
+        raise SystemExit("The history returned different shifts from the documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare the icalendar writer with the streaming ICS writer.
+
+Writes one calendar per employee of a synthetic roster with each writer,
+checks that both produce the same content lines (apart from DTSTAMP) and
+reports the time taken.
+
+    python benchmarks/bench_ics_writer.py --employees 300 --days 365
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+
+from synthetic import synthetic_roster
+from shift_calendar import RosterIndex, calendar_file_name, write_employee_calendar
+
+DTSTAMP_LINE = re.compile(rb"DTSTAMP:[^\r]*\r\n")
+
+
+def write_all(roster, employees, output_dir, fast_writer):
+    start = time.perf_counter()
+    for employee in employees:
+        output_file = os.path.join(output_dir, calendar_file_name(employee))
+        write_employee_calendar(roster, employee, output_file, fast_writer)
+    return time.perf_counter() - start
+
+
+def read_without_dtstamp(output_dir):
+    contents = {}
+    for name in os.listdir(output_dir):
+        with open(os.path.join(output_dir, name), 'rb') as f:
+            contents[name] = DTSTAMP_LINE.sub(b"", f.read())
+    return contents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=300)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    shifts, cath_lab_shifts, ep_shifts = synthetic_roster(args.employees, args.days)
+    roster = RosterIndex(shifts, cath_lab_shifts, ep_shifts)
+    employees = sorted({s.employee for s in shifts})
+    print(f"{len(shifts)} shifts, {len(employees)} employees, {args.days} days")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as icalendar_dir, tempfile.TemporaryDirectory() as stream_dir:
+        for label, output_dir, fast_writer in (("icalendar", icalendar_dir, False), ("stream", stream_dir, True)):
+            results[label] = min(write_all(roster, employees, output_dir, fast_writer)
+                                 for _ in range(args.repeat))
+
+        if read_without_dtstamp(icalendar_dir) != read_without_dtstamp(stream_dir):
+            raise SystemExit("Writers produced different calendars")
+
+    for label, seconds in results.items():
+        print(f"{label:>10}: {seconds:8.3f} s  ({seconds / len(employees) * 1000:.2f} ms per calendar)")
+    print(f"{'speed-up':>10}: {results['icalendar'] / results['stream']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compare the per-row month name scan with the shared compiled month matcher.
+
+The table parsers used to check every row's month cell against a 24-entry
+dict of month names, one substring test at a time. This times that scan and
+find_month on a large synthetic month column, with find_month's cache (the
+parsers' case: the column repeats a few values) and without it (every cell
+different), and lists the cells where they disagree: accented, lower-case
+and abbreviated names the old scan missed, and cells naming two months,
+where it picked by dict order.
+
+    python benchmarks/bench_month_matcher.py --rows 200000
+"""
+import argparse
+import random
+import time
+
+from synthetic import GREEK_WEEKDAYS
+from shift_calendar import find_month
+
+LEGACY_MONTHS = {
+    "ΙΑΝΟΥΑΡΙΟΥ": 1, "ΦΕΒΡΟΥΑΡΙΟΥ": 2, "ΜΑΡΤΙΟΥ": 3, "ΑΠΡΙΛΙΟΥ": 4,
+    "ΜΑΙΟΥ": 5, "ΙΟΥΝΙΟΥ": 6, "ΙΟΥΛΙΟΥ": 7, "ΑΥΓΟΥΣΤΟΥ": 8,
+    "ΣΕΠΤΕΜΒΡΙΟΥ": 9, "ΟΚΤΩΒΡΙΟΥ": 10, "ΝΟΕΜΒΡΙΟΥ": 11, "ΔΕΚΕΜΒΡΙΟΥ": 12,
+    "ΙΑΝΟΥΑΡΙΟΣ": 1, "ΦΕΒΡΟΥΑΡΙΟΣ": 2, "ΜΑΡΤΙΟΣ": 3, "ΑΠΡΙΛΙΟΣ": 4,
+    "ΜΑΙΟΣ": 5, "ΙΟΥΝΙΟΣ": 6, "ΙΟΥΛΙΟΣ": 7, "ΑΥΓΟΥΣΤΟΣ": 8,
+    "ΣΕΠΤΕΜΒΡΙΟΣ": 9, "ΟΚΤΩΒΡΙΟΣ": 10, "ΝΟΕΜΒΡΙΟΣ": 11, "ΔΕΚΕΜΒΡΙΟΣ": 12
+}
+
+# Month cells as they appear in the schedules: mostly empty or a weekday,
+# sometimes a month name in one of its spellings
+MONTH_CELLS = [
+    "ΜΑΡΤΙΟΥ", "ΑΠΡΙΛΙΟΣ", "Μαρτίου", "Απρίλιος", "μαΐου", "ΜΑΪΟΥ", "Σεπτ.", "ΔΕΚ", "Ιούνιος 2025",
+    "31 ΜΑΡΤΙΟΥ - 1 ΑΠΡΙΛΙΟΥ", "ΝΟΕΜΒΡΙΟΥ/ΟΚΤΩΒΡΙΟΥ",
+]
+
+
+def legacy_find_month(month_text):
+    for greek_month, month_num in LEGACY_MONTHS.items():
+        if greek_month in month_text:
+            return month_num
+    return None
+
+
+def synthetic_month_column(rows, seed=0):
+    rng = random.Random(seed)
+    cells = []
+    for _ in range(rows):
+        roll = rng.random()
+        if roll < 0.6:
+            cells.append("")
+        elif roll < 0.9:
+            cells.append(rng.choice(GREEK_WEEKDAYS))
+        else:
+            cells.append(rng.choice(MONTH_CELLS))
+    return cells
+
+
+def timed(function, cells):
+    start = time.perf_counter()
+    for cell in cells:
+        function(cell)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cells = synthetic_month_column(args.rows)
+    # The same cells, each made unique so no lookup is answered from a cache
+    unique_cells = [f"{cell} {index}" for index, cell in enumerate(cells)]
+    uncached_find_month = find_month.__wrapped__
+
+    for title, column, matcher in (("Schedule month column", cells, find_month),
+                                   ("Every cell different, no cache", unique_cells, uncached_find_month)):
+        results = {
+            "dict scan": min(timed(legacy_find_month, column) for _ in range(args.repeat)),
+            "find_month": min(timed(matcher, column) for _ in range(args.repeat)),
+        }
+        print(f"{title}, {args.rows} cells:")
+        for label, seconds in results.items():
+            print(f"{label:>12}: {seconds:8.3f} s  ({seconds / args.rows * 1e9:.0f} ns per cell)")
+        print(f"{'speed-up':>12}: {results['dict scan'] / results['find_month']:8.1f}x")
+
+    print("Cells matched differently:")
+    for cell in MONTH_CELLS:
+        old, new = legacy_find_month(cell), find_month(cell)
+        if old != new:
+            print(f"    {cell!r}: dict scan {old}, find_month {new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Time the whole pipeline, stage by stage, on generated schedules of growing size.
+
+For each scale, writes a main, Cath Lab and EP schedule with schedule_docs,
+then times reading the tables, parsing them, indexing the roster and writing
+every employee's calendar, checking that the parsed shifts are exactly the
+ones written. The results are saved as JSON in benchmarks/results, and
+--compare prints the change against an earlier results file.
+
+    python benchmarks/bench_pipeline.py --employees 30,100,300,1000,2000
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/pipeline-20250301-120000.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+from schedule_docs import write_schedule_set
+from shift_calendar import RosterIndex, ShiftCalendarCore
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+STAGES = ("read", "parse", "index", "calendars")
+
+
+def quiet(message, sensitive=False, level=None):
+    pass
+
+
+def run_pipeline(schedules, output_dir, fast_tables, fast_writer):
+    """Seconds taken by each stage, and the parsed (shifts, cath_lab_shifts, ep_shifts)"""
+    core = ShiftCalendarCore(log=quiet, fast_tables=fast_tables)
+    times = {}
+
+    start = time.perf_counter()
+    main_tables = core.read_docx_tables(schedules.main)
+    cath_lab_tables = core.read_docx_tables(schedules.cath_lab)
+    ep_tables = core.read_docx_tables(schedules.ep)
+    times["read"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shifts = core.parse_first_table(main_tables[0], schedules.month, schedules.year)
+    shifts += core.parse_second_table(main_tables[1], schedules.month, schedules.year)
+    cath_lab_shifts = [shift for table in cath_lab_tables
+                       for shift in core.parse_specialty_on_call_table(table, "Cath Lab On-Call")]
+    ep_shifts = [shift for table in ep_tables
+                 for shift in core.parse_specialty_on_call_table(table, "Electrophysiology On-Call")]
+    times["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    core.roster = RosterIndex(shifts, cath_lab_shifts, ep_shifts)
+    employees = sorted({shift.employee for shift in shifts})
+    times["index"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    written = core.generate_calendars(employees, output_dir, fast_writer=fast_writer)
+    times["calendars"] = time.perf_counter() - start
+    if written != len(employees):
+        raise SystemExit(f"Only {written} of {len(employees)} calendars were written")
+
+    return times, (shifts, cath_lab_shifts, ep_shifts)
+
+
+def benchmark_scale(employees, args):
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        schedules = write_schedule_set(directory, employees, args.months, args.start, seed=args.seed)
+        generated = time.perf_counter() - start
+
+        best = {}
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as output_dir:
+                times, parsed = run_pipeline(schedules, output_dir, not args.no_fast_tables, args.fast_writer)
+            if parsed != (schedules.shifts, schedules.cath_lab_shifts, schedules.ep_shifts):
+                raise SystemExit(f"{employees} employees: the parsed shifts differ from the generated ones")
+            for stage, seconds in times.items():
+                best[stage] = min(seconds, best.get(stage, seconds))
+
+    return {
+        "employees": employees,
+        "shifts": len(schedules.shifts) + len(schedules.cath_lab_shifts) + len(schedules.ep_shifts),
+        "calendars": len({shift.employee for shift in schedules.shifts}),
+        "generate": generated,
+        "stages": best,
+        "total": sum(best.values()),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, previous=None):
+    """One line per scale with the best time of each stage, and the ratio to previous if given"""
+    previous_by_scale = {entry["employees"]: entry for entry in previous["results"]} if previous else {}
+    columns = [*STAGES, "total"]
+    print(f"{'employees':>9} {'shifts':>8} " + " ".join(f"{column:>10}" for column in columns) + "  (ms)")
+    for entry in results:
+        times = {**entry["stages"], "total": entry["total"]}
+        print(f"{entry['employees']:>9} {entry['shifts']:>8} "
+              + " ".join(f"{times[column] * 1000:>10.1f}" for column in columns))
+        before = previous_by_scale.get(entry["employees"])
+        if before:
+            before_times = {**before["stages"], "total": before["total"]}
+            print(f"{'':>9} {'vs prev':>8} "
+                  + " ".join(f"{times[column] / before_times[column]:>9.2f}x" if before_times.get(column)
+                             else f"{'-':>10}" for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", default="30,100,300,1000,2000",
+                        help="comma-separated numbers of employees to run with")
+    parser.add_argument("--months", type=int, default=1)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 3, 1), metavar="YYYY-MM-DD")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fast-writer", action="store_true", help="use the streaming ICS writer")
+    parser.add_argument("--no-fast-tables", action="store_true", help="read the tables with python-docx")
+    parser.add_argument("--save", metavar="FILE", help="results file (default: a new file in benchmarks/results)")
+    parser.add_argument("--no-save", action="store_true", help="do not save the results")
+    parser.add_argument("--compare", metavar="FILE", help="earlier results file to compare with")
+    args = parser.parse_args()
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+
+    results = []
+    for employees in (int(value) for value in args.employees.split(",")):
+        results.append(benchmark_scale(employees, args))
+        entry = results[-1]
+        print(f"{employees} employees: {entry['shifts']} shifts, {entry['calendars']} calendars "
+              f"(schedules generated in {entry['generate']:.1f} s)", file=sys.stderr)
+
+    print_results(results, previous)
+
+    if not args.no_save:
+        report = {
+            "benchmark": "pipeline",
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": {"months": args.months, "start": args.start.isoformat(), "seed": args.seed,
+                        "repeat": args.repeat, "fast_writer": args.fast_writer,
+                        "fast_tables": not args.no_fast_tables},
+            "results": results,
+        }
+        path = args.save or os.path.join(RESULTS_DIR, f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
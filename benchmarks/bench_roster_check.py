@@ -0,0 +1,110 @@
+"""Time the roster check on a large synthetic roster against a plain Python version.
+
+Generates a year of shifts for 2,000 employees, adds a few of each kind of
+problem, then runs shift_calendar.check_roster (array operations over a
+ShiftMatrix) and a straightforward loop over each employee's shifts. Both
+must report the same problems.
+
+    python benchmarks/bench_roster_check.py --employees 2000 --days 365
+"""
+import argparse
+from collections import defaultdict
+from datetime import timedelta
+import random
+import statistics
+import time
+
+from synthetic import GREEK_WEEKDAYS, MAIN_SHIFT_TYPES, synthetic_roster
+from shift_calendar import (FIRST_TABLE_TYPES, HOURS_24_TYPES, MAIN_TYPES, RULES, SECOND_TABLE_TYPES, SPECIALTY_TYPES,
+                            Shift, check_roster)
+
+
+def add_problems(shifts, cath_lab_shifts, count, seed):
+    """Add count double bookings, back-to-back 24h shifts and on-call clashes at random"""
+    rng = random.Random(seed)
+    second_table = [shift for shift in shifts if shift.shift_type in SECOND_TABLE_TYPES]
+    for _ in range(count):
+        for shift, shift_type, target, offset in (
+            (rng.choice(second_table), MAIN_SHIFT_TYPES[4], shifts, 0),
+            (rng.choice(shifts), MAIN_SHIFT_TYPES[1], shifts, 1),
+            (rng.choice(shifts), "Cath Lab On-Call", cath_lab_shifts, 0),
+        ):
+            day = shift.date + timedelta(days=offset)
+            target.append(Shift(shift.employee, day, GREEK_WEEKDAYS[day.weekday()], shift_type))
+
+
+def check_roster_loops(shifts, cath_lab_shifts, ep_shifts, max_shifts_per_week):
+    """(rule, employee, date) of every problem, one day and employee at a time"""
+    by_employee = defaultdict(lambda: defaultdict(list))
+    names = {}
+    for shift in [*shifts, *cath_lab_shifts, *ep_shifts]:
+        names.setdefault(shift.key, shift.employee)
+        by_employee[shift.key][shift.date].append(shift.shift_type)
+    all_dates = [shift.date for shift in [*shifts, *cath_lab_shifts, *ep_shifts]]
+    first, last = min(all_dates), max(all_dates)
+    days = [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+    window = min(7, len(days))
+
+    found = []
+    for key, dates in by_employee.items():
+        name = names[key]
+        on_duty = [any(shift_type in MAIN_TYPES for shift_type in dates.get(day, ())) for day in days]
+        on_24h = [any(shift_type in HOURS_24_TYPES for shift_type in dates.get(day, ())) for day in days]
+        for index, day in enumerate(days):
+            types = dates.get(day, ())
+            if (sum(shift_type in FIRST_TABLE_TYPES for shift_type in types) >= 2
+                    or sum(shift_type in SECOND_TABLE_TYPES for shift_type in types) >= 2):
+                found.append((RULES[0], name, day))
+            if index + 1 < len(days) and on_24h[index] and on_24h[index + 1]:
+                found.append((RULES[1], name, day))
+            if on_24h[index] and any(shift_type in SPECIALTY_TYPES for shift_type in types):
+                found.append((RULES[2], name, day))
+        over_before = False
+        for index in range(len(days) - window + 1):
+            over = sum(on_duty[index:index + window]) > max_shifts_per_week
+            if over and not over_before:
+                found.append((RULES[3], name, days[index]))
+            over_before = over
+    return sorted(found, key=lambda problem: (problem[2], RULES.index(problem[0]), problem[1]))
+
+
+def timed(function, runs):
+    """Median seconds of runs calls, and the last result"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--problems", type=int, default=50, help="problems of each kind to add")
+    parser.add_argument("--max-shifts-per-week", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    shifts, cath_lab_shifts, ep_shifts = synthetic_roster(args.employees, args.days)
+    add_problems(shifts, cath_lab_shifts, args.problems, seed=1)
+    print(f"{args.employees} employees × {args.days} days: "
+          f"{len(shifts) + len(cath_lab_shifts) + len(ep_shifts):,} shifts")
+
+    check_roster([])  # numpy is imported on the first check
+    array_seconds, violations = timed(
+        lambda: check_roster(shifts, cath_lab_shifts, ep_shifts, args.max_shifts_per_week), args.runs)
+    loop_seconds, expected = timed(
+        lambda: check_roster_loops(shifts, cath_lab_shifts, ep_shifts, args.max_shifts_per_week), 1)
+    for rule in RULES:
+        print(f"  {rule:26} {sum(violation.rule == rule for violation in violations):6}")
+    print(f"  arrays: {array_seconds * 1000:9.1f} ms")
+    print(f"  loops:  {loop_seconds * 1000:9.1f} ms ({loop_seconds / array_seconds:.0f}x slower)")
+
+    if [(violation.rule, violation.employee, violation.date) for violation in violations] != expected:
+        raise SystemExit("The array check and the loops found different problems")
+
+
+if __name__ == "__main__":
+    main()
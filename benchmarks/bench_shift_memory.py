@@ -0,0 +1,66 @@
+"""Compare the memory used by dict shifts and by Shift records.
+
+The parsers used to return one dict per shift, with its own copy of every
+name and weekday string as split out of the table cells. This builds a
+synthetic roster both ways from freshly copied strings, like the parsers
+see them, and reports the memory held by each with tracemalloc.
+
+    python benchmarks/bench_shift_memory.py --employees 300 --days 365
+"""
+import argparse
+import gc
+import tracemalloc
+
+from synthetic import synthetic_roster
+from shift_calendar import RosterIndex, Shift
+
+
+def fresh(text):
+    """A new string object equal to text, as reading a table cell produces"""
+    return (text + " ")[:-1]
+
+
+def as_dicts(rows):
+    return [{'employee': fresh(employee), 'date': shift_date, 'day_of_week': fresh(day_of_week),
+             'shift_type': shift_type} for employee, shift_date, day_of_week, shift_type in rows]
+
+
+def as_records(rows):
+    return [Shift(fresh(employee), shift_date, fresh(day_of_week), shift_type)
+            for employee, shift_date, day_of_week, shift_type in rows]
+
+
+def measure(build, rows):
+    """Bytes still allocated after build(rows), and the result"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(rows)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=300)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    shifts, cath_lab_shifts, ep_shifts = synthetic_roster(args.employees, args.days)
+    rows = [(s.employee, s.date, s.day_of_week, s.shift_type) for s in shifts + cath_lab_shifts + ep_shifts]
+    print(f"{len(rows)} shifts, {args.employees} employees, {args.days} days")
+
+    dict_bytes, _ = measure(as_dicts, rows)
+    record_bytes, records = measure(as_records, rows)
+    index_bytes, _ = measure(lambda records: RosterIndex(records), records)
+
+    print(f"{'dicts':>8}: {dict_bytes / 2**20:8.2f} MiB  ({dict_bytes / len(rows):.0f} bytes per shift)")
+    print(f"{'Shift':>8}: {record_bytes / 2**20:8.2f} MiB  ({record_bytes / len(rows):.0f} bytes per shift)")
+    print(f"{'saving':>8}: {1 - record_bytes / dict_bytes:8.1%}")
+    print(f"RosterIndex over the records: {index_bytes / 2**20:.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
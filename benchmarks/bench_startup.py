@@ -0,0 +1,85 @@
+"""Measure start-up import time with python -X importtime.
+
+Imports the library, the command-line interface and the GUI module in fresh
+interpreters, reports the median total import time and the slowest modules,
+and fails if a start-up path imports something it should load lazily:
+python-docx and icalendar are only needed once files are processed, the
+calendar server (http.server) only when serving, the history database
+(sqlite3) only when one is used, numpy only for the roster check and the
+workload report, and the CLI and library never need tkinter.
+
+    python benchmarks/bench_startup.py --runs 5 --budget-ms 150
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from synthetic import SRC_DIR
+
+GUI_SCRIPT = os.path.join(SRC_DIR, "employee-shift-calendar-generator.py")
+
+# Start-up path -> (code run in the fresh interpreter, modules it must not import)
+TARGETS = {
+    "library": ("import shift_calendar", ("tkinter", "docx", "icalendar", "http.server", "sqlite3", "numpy")),
+    "cli": ("import shift_calendar.cli", ("tkinter", "docx", "icalendar", "http.server", "sqlite3", "numpy")),
+    "gui": ("import importlib.util as u; s = u.spec_from_file_location('gui', {!r}); "
+            "s.loader.exec_module(u.module_from_spec(s))".format(GUI_SCRIPT), ("docx", "icalendar", "http.server", "sqlite3", "numpy")),
+}
+
+
+def import_times(code):
+    """Run code under -X importtime; return {module: cumulative microseconds} and the top-level order"""
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")])))
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             capture_output=True, text=True, env=environment)
+    if process.returncode != 0:
+        raise SystemExit(f"Import failed:\n{process.stderr}")
+
+    cumulative = {}
+    top_level = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line[len("import time:"):].split("|")
+        if not total.strip().isdigit():
+            continue  # the header line
+        module = name.strip()
+        cumulative[module] = int(total)
+        if not name.startswith("  "):
+            top_level.append(module)
+    return cumulative, top_level
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="number of slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, help="fail if a start-up path takes longer than this")
+    args = parser.parse_args()
+
+    failures = []
+    for label, (code, forbidden) in TARGETS.items():
+        totals = []
+        for _ in range(args.runs):
+            cumulative, top_level = import_times(code)
+            totals.append(sum(cumulative[module] for module in top_level) / 1000)
+        median = statistics.median(totals)
+        print(f"{label}: {median:.1f} ms median over {args.runs} runs")
+        slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for module, microseconds in slowest:
+            print(f"    {microseconds / 1000:8.1f} ms  {module}")
+
+        loaded = [module for module in forbidden if module in cumulative]
+        if loaded:
+            failures.append(f"{label} imports {', '.join(loaded)} at start-up")
+        if args.budget_ms is not None and median > args.budget_ms:
+            failures.append(f"{label} took {median:.1f} ms, over the {args.budget_ms:g} ms budget")
+
+    if failures:
+        raise SystemExit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    main()
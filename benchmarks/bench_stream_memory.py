@@ -0,0 +1,93 @@
+"""Compare the peak memory of reading a very large schedule whole and as a stream.
+
+Writes one main schedule covering several years (the change of month found
+from the day numbers, as the month names would not say which year) and
+parses it three ways, measuring the peak memory traced by tracemalloc, and
+how much of it the result holds on to:
+
+- whole: every table read into lists, cleaned into a second copy, then each
+  table parsed into a list of shifts, as the program used to;
+- streamed: ShiftCalendarCore.iter_main_schedule collected into a list of
+  shifts, each row read, classified and parsed before the next is read;
+- streamed into the index: the stream fed straight to a RosterIndex, with no
+  list of shifts at all.
+
+The streamed shifts must match the generated ones.
+
+    python benchmarks/bench_stream_memory.py --employees 300 --months 36
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+from schedule_docs import write_schedule_set
+from shift_calendar import RosterIndex, ShiftCalendarCore, read_tables_fast
+
+
+def whole(core, path, month, year):
+    tables = read_tables_fast(path)
+    tables_data = [[[text.strip() for text in cells] for cells in table if any(text.strip() for text in cells)]
+                   for table in tables]
+    shifts = []
+    shifts.extend(core.parse_first_table(tables_data[0], month, year))
+    shifts.extend(core.parse_second_table(tables_data[1], month, year))
+    return shifts
+
+
+def streamed(core, path, month, year):
+    return list(core.iter_main_schedule(path, month, year))
+
+
+def streamed_into_index(core, path, month, year):
+    return RosterIndex(core.iter_main_schedule(path, month, year))
+
+
+def measure(function, *args):
+    """Peak and retained bytes of function(*args) above what was allocated before, seconds, and the result.
+
+    Retained is the memory the result still holds; the peak less that is
+    what reading took on top of it.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - before, current - before, seconds, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=300)
+    parser.add_argument("--months", type=int, default=36, help="months covered by the one schedule")
+    args = parser.parse_args()
+
+    core = ShiftCalendarCore(log=lambda message, sensitive=False, level=None: None)
+    with tempfile.TemporaryDirectory() as directory:
+        schedules = write_schedule_set(directory, args.employees, args.months, start=date(2023, 1, 1),
+                                       month_names=False)
+        path, month, year = schedules.main, schedules.month, schedules.year
+        print(f"{args.months} months, {args.employees} employees: {len(schedules.shifts):,} shifts, "
+              f"{os.path.getsize(path) / 1024 / 1024:.1f} MiB .docx")
+
+        results = {}
+        for label, function in (("whole", whole), ("streamed", streamed),
+                                ("streamed into the index", streamed_into_index)):
+            peak, retained, seconds, results[label] = measure(function, core, path, month, year)
+            print(f"  {label:24} peak {peak / 1024 / 1024:6.1f} MiB, result {retained / 1024 / 1024:6.1f} MiB, "
+                  f"reading {(peak - retained) / 1024 / 1024:6.1f} MiB  {seconds:6.2f} s (traced)")
+
+    if results["whole"] != schedules.shifts or results["streamed"] != schedules.shifts:
+        raise SystemExit("The parsed shifts differ from the generated ones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare python-docx table extraction with the streaming table reader.
+
+Times both readers on a large one-table schedule, after checking that they
+return the same rows for it. The equivalence on merged cells, nested tables
+and other structures is covered by tests/test_docx_tables.py.
+
+    python benchmarks/bench_table_extraction.py --rows 5000 --repeat 3
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import docx
+
+from synthetic import GREEK_WEEKDAYS, employee_names
+from shift_calendar import read_tables_fast
+
+
+def python_docx_tables(path):
+    """The cell text of every table as read_docx_tables read it with python-docx"""
+    document = docx.Document(path)
+    return [[[cell.text for cell in row.cells] for row in table.rows] for table in document.tables]
+
+
+def make_schedule(path, rows):
+    """A long schedule table shaped like the real ones: day, weekday and staff columns"""
+    names = employee_names(120)
+    document = docx.Document()
+    table = document.add_table(rows=rows, cols=5)
+    for index, row in enumerate(table.rows):
+        cells = row.cells
+        cells[0].text = f"{index % 31 + 1:02d}"
+        cells[1].text = GREEK_WEEKDAYS[index % 7]
+        cells[2].text = f"{names[index % 120]}\n{names[(index * 7) % 120]}*"
+        cells[3].text = names[(index * 11) % 120]
+        if index % 10 == 1:
+            # Continue a vertical merge from the row above
+            previous_tc.get_or_add_tcPr().vMerge_val = "restart"
+            cells[4]._tc.get_or_add_tcPr().vMerge_val = "continue"
+        else:
+            cells[4].text = names[(index * 13) % 120]
+        previous_tc = cells[4]._tc
+    document.save(path)
+
+
+def best_time(function, path, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(path)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "schedule.docx")
+        make_schedule(path, args.rows)
+        if read_tables_fast(path) != python_docx_tables(path):
+            raise SystemExit("Readers differ on the schedule")
+        results = {
+            "python-docx": best_time(python_docx_tables, path, args.repeat),
+            "streaming": best_time(read_tables_fast, path, args.repeat),
+        }
+
+    print(f"Throughput on a {args.rows}-row table:")
+    for label, seconds in results.items():
+        print(f"{label:>12}: {seconds:8.3f} s  ({args.rows / seconds:,.0f} rows/s)")
+    print(f"{'speed-up':>12}: {results['python-docx'] / results['streaming']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Load-test the calendar subscription server on localhost.
+
+Starts a CalendarServer over a synthetic roster and has many concurrent
+clients poll it the way subscribed calendar apps do: a first download of each
+feed (rendered on demand), repeated gzip downloads (served from the cache) and
+revalidations with If-None-Match (304 without a body). Reports requests per
+second, latency percentiles and bytes sent for each phase, after checking that
+the responses are consistent and that replacing the roster changes the ETags.
+
+    python benchmarks/bench_webcal.py --employees 300 --clients 200 --requests 20
+"""
+import argparse
+import gzip
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from synthetic import synthetic_roster
+from shift_calendar import RosterIndex
+from shift_calendar.webcal import CalendarFeeds, CalendarServer
+
+
+def request(port, path, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def check_responses(port, server, employees, roster):
+    path = server.feed_url(employees[0]).split(str(port), 1)[1]
+    status, headers, body = request(port, path)
+    assert status == 200 and body.startswith(b"BEGIN:VCALENDAR"), status
+    status, gzip_headers, gzip_body = request(port, path, {"Accept-Encoding": "gzip"})
+    assert gzip_headers["Content-Encoding"] == "gzip" and gzip.decompress(gzip_body) == body
+    assert gzip_headers["ETag"] != headers["ETag"]
+    status, _, body_304 = request(port, path, {"If-None-Match": headers["ETag"]})
+    assert status == 304 and body_304 == b"", status
+    status, _, _ = request(port, path, {"If-Modified-Since": headers["Last-Modified"]})
+    assert status == 304, status
+    assert request(port, "/calendars/nobody.ics")[0] == 404
+
+    # A new roster invalidates the cached feeds
+    time.sleep(1.1)
+    server.feeds.set_roster(roster, employees)
+    status, new_headers, _ = request(port, path, {"If-None-Match": headers["ETag"]})
+    assert status == 200 and new_headers["Last-Modified"] != headers["Last-Modified"], status
+
+
+def run_phase(port, paths, clients, requests_per_client, headers_for):
+    """Latencies and bytes of clients polling paths concurrently"""
+    latencies, sizes, statuses = [], [], {}
+    lock = threading.Lock()
+
+    def client(index):
+        own_latencies, own_bytes, own_statuses = [], 0, {}
+        for number in range(requests_per_client):
+            path = paths[(index * requests_per_client + number) % len(paths)]
+            start = time.perf_counter()
+            status, _, body = request(port, path, headers_for(path))
+            own_latencies.append(time.perf_counter() - start)
+            own_bytes += len(body)
+            own_statuses[status] = own_statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(own_latencies)
+            sizes.append(own_bytes)
+            for status, count in own_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(client, range(clients)))
+    return time.perf_counter() - start, latencies, sum(sizes), statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=300)
+    parser.add_argument("--days", type=int, default=62)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client in each phase")
+    parser.add_argument("--workers", type=int, default=16, help="server worker threads")
+    args = parser.parse_args()
+
+    shifts, cath_lab_shifts, ep_shifts = synthetic_roster(args.employees, args.days)
+    roster = RosterIndex(shifts, cath_lab_shifts, ep_shifts)
+    employees = sorted({s.employee for s in shifts})
+
+    server = CalendarServer(("127.0.0.1", 0), CalendarFeeds(roster, employees), workers=args.workers)
+    # A deep accept backlog for the burst of concurrent clients
+    server.socket.listen(1024)
+    port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        check_responses(port, server, employees, roster)
+        server.feeds.set_roster(roster, employees)
+        paths = [server.feed_url(employee).split(str(port), 1)[1] for employee in employees]
+
+        def gzip_headers(path):
+            return {"Accept-Encoding": "gzip"}
+
+        print(f"{len(employees)} feeds, {args.clients} clients, {args.workers} server threads")
+        # Every feed downloaded once, so each is rendered once
+        clients = min(args.clients, len(paths))
+        results = [("first download (render)",
+                    run_phase(port, paths, clients, -(-len(paths) // clients), gzip_headers))]
+
+        # The ETags the clients keep after their first download
+        etags = {path: request(port, path, {"Accept-Encoding": "gzip"})[1]["ETag"] for path in paths}
+        results.append(("cached gzip download",
+                        run_phase(port, paths, args.clients, args.requests, gzip_headers)))
+        results.append(("revalidation (304)",
+                        run_phase(port, paths, args.clients, args.requests,
+                                  lambda path: {"Accept-Encoding": "gzip", "If-None-Match": etags[path]})))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    for label, (seconds, latencies, sent, statuses) in results:
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"{label}: {len(latencies) / seconds:,.0f} req/s, latency median "
+              f"{statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms, "
+              f"{sent / 2**20:.1f} MiB sent, statuses {statuses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Time the workload report on multi-year synthetic rosters against counting shift by shift.
+
+Generates several years of shifts, with New Year's Day, 25 March, 1 May, 15
+August, 28 October and Christmas as the marked holidays, then computes each
+employee's counts by type, weekday and month and weekend and holiday duties
+with shift_calendar.Workload and with Counters filled one shift at a time.
+Both must give the same counts.
+
+    python benchmarks/bench_workload.py --employees 300,2000 --years 5
+"""
+import argparse
+from collections import Counter
+from datetime import date
+import statistics
+import time
+
+from synthetic import synthetic_roster
+from shift_calendar import MAIN_TYPES, Workload
+from shift_calendar.analytics import WEEKDAY_NAMES
+
+HOLIDAYS = ((1, 1), (3, 25), (5, 1), (8, 15), (10, 28), (12, 25))
+
+
+def count_shifts(shifts, cath_lab_shifts, ep_shifts, holidays):
+    """{(employee, column): count} with the same columns as Workload.header()"""
+    counts = Counter()
+    names = {}
+    for shift in [*shifts, *cath_lab_shifts, *ep_shifts]:
+        name = names.setdefault(shift.key, shift.employee)
+        counts[name, shift.shift_type] += 1
+        if shift.shift_type not in MAIN_TYPES:
+            continue
+        counts[name, shift.date.weekday()] += 1
+        counts[name, f"{shift.date.year:04d}-{shift.date.month:02d}"] += 1
+        if shift.date.weekday() >= 5:
+            counts[name, "weekend"] += 1
+        if shift.date in holidays:
+            counts[name, "holiday"] += 1
+    return counts
+
+
+def workload_counts(workload):
+    """The Workload's non-zero counts keyed like count_shifts"""
+    header = workload.header()
+    weekdays = {name: index for index, name in enumerate(WEEKDAY_NAMES)}
+    counts = Counter()
+    for row in workload.rows():
+        for column, value in zip(header[1:], row[1:]):
+            if value:
+                counts[row[0], weekdays.get(column, column)] = value
+    return counts
+
+
+def timed(function, runs):
+    """Median seconds of runs calls, and the last result"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", default="300,2000", help="comma-separated numbers of employees to run with")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    Workload([])  # numpy is imported on the first report
+    same = True
+    for employees in (int(value) for value in args.employees.split(",")):
+        start = date(2021, 1, 1)
+        days = (date(start.year + args.years, 1, 1) - start).days
+        roster = synthetic_roster(employees, days, start)
+        holidays = {date(year, month, day) for year in range(start.year, start.year + args.years)
+                    for month, day in HOLIDAYS}
+        print(f"{employees} employees × {args.years} years: {sum(len(shifts) for shifts in roster):,} shifts")
+
+        array_seconds, workload = timed(lambda: Workload(*roster, holidays=holidays), args.runs)
+        counter_seconds, expected = timed(lambda: count_shifts(*roster, holidays), 1)
+        print(f"  arrays:   {array_seconds * 1000:9.1f} ms")
+        print(f"  counters: {counter_seconds * 1000:9.1f} ms ({counter_seconds / array_seconds:.1f}x slower)")
+        same &= workload_counts(workload) == expected
+    if not same:
+        raise SystemExit("The workload counts differ from the ones counted shift by shift")
+
+
+if __name__ == "__main__":
+    main()
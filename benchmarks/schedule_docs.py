@@ -0,0 +1,226 @@
+"""Synthetic schedule documents for the end-to-end benchmarks.
+
+Writes .docx files laid out like the real ones: a main schedule with the
+Regular/On-Call table and the Μεγάλη/Μικρή/ΤΕΠ table, and the Cath Lab and
+Electrophysiology on-call tables. The shifts written are returned as well, in
+the order the parsers should produce them, so a run can be checked against
+them.
+
+A schedule covers whole months from its start month, plus a few days of the
+next month as the real ones do. The change of month is marked by the month
+name in the month column, or left for the parsers to detect from the day
+numbers. With noise, the tables get a title row, header rows, blank and note
+rows, holiday markers ("*01**"), stray whitespace and ">" marks, and merged
+day cells, as the hand-made schedules do.
+
+    python benchmarks/schedule_docs.py --employees 100 --months 2 -o schedules
+"""
+import argparse
+import os
+import random
+from collections import namedtuple
+from datetime import date, timedelta
+
+import docx
+
+from synthetic import GREEK_WEEKDAYS, employee_names
+from shift_calendar import Shift
+from shift_calendar.months import MONTH_STEMS
+
+ScheduleSet = namedtuple("ScheduleSet", "main cath_lab ep month year shifts cath_lab_shifts ep_shifts")
+
+
+def month_name(month, case="genitive"):
+    """Upper-case Greek month name, as written in the schedules"""
+    return MONTH_STEMS[month] + ("ΟΥ" if case == "genitive" else "ΟΣ")
+
+
+def schedule_days(start, months, rollover_days):
+    """The dates covered: months whole months from start's month, then rollover_days more"""
+    first = start.replace(day=1)
+    end_month = first.month - 1 + months
+    end = date(first.year + end_month // 12, end_month % 12 + 1, 1) + timedelta(days=rollover_days)
+    return [first + timedelta(days=offset) for offset in range((end - first).days)]
+
+
+def add_row(table, values):
+    cells = table.add_row().cells
+    for cell, value in zip(cells, values):
+        cell.text = value
+    return cells
+
+
+def add_title_rows(table, title, headers):
+    """A title merged across the table and a header row"""
+    cells = add_row(table, [""] * len(headers))
+    cells[0].merge(cells[-1]).text = title
+    add_row(table, headers)
+
+
+def merge_down(upper_cell, lower_cell):
+    """Continue a vertical merge from upper_cell into lower_cell"""
+    upper = upper_cell._tc.get_or_add_tcPr()
+    if upper.vMerge_val is None:
+        upper.vMerge_val = "restart"
+    lower_cell._tc.get_or_add_tcPr().vMerge_val = "continue"
+
+
+class _Layout:
+    """Shared state while writing the tables of one schedule set"""
+
+    def __init__(self, days, names, rng, month_names, noise):
+        self.days = days
+        self.names = names
+        self.rng = rng
+        self.month_names = month_names
+        self.noise = noise
+        self.holidays = {day for day in days if noise and rng.random() < 0.05}
+
+    def day_cell(self, day):
+        return f"*{day.day:02d}**" if day in self.holidays else f"{day.day:02d}"
+
+    def month_cell(self, index):
+        """The month column: the month name on the first day of each month, if enabled"""
+        day = self.days[index]
+        if self.month_names and (index == 0 or day.day == 1):
+            return month_name(day.month)
+        return ""
+
+    def name(self, name):
+        """A name as typed in a cell, with stray whitespace if noisy"""
+        if self.noise and self.rng.random() < 0.1:
+            return f" {name}  "
+        return name
+
+
+def write_main_table(document, layout, per_day):
+    """The Regular/On-Call table: one row per day, the on-call staff marked with *"""
+    table = document.add_table(rows=0, cols=4)
+    if layout.noise:
+        add_title_rows(table, f"ΠΡΟΓΡΑΜΜΑ ΕΦΗΜΕΡΙΩΝ {month_name(layout.days[0].month, 'nominative')}",
+                       ["ΗΜ/ΝΙΑ", "ΜΗΝΑΣ", "ΗΜΕΡΑ", "ΙΑΤΡΟΙ"])
+    shifts = []
+    for index, day in enumerate(layout.days):
+        day_of_week = GREEK_WEEKDAYS[day.weekday()]
+        lines = []
+        for position, name in enumerate(layout.rng.sample(layout.names, per_day)):
+            on_call = position % 2 == 1
+            if on_call:
+                lines.append(layout.rng.choice(("{}*", "*{}", "{} *")).format(name) if layout.noise else f"{name}*")
+            else:
+                lines.append(layout.name(name))
+            shifts.append(Shift(name, day, day_of_week, "On-Call Shift" if on_call else "Regular Shift"))
+        add_row(table, [layout.day_cell(day), layout.month_cell(index), day_of_week, "\n".join(lines)])
+        if layout.noise and layout.rng.random() < 0.03:
+            add_row(table, ["", "", "", ""])
+    if layout.noise:
+        add_row(table, ["* Ενεργή εφημερία", "", "", ""])
+    return shifts
+
+
+def write_second_table(document, layout, rows_per_day):
+    """The Μεγάλη/Μικρή/ΤΕΠ table: rows_per_day rows per day, the day cells merged when noisy"""
+    table = document.add_table(rows=0, cols=6)
+    if layout.noise:
+        add_title_rows(table, "ΕΦΗΜΕΡΙΕΣ ΤΜΗΜΑΤΟΣ", ["ΗΜ/ΝΙΑ", "ΜΗΝΑΣ", "ΗΜΕΡΑ", "ΜΕΓΑΛΗ", "ΜΙΚΡΗ", "ΤΕΠ"])
+    shift_types = ("Μεγάλη Shift (24h)", "Μικρή Shift (24h)", "TEP Shift (12h)")
+    shifts = []
+    for index, day in enumerate(layout.days):
+        day_of_week = GREEK_WEEKDAYS[day.weekday()]
+        first_cells = None
+        on_duty = layout.rng.sample(layout.names, rows_per_day * len(shift_types))
+        for row in range(rows_per_day):
+            values = []
+            for column, shift_type in enumerate(shift_types):
+                name = on_duty[row * len(shift_types) + column]
+                if layout.noise and layout.rng.random() < 0.05:
+                    values.append("")
+                    continue
+                values.append(f">{name}" if layout.noise and layout.rng.random() < 0.1 else layout.name(name))
+                shifts.append(Shift(name, day, day_of_week, shift_type))
+            cells = add_row(table, [layout.day_cell(day), layout.month_cell(index), day_of_week, *values])
+            if first_cells is None:
+                first_cells = cells
+            elif layout.noise:
+                for upper, lower in zip(first_cells[:3], cells[:3]):
+                    merge_down(upper, lower)
+    if layout.noise:
+        add_row(table, ["Ο ΔΙΕΥΘΥΝΤΗΣ", "", "", "", "", ""])
+    return shifts
+
+
+def write_specialty_document(path, layout, shift_type):
+    """A Cath Lab or EP on-call table: date, weekday and the specialist on call"""
+    document = docx.Document()
+    table = document.add_table(rows=0, cols=3)
+    if layout.noise:
+        add_row(table, ["ΗΜΕΡΟΜΗΝΙΑ", "ΗΜΕΡΑ", "ΕΦΗΜΕΡΕΥΩΝ"])
+    shifts = []
+    for day in layout.days:
+        day_of_week = GREEK_WEEKDAYS[day.weekday()]
+        name = layout.rng.choice(layout.names)
+        if layout.noise and layout.rng.random() < 0.5:
+            date_text = f"{day.day}/{day.month}/{day.year}"
+        else:
+            date_text = f"{day.day:02d}-{day.month:02d}-{day.year}"
+        add_row(table, [date_text, day_of_week, layout.name(name)])
+        shifts.append(Shift(name, day, day_of_week, shift_type))
+    document.save(path)
+    return shifts
+
+
+def write_schedule_set(directory, employees=30, months=1, start=date(2025, 3, 1), rollover_days=3,
+                       month_names=True, noise=True, seed=0):
+    """Write a main schedule and Cath Lab and EP schedules into directory.
+
+    Staffing grows with the number of employees: the first table lists about
+    one person in 15 each day and the second table gets one row per 30
+    employees each day. Returns a ScheduleSet with the file paths, the month
+    and year to process them with and the shifts they contain.
+    """
+    rng = random.Random(seed)
+    names = employee_names(employees)
+    days = schedule_days(start, months, rollover_days)
+    layout = _Layout(days, names, rng, month_names, noise)
+    label = f"{month_name(start.month, 'nominative')} {start.year}"
+
+    document = docx.Document()
+    if noise:
+        document.add_paragraph(f"ΕΦΗΜΕΡΙΕΣ {label}")
+    shifts = write_main_table(document, layout, min(employees, max(2, employees // 15)))
+    document.add_paragraph("")
+    shifts += write_second_table(document, layout, max(1, min(employees // 3, employees // 30)))
+    main = os.path.join(directory, f"ΕΦΗΜΕΡΙΕΣ {label}.docx")
+    document.save(main)
+
+    cath_lab = os.path.join(directory, f"CATH {label}.docx")
+    cath_lab_shifts = write_specialty_document(cath_lab, layout, "Cath Lab On-Call")
+    ep = os.path.join(directory, f"EP {label}.docx")
+    ep_shifts = write_specialty_document(ep, layout, "Electrophysiology On-Call")
+    return ScheduleSet(main, cath_lab, ep, start.month, start.year, shifts, cath_lab_shifts, ep_shifts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", default=".", help="folder to write the documents to")
+    parser.add_argument("--employees", type=int, default=30)
+    parser.add_argument("--months", type=int, default=1)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 3, 1), metavar="YYYY-MM-DD")
+    parser.add_argument("--rollover-days", type=int, default=3, help="days of the following month included")
+    parser.add_argument("--no-month-names", action="store_true",
+                        help="leave the month column empty, so changes of month are found from the day numbers")
+    parser.add_argument("--no-noise", action="store_true", help="write bare tables without headers or markers")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    schedules = write_schedule_set(args.output, args.employees, args.months, args.start, args.rollover_days,
+                                   not args.no_month_names, not args.no_noise, args.seed)
+    for path in (schedules.main, schedules.cath_lab, schedules.ep):
+        print(path)
+    print(f"{len(schedules.shifts)} main, {len(schedules.cath_lab_shifts)} Cath Lab "
+          f"and {len(schedules.ep_shifts)} EP shifts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Synthetic rosters for the benchmarks.
+
+The real schedules contain staff names, so the benchmarks run on generated
+shifts with the same shape as the ones produced by the parsers.
+"""
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+# Make the shift_calendar package importable when run from a checkout
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from shift_calendar import Shift
+
+GREEK_WEEKDAYS = ["Δευτέρα", "Τρίτη", "Τετάρτη", "Πέμπτη", "Παρασκευή", "Σάββατο", "Κυριακή"]
+MAIN_SHIFT_TYPES = ["Regular Shift", "On-Call Shift", "Μεγάλη Shift (24h)", "Μικρή Shift (24h)", "TEP Shift (12h)"]
+
+
+def employee_names(count):
+    """Greek-looking employee names, unique per index."""
+    surnames = ["ΠΑΠΑΔΟΠΟΥΛΟΣ", "ΓΕΩΡΓΙΟΥ", "ΝΙΚΟΛΑΟΥ", "ΙΩΑΝΝΟΥ", "ΚΩΝΣΤΑΝΤΙΝΟΥ", "ΔΗΜΗΤΡΙΟΥ"]
+    return [f"{surnames[i % len(surnames)]} {chr(0x391 + i % 17)}. {i}" for i in range(count)]
+
+
+def synthetic_roster(employees=300, days=365, start=date(2025, 1, 1), seed=0):
+    """Generate (shifts, cath_lab_shifts, ep_shifts) as lists of Shift records.
+
+    Every day gets one shift of each main type per 30 employees, plus one
+    Cath Lab and one EP specialist on call.
+    """
+    rng = random.Random(seed)
+    names = employee_names(employees)
+    per_type = max(1, employees // 30)
+    shifts, cath_lab_shifts, ep_shifts = [], [], []
+
+    for offset in range(days):
+        shift_date = start + timedelta(days=offset)
+        day_of_week = GREEK_WEEKDAYS[shift_date.weekday()]
+        on_duty = rng.sample(names, min(len(names), per_type * len(MAIN_SHIFT_TYPES)))
+        for index, name in enumerate(on_duty):
+            shifts.append(Shift(name, shift_date, day_of_week, MAIN_SHIFT_TYPES[index % len(MAIN_SHIFT_TYPES)]))
+        for target, shift_type in ((cath_lab_shifts, "Cath Lab On-Call"), (ep_shifts, "Electrophysiology On-Call")):
+            target.append(Shift(rng.choice(names), shift_date, day_of_week, shift_type))
+
+    return shifts, cath_lab_shifts, ep_shifts
@@ -0,0 +1,10 @@
+"""Command-line entry point, for running without the GUI (see shift_calendar.cli)."""
+import multiprocessing
+import sys
+
+from shift_calendar.cli import main
+
+if __name__ == "__main__":
+    # Needed for the process pool workers in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
+    sys.exit(main())
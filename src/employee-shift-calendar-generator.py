@@ -1,15 +1,30 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-from datetime import datetime, timedelta, date
+from calendar import monthrange
+from datetime import date, datetime
+import importlib.util
+import logging
 import os
-import re
 import threading
-import docx
-from icalendar import Calendar, Event
-import platform
-import subprocess
-import tempfile
-import shutil
+import multiprocessing
+
+from shift_calendar import (DocumentCache, LibreOfficeConverter, ShiftCalendarCore, StageProfiler,
+                            extract_month_year_from_filename, find_batch_jobs)
+from shift_calendar.analytics import WORKLOAD_FILE_NAME
+from shift_calendar.checks import CHECK_FILE_NAME
+from shift_calendar.logqueue import LogFile, LogQueue
+
+# How often the log area takes the queued messages, and how many lines it keeps
+LOG_POLL_MS = 100
+LOG_MAX_LINES = 5000
+# How often the progress bar is refreshed during a run
+PROGRESS_POLL_MS = 200
+# Output format choices: label -> archive argument of generate_calendars
+OUTPUT_FORMATS = {
+    "Separate .ics files": None,
+    "One .zip archive": 'zip',
+    "One combined .ics file": 'ics',
+}
 
 class ShiftCalendarApp:
     def __init__(self, root):
@@ -26,12 +41,26 @@ class ShiftCalendarApp:
         self.year = tk.IntVar(value=datetime.now().year)
         self.include_cath_lab = tk.BooleanVar(value=False)
         self.include_ep = tk.BooleanVar(value=False)
-        
-        # Data storage
-        self.all_shifts = []
-        self.cath_lab_shifts = []
-        self.ep_shifts = []
-        self.all_employees = []
+        self.parallel_generation = tk.BooleanVar(value=False)
+        self.fast_writer = tk.BooleanVar(value=False)
+        self.incremental = tk.BooleanVar(value=False)
+        self.output_format = tk.StringVar(value=next(iter(OUTPUT_FORMATS)))
+        self.profile_stages = tk.BooleanVar(value=False)
+        self.keep_history = tk.BooleanVar(value=False)
+        self.direct_doc = tk.BooleanVar(value=False)
+        self.show_log_details = tk.BooleanVar(value=False)
+        
+        # Worker threads only queue their messages; the Tk main loop shows them
+        self.log_queue = LogQueue()
+        # The processing or generation thread running, if any; one at a time
+        self.run_thread = None
+        self.progress_text = tk.StringVar()
+        
+        # Parsing and calendar generation, shared with the command-line interface.
+        # .doc files go through one LibreOffice instance kept warm for the session,
+        # and unchanged documents are read from the cache.
+        self.core = ShiftCalendarCore(log=self.log, on_error=self.show_error,
+                                      converter=LibreOfficeConverter(), cache=self.open_cache())
         
         # Create UI
         self.create_widgets()
@@ -42,6 +71,8 @@ class ShiftCalendarApp:
             self.root.grid_rowconfigure(i, weight=0)
         self.root.grid_rowconfigure(6, weight=1)  # Log area takes remaining space
         
+        self.root.after(LOG_POLL_MS, self.drain_log)
+        
     def create_widgets(self):
         # File selection frame
         file_frame = ttk.LabelFrame(self.root, text="File Selection")
@@ -90,7 +121,18 @@ class ShiftCalendarApp:
         self.ep_button.grid(row=1, column=2, padx=5, pady=5)
         
         # Process button
-        ttk.Button(self.root, text="Process Files", command=self.process_files).grid(row=3, column=0, padx=10, pady=10)
+        process_frame = ttk.Frame(self.root)
+        process_frame.grid(row=3, column=0, padx=10, pady=10)
+        self.run_buttons = [
+            ttk.Button(process_frame, text="Process Files", command=self.process_files),
+            ttk.Button(process_frame, text="Process Folder (all months)", command=self.process_folder),
+            ttk.Button(process_frame, text="Load Month From History", command=self.load_history),
+        ]
+        for button in self.run_buttons:
+            button.pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(process_frame, text="Keep shift history", variable=self.keep_history).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(process_frame, text="Measure stage timings", variable=self.profile_stages).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(process_frame, text="Read .doc directly", variable=self.direct_doc).pack(side=tk.LEFT, padx=5)
         
         # Employee selection frame (initially hidden)
         self.employee_frame = ttk.LabelFrame(self.root, text="Employee Selection")
@@ -104,8 +146,43 @@ class ShiftCalendarApp:
         # Buttons for employee selection
         button_frame = ttk.Frame(self.employee_frame)
         button_frame.pack(fill=tk.X, padx=5, pady=5)
-        ttk.Button(button_frame, text="Generate Selected", command=self.generate_selected).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Generate All", command=self.generate_all).pack(side=tk.LEFT, padx=5)
+        self.run_buttons += [
+            ttk.Button(button_frame, text="Generate Selected", command=self.generate_selected),
+            ttk.Button(button_frame, text="Generate All", command=self.generate_all),
+        ]
+        for button in self.run_buttons[-2:]:
+            button.pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(button_frame, text="Use all CPU cores", variable=self.parallel_generation).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(button_frame, text="Fast ICS writer", variable=self.fast_writer).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(button_frame, text="Only rewrite changed calendars", variable=self.incremental).pack(side=tk.LEFT, padx=5)
+        
+        format_frame = ttk.Frame(self.employee_frame)
+        format_frame.pack(fill=tk.X, padx=5, pady=(0, 5))
+        ttk.Label(format_frame, text="Output:").pack(side=tk.LEFT, padx=5)
+        ttk.Combobox(format_frame, textvariable=self.output_format, values=list(OUTPUT_FORMATS),
+                     state="readonly", width=28).pack(side=tk.LEFT, padx=5)
+        # The roster check and the workload report need numpy, which is only looked up here, not imported
+        numpy_buttons = [
+            ttk.Button(format_frame, text="Check Roster", command=self.check_roster),
+            ttk.Button(format_frame, text="Workload Report", command=self.workload_report),
+        ]
+        for button in numpy_buttons:
+            button.pack(side=tk.RIGHT, padx=5)
+        if importlib.util.find_spec("numpy") is not None:
+            self.run_buttons += numpy_buttons
+        else:
+            for button in numpy_buttons:
+                button.config(state="disabled")
+        
+        # Progress of the current run
+        progress_frame = ttk.Frame(self.root)
+        progress_frame.grid(row=5, column=0, padx=10, pady=5, sticky="ew")
+        progress_frame.grid_columnconfigure(0, weight=1)
+        self.progress_bar = ttk.Progressbar(progress_frame, mode="determinate", maximum=1.0)
+        self.progress_bar.grid(row=0, column=0, padx=5, sticky="ew")
+        self.cancel_button = ttk.Button(progress_frame, text="Cancel", command=self.cancel_run, state="disabled")
+        self.cancel_button.grid(row=0, column=1, padx=5)
+        ttk.Label(progress_frame, textvariable=self.progress_text).grid(row=1, column=0, columnspan=2, padx=5, sticky="w")
         
         # Status/log area
         log_frame = ttk.LabelFrame(self.root, text="Status Log")
@@ -115,8 +192,14 @@ class ShiftCalendarApp:
         
         self.log_area = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, height=10)
         self.log_area.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
+        self.log_area.tag_configure("warning", foreground="#b03000")
         self.log_area.config(state=tk.DISABLED)
         
+        log_options = ttk.Frame(log_frame)
+        log_options.grid(row=1, column=0, padx=5, sticky="w")
+        ttk.Checkbutton(log_options, text="Show details", variable=self.show_log_details).pack(side=tk.LEFT, padx=5)
+        ttk.Button(log_options, text="Save Log To...", command=self.choose_log_file).pack(side=tk.LEFT, padx=5)
+        
     def toggle_cath_lab(self):
         if self.include_cath_lab.get():
             self.cath_entry.config(state="normal")
@@ -143,7 +226,7 @@ class ShiftCalendarApp:
             self.log(f"Selected main file: {file_path}")
             
             # Try to extract month and year from filename
-            month, year = self.extract_month_year_from_filename(os.path.basename(file_path))
+            month, year = extract_month_year_from_filename(os.path.basename(file_path))
             self.month.set(month)
             self.year.set(year)
             self.log(f"Detected: Month {month}, Year {year}")
@@ -166,14 +249,68 @@ class ShiftCalendarApp:
             self.ep_file.set(file_path)
             self.log(f"Selected Electrophysiology file: {file_path}")
             
-    def log(self, message, sensitive=False):
-        """Add message to the log area"""
-        sanitized_message = "[REDACTED]" if sensitive else message
-        self.log_area.config(state=tk.NORMAL)
-        self.log_area.insert(tk.END, sanitized_message + "\n")
-        self.log_area.see(tk.END)
-        self.log_area.config(state=tk.DISABLED)
-        print(sanitized_message)  # Also print to console for debugging
+    def log(self, message, sensitive=False, level=logging.INFO):
+        """Queue a message for the log area; safe to call from any thread"""
+        self.log_queue.put(message, sensitive, level)
+        
+    def drain_log(self):
+        """Show the queued log messages in one update of the log area, then poll again"""
+        try:
+            records = self.log_queue.drain()
+            threshold = logging.DEBUG if self.show_log_details.get() else logging.INFO
+            chunks = []
+            for level, text in records:
+                if level < threshold:
+                    continue
+                tag = "warning" if level >= logging.WARNING else ""
+                if chunks and chunks[-1] == tag:
+                    chunks[-2] += text + "\n"
+                else:
+                    chunks += [text + "\n", tag]
+            if chunks:
+                self.log_area.config(state=tk.NORMAL)
+                self.log_area.insert(tk.END, *chunks)
+                lines = int(self.log_area.index("end-1c").split(".")[0])
+                if lines > LOG_MAX_LINES:
+                    self.log_area.delete("1.0", f"{lines - LOG_MAX_LINES + 1}.0")
+                self.log_area.see(tk.END)
+                self.log_area.config(state=tk.DISABLED)
+                # Also print to console for debugging
+                print("".join(chunks[::2]), end="")
+        finally:
+            self.root.after(LOG_POLL_MS, self.drain_log)
+        
+    def choose_log_file(self):
+        """Also append the log, with timestamps and details, to a file"""
+        file_path = filedialog.asksaveasfilename(
+            title="Save Log To",
+            defaultextension=".log",
+            filetypes=[("Log Files", "*.log"), ("All Files", "*.*")]
+        )
+        if not file_path:
+            return
+        try:
+            log_file = LogFile(file_path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not open the log file: {e}")
+            return
+        if self.log_queue.log_file is not None:
+            self.log_queue.log_file.close()
+        self.log_queue.log_file = log_file
+        self.log(f"Saving the log to {file_path}")
+        
+    def open_cache(self):
+        """Open the document cache, or run without one if its folder is not writable"""
+        try:
+            return DocumentCache()
+        except OSError as e:
+            print(f"Document cache disabled: {e}")
+            return None
+        
+    def show_error(self, title, message):
+        """Show an error dialog from any thread"""
+        self.log(f"{title}: {message}", level=logging.ERROR)
+        self.root.after(0, lambda: messagebox.showerror(title, message))
         
     def process_files(self):
         """Process the selected files and populate employee list"""
@@ -188,89 +325,152 @@ class ShiftCalendarApp:
             return
             
         # Start processing in a separate thread to prevent UI freezing
-        threading.Thread(target=self._process_files_thread, daemon=True).start()
+        self.start_run(self._process_files_thread)
         
-    def _process_files_thread(self):
-        """Thread function to process files"""
-        # Clear previous data
-        self.all_shifts = []
-        self.cath_lab_shifts = []
-        self.ep_shifts = []
-        self.all_employees = []
-        
-        # Process main file
-        input_file = self.input_file.get()
-        self.log(f"Processing main file: {input_file}")
+    def process_folder(self):
+        """Process every monthly schedule in a folder together, for calendars covering all the months"""
+        directory = filedialog.askdirectory(title="Select the Folder with the Monthly Schedules")
+        if not directory:
+            return
         
-        month = self.month.get()
-        year = self.year.get()
+        # Start processing in a separate thread to prevent UI freezing
+        self.start_run(self._process_folder_thread, directory)
         
-        # Process Cath Lab file if selected
-        if self.include_cath_lab.get():
-            cath_lab_file = self.cath_lab_file.get()
-            if cath_lab_file and os.path.exists(cath_lab_file):
-                self.log(f"Processing Cath Lab file: {cath_lab_file}")
-                cath_lab_tables = self.read_docx_tables(cath_lab_file)
-                if cath_lab_tables:
-                    for table in cath_lab_tables:
-                        cath_shifts = self.parse_specialty_on_call_table(table)
-                        for shift in cath_shifts:
-                            shift['shift_type'] = "Cath Lab On-Call"
-                        self.cath_lab_shifts.extend(cath_shifts)
-                    self.log(f"Found {len(self.cath_lab_shifts)} Cath Lab on-call shifts")
-                else:
-                    self.log("No tables found in the Cath Lab schedule document.")
-            else:
-                self.log("Cath Lab file not selected or not found.")
-                
-        # Process EP file if selected
-        if self.include_ep.get():
-            ep_file = self.ep_file.get()
-            if ep_file and os.path.exists(ep_file):
-                self.log(f"Processing Electrophysiology file: {ep_file}")
-                ep_tables = self.read_docx_tables(ep_file)
-                if ep_tables:
-                    for table in ep_tables:
-                        electro_shifts = self.parse_specialty_on_call_table(table)
-                        for shift in electro_shifts:
-                            shift['shift_type'] = "Electrophysiology On-Call"
-                        self.ep_shifts.extend(electro_shifts)
-                    self.log(f"Found {len(self.ep_shifts)} Electrophysiology on-call shifts")
-                else:
-                    self.log("No tables found in the Electrophysiology schedule document.")
-            else:
-                self.log("Electrophysiology file not selected or not found.")
-                
-        # Process main file tables
-        tables = self.read_docx_tables(input_file)
+    def load_history(self):
+        """Load the selected month's shifts from the history database instead of the documents"""
+        year, month = self.year.get(), self.month.get()
+        self.start_run(self._load_history_thread, date(year, month, 1), date(year, month, monthrange(year, month)[1]))
         
-        if not tables:
-            self.log("No tables found in the main document.")
+    def start_run(self, target, *args):
+        """Run target(*args) on a worker thread, unless another run is still going"""
+        if self.run_thread is not None:
+            messagebox.showinfo("Busy", "Please wait for the current run to finish, or cancel it.")
             return
-            
-        # Parse shifts from tables
-        if len(tables) >= 1:
-            self.log("Parsing first table (Regular/On-Call shifts)...")
-            first_table_shifts = self.parse_first_table(tables[0], month, year)
-            self.all_shifts.extend(first_table_shifts)
-            self.log(f"Found {len(first_table_shifts)} shifts in first table")
-            
-        if len(tables) >= 2:
-            self.log("Parsing second table (Μεγάλη/Μικρή/ΤΕΠ shifts)...")
-            second_table_shifts = self.parse_second_table(tables[1], month, year)
-            self.all_shifts.extend(second_table_shifts)
-            self.log(f"Found {len(second_table_shifts)} shifts in second table")
-            
-        if not self.all_shifts:
-            self.log("No shifts found in any table!")
+        self.core.progress.reset()
+        for button in self.run_buttons:
+            button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.run_thread = threading.Thread(target=self._run, args=(target, args), daemon=True)
+        self.run_thread.start()
+        self.root.after(PROGRESS_POLL_MS, self.poll_progress)
+        
+    def _run(self, target, args):
+        try:
+            target(*args)
+        finally:
+            self.root.after(0, self._run_finished)
+        
+    def _run_finished(self):
+        self.run_thread = None
+        for button in self.run_buttons:
+            button.config(state="normal")
+        self.cancel_button.config(state="disabled")
+        self.show_progress()
+        
+    def cancel_run(self):
+        """Stop the current run at the next file, row or calendar"""
+        self.core.progress.cancel()
+        self.cancel_button.config(state="disabled")
+        self.log("Cancelling...")
+        
+    def poll_progress(self):
+        """Refresh the progress display while a run is going"""
+        if self.run_thread is None:
             return
-            
-        # Get unique employee names
-        self.all_employees = sorted(set(shift['employee'] for shift in self.all_shifts))
-        self.log(f"Found {len(self.all_shifts)} total shift assignments for {len(self.all_employees)} employees")
+        self.show_progress()
+        self.root.after(PROGRESS_POLL_MS, self.poll_progress)
+        
+    def show_progress(self):
+        """Show the counts of the current or last run, the bar following its latest stage"""
+        counts = self.core.progress.snapshot()
+        parts = []
+        fraction = None
+        for counter, label in (("files", "files read"), ("rows", "rows parsed"), ("calendars", "calendars written")):
+            done, total = counts[counter]
+            if total:
+                parts.append(f"{done:,}/{total:,} {label}")
+                fraction = done / total
+            elif done:
+                # Counted as they stream by, with no total to show progress against
+                parts.append(f"{done:,} {label}")
+        text = ", ".join(parts)
+        if self.core.progress.cancelled:
+            text += " (cancelled)"
+        if text != self.progress_text.get():
+            self.progress_text.set(text)
+        if fraction is not None:
+            self.progress_bar.config(value=fraction)
+        
+    def _process_folder_thread(self, directory):
+        """Thread function to process the schedules of a folder"""
+        self._update_profiler()
+        self._update_history()
+        self.core.direct_doc = self.direct_doc.get()
+        jobs = []
+        for job in find_batch_jobs(directory, self.log):
+            if job['main']:
+                jobs.append(job)
+            else:
+                self.log(f"Skipping {job['month']}/{job['year']}: no main schedule found", level=logging.WARNING)
+        found = self.core.process_schedules(jobs)
+        self.core.log_profile()
+        
+        if found:
+            # Update UI with employee list (in main thread)
+            self.root.after(0, self.update_employee_list)
+        
+    def _load_history_thread(self, start, end):
+        """Thread function to load shifts from the history database"""
+        self._update_profiler()
+        if self.core.history is None:
+            self.core.history = self.open_history()
+        found = self.core.process_history(start, end)
+        self.core.log_profile()
+        
+        if found:
+            # Update UI with employee list (in main thread)
+            self.root.after(0, self.update_employee_list)
+        
+    def _update_history(self):
+        """Store the processed shifts in the history database while "Keep shift history" is checked"""
+        if not self.keep_history.get():
+            self.core.history = None
+        elif self.core.history is None:
+            self.core.history = self.open_history()
+        
+    @staticmethod
+    def open_history():
+        """The history database in the user data folder"""
+        # Imported here: sqlite3 is only needed with a history database
+        from shift_calendar.history import ShiftHistory
+        return ShiftHistory()
+        
+    def _update_profiler(self):
+        """Measure the stages of the core's runs while "Measure stage timings" is checked"""
+        if self.profile_stages.get():
+            if self.core.profiler is None:
+                self.core.profiler = StageProfiler()
+        elif self.core.profiler is not None:
+            self.core.profiler.close()
+            self.core.profiler = None
+        
+    def _process_files_thread(self):
+        """Thread function to process files"""
+        self._update_profiler()
+        self._update_history()
+        self.core.direct_doc = self.direct_doc.get()
+        found = self.core.process_files(
+            self.input_file.get(),
+            self.month.get(),
+            self.year.get(),
+            cath_lab_file=self.cath_lab_file.get() if self.include_cath_lab.get() else None,
+            ep_file=self.ep_file.get() if self.include_ep.get() else None
+        )
+        self.core.log_profile()
         
-        # Update UI with employee list (in main thread)
-        self.root.after(0, self.update_employee_list)
+        if found:
+            # Update UI with employee list (in main thread)
+            self.root.after(0, self.update_employee_list)
         
     def update_employee_list(self):
         """Update the employee listbox with found employees"""
@@ -279,7 +479,7 @@ class ShiftCalendarApp:
         
         # Clear and populate listbox
         self.employee_listbox.delete(0, tk.END)
-        for emp in self.all_employees:
+        for emp in self.core.all_employees:
             self.employee_listbox.insert(tk.END, emp)
             
         self.log("Please select employee(s) to generate calendar for")
@@ -296,7 +496,7 @@ class ShiftCalendarApp:
         
     def generate_all(self):
         """Generate calendars for all employees"""
-        self.generate_calendars(self.all_employees)
+        self.generate_calendars(self.core.all_employees)
         
     def generate_calendars(self, employees):
         """Generate calendar files for the specified employees"""
@@ -312,552 +512,80 @@ class ShiftCalendarApp:
         self.log(f"Generating calendars for {len(employees)} employees...")
         
         # Start generation in a separate thread
-        threading.Thread(target=self._generate_calendars_thread, 
-                         args=(employees, output_dir), 
-                         daemon=True).start()
+        self.start_run(self._generate_calendars_thread, employees, output_dir)
             
     def _generate_calendars_thread(self, employees, output_dir):
         """Thread function to generate calendar files"""
-        success_count = 0
-        
-        for employee in employees:
-            output_file = os.path.join(output_dir, f"{employee.replace(' ', '_')}_shifts.ics")
-            
-            # Create calendar
-            result = self.create_calendar_for_employee(
-                self.all_shifts, 
-                employee, 
-                output_file, 
-                self.cath_lab_shifts, 
-                self.ep_shifts
-            )
-            
-            if result:
-                success_count += 1
-                self.log(f"Calendar created successfully for employee: [REDACTED]", sensitive=True)
-            else:
-                self.log(f"Failed to create calendar for employee: [REDACTED]", sensitive=True)
-                
-        self.log(f"Completed! Generated {success_count} calendars in the selected output directory")
+        self._update_profiler()
+        success_count = self.core.generate_calendars(
+            employees,
+            output_dir,
+            parallel=self.parallel_generation.get(),
+            fast_writer=self.fast_writer.get(),
+            incremental=self.incremental.get(),
+            archive=OUTPUT_FORMATS[self.output_format.get()]
+        )
+        # The timing report covers processing the files and generating the calendars
+        self.core.log_profile(output_dir)
         
         # Show completion message
-        self.root.after(0, lambda: messagebox.showinfo(
-            "Complete", 
-            f"Generated {success_count} of {len(employees)} calendars."
-        ))
-
-    # Core functionality methods (adapted from original code)
-    def extract_month_year_from_filename(self, filename):
-        """Attempt to extract month and year from the filename."""
-        # Example: "ΕΦΗΜΕΡΙΕΣ ΜΑΡΤΙΟΣ 2025.docx"
-        month_dict = {
-            "ΙΑΝΟΥΑΡΙΟΣ": 1, "ΦΕΒΡΟΥΑΡΙΟΣ": 2, "ΜΑΡΤΙΟΣ": 3, "ΑΠΡΙΛΙΟΣ": 4,
-            "ΜΑΙΟΣ": 5, "ΙΟΥΝΙΟΣ": 6, "ΙΟΥΛΙΟΣ": 7, "ΑΥΓΟΥΣΤΟΣ": 8,
-            "ΣΕΠΤΕΜΒΡΙΟΣ": 9, "ΟΚΤΩΒΡΙΟΣ": 10, "ΝΟΕΜΒΡΙΟΣ": 11, "ΔΕΚΕΜΒΡΙΟΣ": 12
-        }
-        
-        # Default to current month and year if extraction fails
-        default_month = datetime.now().month
-        default_year = datetime.now().year
-        
-        try:
-            # Try to extract month name and year
-            for month_name, month_num in month_dict.items():
-                if month_name in filename:
-                    # Found month, now look for year
-                    year_match = re.search(r'20\d\d', filename)
-                    if year_match:
-                        year = int(year_match.group())
-                        return month_num, year
-                    return month_num, default_year
-                
-        except:
-            pass
-        
-        return default_month, default_year
-
-    def convert_doc_to_docx(self, doc_path):
-        """Convert a .doc file to .docx format using available tools."""
-        file_name, file_ext = os.path.splitext(doc_path)
-        
-        # If already a docx file, return the original path
-        if file_ext.lower() == '.docx':
-            return doc_path
-        
-        # Create a temporary output file
-        temp_dir = tempfile.gettempdir()
-        base_name = os.path.basename(file_name)
-        output_path = os.path.join(temp_dir, f"{base_name}_converted.docx")
-        
-        conversion_successful = False
-        error_message = ""
-        
-        # Try LibreOffice first (cross-platform)
-        try:
-            # Determine LibreOffice executable based on platform
-            libreoffice_cmd = None
-            if platform.system() == "Windows":
-                # Check common install locations
-                possible_paths = [
-                    r"C:\Program Files\LibreOffice\program\soffice.exe",
-                    r"C:\Program Files (x86)\LibreOffice\program\soffice.exe"
-                ]
-                for path in possible_paths:
-                    if os.path.exists(path):
-                        libreoffice_cmd = path
-                        break
-            elif platform.system() == "Darwin":  # macOS
-                libreoffice_cmd = "/Applications/LibreOffice.app/Contents/MacOS/soffice"
-            else:  # Linux and others
-                libreoffice_cmd = "libreoffice"
-            
-            if libreoffice_cmd:
-                process = subprocess.run([
-                    libreoffice_cmd,
-                    "--headless",
-                    "--convert-to", "docx",
-                    "--outdir", temp_dir,
-                    doc_path
-                ], capture_output=True, text=True, timeout=30)
-                
-                # LibreOffice sometimes creates with original filename in the output dir
-                expected_file = os.path.join(temp_dir, f"{base_name}.docx")
-                if os.path.exists(expected_file):
-                    # Rename to our expected output path
-                    shutil.move(expected_file, output_path)
-                    conversion_successful = True
-                else:
-                    error_message = f"LibreOffice conversion output file not found: {expected_file}"
-        except Exception as e:
-            error_message = f"LibreOffice conversion failed: {str(e)}"
-        
-        # If LibreOffice failed, try Microsoft Word automation (Windows only)
-        if not conversion_successful and platform.system() == "Windows":
-            try:
-                import win32com.client
-                word = win32com.client.Dispatch("Word.Application")
-                word.Visible = False
-                
-                doc = word.Documents.Open(doc_path)
-                doc.SaveAs(output_path, FileFormat=16)  # 16 = docx format
-                doc.Close()
-                word.Quit()
-                
-                if os.path.exists(output_path):
-                    conversion_successful = True
-                else:
-                    error_message += "\nMicrosoft Word conversion output file not found."
-            except Exception as e:
-                error_message += f"\nMicrosoft Word conversion failed: {str(e)}"
-        
-        if conversion_successful:
-            self.log(f"Successfully converted {doc_path} to {output_path}")
-            return output_path
+        counts = self.core.generation_counts
+        if self.incremental.get() and not OUTPUT_FORMATS[self.output_format.get()]:
+            # Unchanged calendars are done but not written again
+            message = (f"Generated {counts['new'] + counts['updated']} of {len(employees)} calendars, "
+                       f"{counts['skipped']} unchanged.\n{counts['new']} new, {counts['updated']} updated.")
         else:
-            self.log(f"Failed to convert .doc to .docx: {error_message}")
-            raise Exception(f"Could not convert {doc_path} to .docx format. Please convert it manually and try again.")
-
-    def read_docx_tables(self, file_path):
-        """Read all tables content from a DOCX file."""
-        try:
-            # Check if file is .doc and convert if needed
-            file_ext = os.path.splitext(file_path)[1].lower()
-            if file_ext == '.doc':
-                self.log("Converting .doc file to .docx format...")
-                file_path = self.convert_doc_to_docx(file_path)
-            
-            doc = docx.Document(file_path)
-            if not doc.tables:
-                self.log("No tables found in the document.")
-                return []
-            
-            tables_data = []
-            
-            for table_index, table in enumerate(doc.tables):
-                rows = []
-                for row in table.rows:
-                    row_data = [cell.text.strip() for cell in row.cells]
-                    # Skip empty rows
-                    if any(row_data):
-                        rows.append(row_data)
-                
-                tables_data.append(rows)
-                self.log(f"Table {table_index+1}: Found {len(rows)} rows with data")
-            
-            return tables_data
-        except Exception as e:
-            self.log(f"Error reading document: {e}")
-            if "Could not convert" in str(e):
-                # This is our custom error from conversion function
-                self.log(str(e))
-            messagebox.showerror("Error", f"Could not process the document: {e}")
-            return []
+            message = f"Generated {success_count} of {len(employees)} calendars."
+        if self.core.progress.cancelled:
+            message = "Cancelled. " + message
+        self.root.after(0, lambda: messagebox.showinfo("Complete", message))
 
-    def parse_first_table(self, rows, month, year):
-        """Parse the first table format (Regular and On-Call shifts) with month rollover detection."""
-        shifts = []
-        current_month = month
-        current_year = year
-        last_day = 0  # Track the last day number we've seen
-        
-        # Dictionary of Greek month names to month numbers
-        greek_months = {
-            "ΙΑΝΟΥΑΡΙΟΥ": 1, "ΦΕΒΡΟΥΑΡΙΟΥ": 2, "ΜΑΡΤΙΟΥ": 3, "ΑΠΡΙΛΙΟΥ": 4,
-            "ΜΑΙΟΥ": 5, "ΙΟΥΝΙΟΥ": 6, "ΙΟΥΛΙΟΥ": 7, "ΑΥΓΟΥΣΤΟΥ": 8,
-            "ΣΕΠΤΕΜΒΡΙΟΥ": 9, "ΟΚΤΩΒΡΙΟΥ": 10, "ΝΟΕΜΒΡΙΟΥ": 11, "ΔΕΚΕΜΒΡΙΟΥ": 12,
-            "ΙΑΝΟΥΑΡΙΟΣ": 1, "ΦΕΒΡΟΥΑΡΙΟΣ": 2, "ΜΑΡΤΙΟΣ": 3, "ΑΠΡΙΛΙΟΣ": 4,
-            "ΜΑΙΟΣ": 5, "ΙΟΥΝΙΟΣ": 6, "ΙΟΥΛΙΟΣ": 7, "ΑΥΓΟΥΣΤΟΣ": 8,
-            "ΣΕΠΤΕΜΒΡΙΟΣ": 9, "ΟΚΤΩΒΡΙΟΣ": 10, "ΝΟΕΜΒΡΙΟΣ": 11, "ΔΕΚΕΜΒΡΙΟΣ": 12
-        }
-        
-        for row in rows:
-            if len(row) < 4:  # Ensure row has enough columns
-                continue
-            
-            try:
-                # Extract day, month_text, day_of_week, and employees
-                day = row[0].strip()
-                month_text = row[1].strip() if len(row) > 1 else ""
-                day_of_week = row[2].strip()
-                employees_cell = row[3].strip()
-                
-                # Skip header rows or rows without day number
-                if not day or not day[0].isdigit():
-                    continue
-                
-                # Handle special formatting like "*01**" for May 1st
-                day = day.strip("*").strip()
-                if not day.isdigit():
-                    continue
-                    
-                day = int(day)
-                
-                # Check for explicit month name in the month_text field
-                found_month = None
-                for greek_month, month_num in greek_months.items():
-                    if greek_month in month_text:
-                        found_month = month_num
-                        break
-                
-                if found_month is not None:
-                    # Use explicitly mentioned month
-                    current_month = found_month
-                    # If the new month is less than the original month, we've moved to next year
-                    if current_month < month and month > 10 and current_month < 3:
-                        current_year += 1
-                    self.log(f"Explicit month found: now processing {current_month}/{current_year}")
-                elif day < last_day and last_day > 20 and day < 10:
-                    # Move to next month based on day number patterns
-                    current_month += 1
-                    if current_month > 12:
-                        current_month = 1
-                        current_year += 1
-                    self.log(f"Month rollover detected: now processing {current_month}/{current_year}")
-                
-                last_day = day
-                
-                # Parse employee names (may contain two employees, one with asterisk)
-                employees = employees_cell.split('\n')
-                employees = [e.strip() for e in employees if e.strip()]
-                
-                for employee in employees:
-                    is_on_call = "*" in employee
-                    employee_name = employee.replace("*", "").strip()
-                    
-                    # Create shift date using current_month and current_year
-                    shift_date = date(current_year, current_month, day)
-                    
-                    shift_type = "On-Call Shift" if is_on_call else "Regular Shift"
-                    
-                    shifts.append({
-                        'employee': employee_name,
-                        'date': shift_date,
-                        'day_of_week': day_of_week,
-                        'shift_type': shift_type
-                    })
-            except Exception as e:
-                self.log(f"Error parsing row in first table {row}: {e}")
-                continue
-        
-        return shifts
-
-    def parse_second_table(self, rows, month, year):
-        """Parse the second table format (Μεγάλη, Μικρή, ΤΕΠ shifts) with month rollover detection."""
-        shifts = []
-        current_month = month
-        current_year = year
-        last_day = 0  # Track the last day number we've seen
-        
-        # Dictionary of Greek month names to month numbers
-        greek_months = {
-            "ΙΑΝΟΥΑΡΙΟΥ": 1, "ΦΕΒΡΟΥΑΡΙΟΥ": 2, "ΜΑΡΤΙΟΥ": 3, "ΑΠΡΙΛΙΟΥ": 4,
-            "ΜΑΙΟΥ": 5, "ΙΟΥΝΙΟΥ": 6, "ΙΟΥΛΙΟΥ": 7, "ΑΥΓΟΥΣΤΟΥ": 8,
-            "ΣΕΠΤΕΜΒΡΙΟΥ": 9, "ΟΚΤΩΒΡΙΟΥ": 10, "ΝΟΕΜΒΡΙΟΥ": 11, "ΔΕΚΕΜΒΡΙΟΥ": 12,
-            "ΙΑΝΟΥΑΡΙΟΣ": 1, "ΦΕΒΡΟΥΑΡΙΟΣ": 2, "ΜΑΡΤΙΟΣ": 3, "ΑΠΡΙΛΙΟΣ": 4,
-            "ΜΑΙΟΣ": 5, "ΙΟΥΝΙΟΣ": 6, "ΙΟΥΛΙΟΣ": 7, "ΑΥΓΟΥΣΤΟΣ": 8,
-            "ΣΕΠΤΕΜΒΡΙΟΣ": 9, "ΟΚΤΩΒΡΙΟΣ": 10, "ΝΟΕΜΒΡΙΟΣ": 11, "ΔΕΚΕΜΒΡΙΟΣ": 12
-        }
-        
-        for row in rows:
-            if len(row) < 6:  # Ensure row has enough columns for second table format
-                continue
-            
-            try:
-                # Extract day, month_text, day_of_week, and employees from different shifts
-                day = row[0].strip()
-                month_text = row[1].strip() if len(row) > 1 else ""
-                day_of_week = row[2].strip()
-                megali_shift = row[3].strip()
-                mikri_shift = row[4].strip()
-                tep_shift = row[5].strip()
-                
-                # Skip header rows or rows without day number
-                if not day or not day[0].isdigit():
-                    continue
-                
-                # Handle special formatting like "*01**" for May 1st
-                day = day.strip("*").strip()
-                if not day.isdigit():
-                    continue
-                    
-                day = int(day)
-                
-                # Check for explicit month name in the month_text field
-                found_month = None
-                for greek_month, month_num in greek_months.items():
-                    if greek_month in month_text:
-                        found_month = month_num
-                        break
-                
-                if found_month is not None:
-                    # Use explicitly mentioned month
-                    current_month = found_month
-                    # If the new month is less than the original month, we've moved to next year
-                    if current_month < month and month > 10 and current_month < 3:
-                        current_year += 1
-                    self.log(f"Explicit month found: now processing {current_month}/{current_year}")
-                elif day < last_day and last_day > 20 and day < 10:
-                    # Move to next month based on day number patterns
-                    current_month += 1
-                    if current_month > 12:
-                        current_month = 1
-                        current_year += 1
-                    self.log(f"Month rollover detected: now processing {current_month}/{current_year}")
-                
-                last_day = day
-                
-                # Use current_month and current_year for the shift date
-                shift_date = date(current_year, current_month, day)
-                
-                # Process Μεγάλη shift (24h)
-                if megali_shift:
-                    employee_name = megali_shift.replace(">", "").strip()
-                    if employee_name:
-                        shifts.append({
-                            'employee': employee_name,
-                            'date': shift_date,
-                            'day_of_week': day_of_week,
-                            'shift_type': "Μεγάλη Shift (24h)"
-                        })
-                
-                # Process Μικρή shift (24h)
-                if mikri_shift:
-                    employee_name = mikri_shift.replace(">", "").strip()
-                    if employee_name:
-                        shifts.append({
-                            'employee': employee_name,
-                            'date': shift_date,
-                            'day_of_week': day_of_week,
-                            'shift_type': "Μικρή Shift (24h)"
-                        })
-                
-                # Process ΤΕΠ shift (12h)
-                if tep_shift:
-                    employee_name = tep_shift.replace(">", "").strip()
-                    if employee_name:
-                        shifts.append({
-                            'employee': employee_name,
-                            'date': shift_date,
-                            'day_of_week': day_of_week,
-                            'shift_type': "TEP Shift (12h)"
-                        })
-                    
-            except Exception as e:
-                self.log(f"Error parsing row in second table {row}: {e}")
-                continue
-        
-        return shifts
-
-    def parse_specialty_on_call_table(self, rows):
-        """Parse the specialty on-call table format with date (DD-MM-YYYY or DD/MM/YYYY) in first column."""
-        shifts = []
-        
-        for row in rows:
-            if len(row) < 3:  # Ensure row has enough columns
-                continue
-            
-            try:
-                # Extract date, day_of_week, and employee
-                date_str = row[0].strip()
-                day_of_week = row[1].strip()
-                employee_name = row[2].strip()
-                
-                # Skip header rows or rows without proper date format
-                # Updated regex to match both DD-MM-YYYY and DD/MM/YYYY formats
-                if not re.match(r"\d{1,2}[-/]\d{1,2}[-/]\d{4}", date_str):
-                    continue
-                
-                # Parse date (supports both DD-MM-YYYY and DD/MM/YYYY)
-                if '-' in date_str:
-                    day, month, year = map(int, date_str.split('-'))
-                elif '/' in date_str:
-                    day, month, year = map(int, date_str.split('/'))
-                else:
-                    continue  # Skip if date format doesn't match either pattern
-                    
-                shift_date = date(year, month, day)
-                
-                if employee_name:
-                    shifts.append({
-                        'employee': employee_name,
-                        'date': shift_date,
-                        'day_of_week': day_of_week,
-                        'shift_type': "On-Call Specialty",  # Will be updated when adding to all_shifts
-                    })
-                    
-            except Exception as e:
-                self.log(f"Error parsing row in specialty on-call table {row}: {e}")
-                continue
-        
-        return shifts
-
-    def create_calendar_for_employee(self, shifts, employee_name, output_file, cath_lab_shifts=None, ep_shifts=None):
-        """Create an iCalendar file with all-day events for a specific employee."""
-        # Filter shifts for this specific employee
-        employee_shifts = [s for s in shifts if s['employee'].lower() == employee_name.lower()]
-        
-        # Also check if the employee has any cath lab or EP shifts
-        employee_cath_lab_shifts = []
-        employee_ep_shifts = []
-        
-        if cath_lab_shifts:
-            employee_cath_lab_shifts = [s for s in cath_lab_shifts if s['employee'].lower() == employee_name.lower()]
-            
-        if ep_shifts:
-            employee_ep_shifts = [s for s in ep_shifts if s['employee'].lower() == employee_name.lower()]
-        
-        if not employee_shifts and not employee_cath_lab_shifts and not employee_ep_shifts:
-            self.log("No shifts found for the specified employee", sensitive=True)
-            return None
+    def check_roster(self):
+        """Check the processed shifts for double bookings, missed rest and overloaded weeks"""
+        if not self.core.all_shifts:
+            messagebox.showinfo("Information", "Please process the schedule files first.")
+            return
+        csv_path = filedialog.asksaveasfilename(
+            title="Save the Roster Check As",
+            initialfile=CHECK_FILE_NAME,
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv")]
+        )
+        if not csv_path:
+            return
+        self.start_run(self._check_roster_thread, csv_path)
         
-        cal = Calendar()
-        cal.add('prodid', '-//Employee Shift Calendar//example.com//')
-        cal.add('version', '2.0')
-        cal.add('calscale', 'GREGORIAN')
-        
-        # Group shifts by date to combine multiple shifts on the same day
-        shifts_by_date = {}
-        
-        # Add regular shifts to the grouping
-        for shift in employee_shifts:
-            date_key = shift['date'].isoformat()
-            if date_key not in shifts_by_date:
-                shifts_by_date[date_key] = []
-            shifts_by_date[date_key].append(shift)
-        
-        # Add cath lab shifts if they don't overlap with existing dates
-        for shift in employee_cath_lab_shifts:
-            date_key = shift['date'].isoformat()
-            if date_key not in shifts_by_date:
-                shifts_by_date[date_key] = []
-            shifts_by_date[date_key].append(shift)
-        
-        # Add EP shifts if they don't overlap with existing dates
-        for shift in employee_ep_shifts:
-            date_key = shift['date'].isoformat()
-            if date_key not in shifts_by_date:
-                shifts_by_date[date_key] = []
-            shifts_by_date[date_key].append(shift)
-        
-        # Create events for each date, combining shift information
-        for date_key, date_shifts in shifts_by_date.items():
-            event = Event()
-            
-            # Combine all shift types for the summary
-            shift_types = [s['shift_type'] for s in date_shifts]
-            day_of_week = date_shifts[0]['day_of_week']  # They all have the same date
-            shift_date = date_shifts[0]['date']
-            
-            # Format the summary to show all shift types
-            summary = f"{', '.join(shift_types)} - {day_of_week}"
-            event.add('summary', summary)
-            
-            # All-day events need a DATE value type
-            event.add('dtstart', shift_date)
-            
-            # For all-day events, the end date should be the next day
-            # The end date is non-inclusive in the iCalendar spec
-            end_date = shift_date + timedelta(days=1)
-            event.add('dtend', end_date)
-            
-            event.add('dtstamp', datetime.now())
-            
-            # Generate a unique ID for the event
-            uid = f"{employee_name.replace(' ', '')}-{shift_date.strftime('%Y%m%d')}@shifts.example.com"
-            event.add('uid', uid)
-            
-            # Add description with details about all employees working that day
-            description_parts = [f"Your shifts: {', '.join(shift_types)}"]
-            
-            # Find all employees working on this date
-            coworkers_info = []
-            for s in shifts:
-                # If it's the same date but not the current employee
-                if s['date'] == shift_date and s['employee'].lower() != employee_name.lower():
-                    coworkers_info.append(f"{s['employee']}: {s['shift_type']}")
-            
-            # Add coworkers section if any exist
-            if coworkers_info:
-                description_parts.append("\nCoworkers on this day:")
-                for info in sorted(coworkers_info):
-                    description_parts.append(f"- {info}")
-            else:
-                description_parts.append("\nNo other employees scheduled on this day.")
-            
-            # Add Cath Lab on-call information if available
-            if cath_lab_shifts:
-                cath_lab_employee = None
-                for shift in cath_lab_shifts:
-                    if shift['date'] == shift_date and shift['employee'].lower() != employee_name.lower():
-                        cath_lab_employee = shift['employee']
-                        break
-                
-                if cath_lab_employee:
-                    description_parts.append(f"\nCath Lab On-Call: {cath_lab_employee}")
-            
-            # Add Electrophysiology on-call information if available
-            if ep_shifts:
-                ep_employee = None
-                for shift in ep_shifts:
-                    if shift['date'] == shift_date and shift['employee'].lower() != employee_name.lower():
-                        ep_employee = shift['employee']
-                        break
-                
-                if ep_employee:
-                    description_parts.append(f"\nElectrophysiology On-Call: {ep_employee}")
-            
-            event.add('description', "\n".join(description_parts))
-            
-            cal.add_component(event)
+    def _check_roster_thread(self, csv_path):
+        violations = self.core.check_roster(csv_path)
+        if violations is None:
+            self.show_error("Error", "The roster check needs the numpy package (pip install numpy).")
+            return
+        message = (f"Found {len(violations)} possible problems, listed in {csv_path}." if violations
+                   else "Found no double bookings, back-to-back 24h shifts or overloaded weeks.")
+        self.root.after(0, lambda: messagebox.showinfo("Roster Check", message))
+        
+    def workload_report(self):
+        """Save each employee's shift counts by type, weekday and month, and weekend and holiday duties"""
+        if not self.core.all_shifts:
+            messagebox.showinfo("Information", "Please process the schedule files first.")
+            return
+        csv_path = filedialog.asksaveasfilename(
+            title="Save the Workload Report As",
+            initialfile=WORKLOAD_FILE_NAME,
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv")]
+        )
+        if not csv_path:
+            return
+        self.start_run(self._workload_report_thread, csv_path)
         
-        # Write to file
-        try:
-            with open(output_file, 'wb') as f:
-                f.write(cal.to_ical())
-            return output_file
-        except Exception as e:
-            self.log(f"Error saving calendar file: {e}")
-            return None
+    def _workload_report_thread(self, csv_path):
+        workload = self.core.analyze_workload(csv_path)
+        if workload is None:
+            self.show_error("Error", "The workload report needs the numpy package (pip install numpy).")
+            return
+        message = f"Saved the workload of {len(workload.employees)} employees to {csv_path}."
+        self.root.after(0, lambda: messagebox.showinfo("Workload Report", message))
 
 
 def main():
@@ -872,7 +600,13 @@ def main():
         pass
     
     app = ShiftCalendarApp(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        app.core.close()
+        app.log_queue.close()
 
 if __name__ == "__main__":
+    # Needed for the process pool workers in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
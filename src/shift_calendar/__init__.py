@@ -0,0 +1,40 @@
+"""Shift calendar generation without the GUI.
+
+Parses the Word shift schedules and writes one iCalendar file per employee.
+"""
+from .analytics import WORKLOAD_FILE_NAME, Workload
+from .cache import DocumentCache, default_cache_dir
+from .calendars import (
+    CALENDAR_PRODID,
+    build_employee_calendar,
+    calendar_from_events,
+    employee_events,
+    write_calendar_stream,
+    write_employee_calendar,
+    write_events,
+    write_events_to,
+)
+from .checks import CHECK_FILE_NAME, RULES, Violation, check_roster, write_violations
+from .converter import ConversionError, LibreOfficeConverter, find_libreoffice
+from .core import (
+    PARSER_VERSION,
+    ShiftCalendarCore,
+    calendar_file_name,
+    classify_schedule,
+    extract_month_year_from_filename,
+    find_batch_jobs,
+    find_month_year_in_filename,
+    merge_months,
+)
+from .doc_tables import read_doc_tables
+from .docx_tables import UnsupportedDocument, iter_tables_fast, read_tables_fast
+from .incremental import CalendarState, event_fingerprint, update_employee_calendar
+from .matrix import ShiftMatrix
+from .months import find_month, normalize_greek
+from .output import ARCHIVE_FILE_NAMES, AtomicFiles
+from .profiling import PROFILE_FILE_NAME, StageProfiler, profile_stage
+from .progress import RunCancelled, RunProgress
+from .roster import RosterIndex
+from .shifts import (FIRST_TABLE_TYPES, HOURS_24_TYPES, MAIN_TYPES, SECOND_TABLE_TYPES, SPECIALTY_TYPES, Shift,
+                     employee_key)
+from .watch import WATCH_STATE_FILE_NAME, FolderWatcher
@@ -0,0 +1,94 @@
+"""Workload of each employee: shift counts by type, weekday and month, weekend and holiday duties.
+
+The counts are sums over a ShiftMatrix of the shifts, so the shifts are
+gone through once and every breakdown is an array reduction: weekdays by
+multiplying with a day × weekday indicator matrix, months by summing the
+runs of consecutive days of each month. Years of a large department take a
+fraction of a second.
+"""
+import csv
+
+from .matrix import ShiftMatrix
+from .shifts import MAIN_TYPES, SPECIALTY_TYPES
+
+WORKLOAD_FILE_NAME = "workload.csv"
+
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+class Workload:
+    """Shift counts of each employee over the period of the shifts.
+
+    For employees[e]:
+    - by_type[e, t]: shifts of types[t], the main and specialty types in
+      their usual order first;
+    - by_weekday[e, w]: main shifts on weekday w (Monday is 0);
+    - by_month[e, m]: main shifts in months[m], a (year, month);
+    - weekends[e] and holidays[e]: main shifts on Saturdays and Sundays, and
+      on the holiday dates given.
+    """
+
+    def __init__(self, shifts, cath_lab_shifts=(), ep_shifts=(), holidays=()):
+        # Imported here: numpy is only needed for the analytics
+        import numpy as np
+
+        matrix = ShiftMatrix(shifts, cath_lab_shifts, ep_shifts)
+        known = [shift_type for shift_type in MAIN_TYPES + SPECIALTY_TYPES if shift_type in matrix.types]
+        order = [matrix.types.index(shift_type) for shift_type in known]
+        order += [index for index in range(len(matrix.types)) if index not in order]
+        self.employees = matrix.employees
+        self.types = [matrix.types[index] for index in order]
+        counts = matrix.counts
+        self.by_type = counts.sum(axis=1, dtype=np.int32)[:, order]
+
+        main = counts[:, :, matrix.type_mask(MAIN_TYPES)].sum(axis=2, dtype=np.int32)
+        weekdays = np.array([day.weekday() for day in matrix.dates], dtype=np.intp)
+        self.by_weekday = main @ (weekdays[:, None] == np.arange(7)).astype(np.int32)
+        self.weekends = main[:, weekdays >= 5].sum(axis=1)
+        holidays = set(holidays)
+        self.holidays = main[:, np.array([day in holidays for day in matrix.dates], dtype=bool)].sum(axis=1)
+
+        # Days are consecutive, so each month is one run of columns
+        month_ids = np.array([day.year * 12 + day.month for day in matrix.dates], dtype=np.int64)
+        starts = np.flatnonzero(np.diff(month_ids, prepend=-1))
+        self.months = [(matrix.dates[start].year, matrix.dates[start].month) for start in starts]
+        self.by_month = (np.add.reduceat(main, starts, axis=1) if len(starts)
+                         else np.zeros((len(self.employees), 0), dtype=np.int32))
+
+    def header(self):
+        """Column names of rows()"""
+        return (["employee"] + self.types + ["weekend", "holiday"] + list(WEEKDAY_NAMES)
+                + [f"{year:04d}-{month:02d}" for year, month in self.months])
+
+    def rows(self):
+        """One list of counts per employee, sorted by name, in the order of header()"""
+        for index in sorted(range(len(self.employees)), key=lambda index: self.employees[index]):
+            yield ([self.employees[index]] + self.by_type[index].tolist()
+                   + [int(self.weekends[index]), int(self.holidays[index])]
+                   + self.by_weekday[index].tolist() + self.by_month[index].tolist())
+
+    def spread(self):
+        """(label, lowest, median, highest) count per person of each type, weekends and holidays.
+
+        Main schedule counts are taken over the employees with any main shift,
+        specialty counts over those with any shift of that schedule, so that
+        the two rosters do not count each other's staff as having none.
+        """
+        import numpy as np
+
+        main_columns = [index for index, shift_type in enumerate(self.types) if shift_type in MAIN_TYPES]
+        on_main = self.by_type[:, main_columns].sum(axis=1) > 0
+        columns = [(shift_type, self.by_type[:, index], on_main if shift_type in MAIN_TYPES
+                    else self.by_type[:, index] > 0)
+                   for index, shift_type in enumerate(self.types)]
+        columns += [("weekend", self.weekends, on_main), ("holiday", self.holidays, on_main)]
+        return [(label, int(values[staff].min()), float(np.median(values[staff])), int(values[staff].max()))
+                for label, values, staff in columns if staff.any()]
+
+    def write_csv(self, path):
+        """Write header() and rows() as a CSV file"""
+        # utf-8-sig so that spreadsheet programs read the Greek names correctly
+        with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.header())
+            writer.writerows(self.rows())
@@ -0,0 +1,161 @@
+"""On-disk cache of converted documents and extracted tables.
+
+Entries are keyed by a hash of the input file's content and the version
+of the code reading it (the parser version and the readers used), so an
+unchanged schedule is never converted or read twice, whatever its name or
+location. Table rows are stored one JSON line per row, so they are written
+and read back one at a time. The cache is size-bounded: the
+least recently used entries are evicted first.
+"""
+import hashlib
+import json
+import os
+import platform
+import shutil
+import tempfile
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def default_cache_dir():
+    """Per-user cache folder for this platform"""
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "ShiftCalendarGenerator", "Cache")
+    elif platform.system() == "Darwin":  # macOS
+        return os.path.expanduser("~/Library/Caches/ShiftCalendarGenerator")
+    else:  # Linux and others
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        return os.path.join(base, "shift-calendar-generator")
+
+
+class DocumentCache:
+    """Content-addressed cache of converted .docx files and the table rows read from them.
+
+    Each entry is a file named after its key: <key>.docx for a converted
+    document and <key>.rows.jsonl for the rows read from it. Reads refresh an
+    entry's modification time, and writes evict the oldest entries once the
+    folder grows past max_bytes.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key_for(file_path, version=""):
+        """Hash of the file's content and the version of the code reading it"""
+        digest = hashlib.sha256(version.encode('utf-8') + b"\0")
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get_rows(self, key):
+        """Iterator over the cached table rows for the key, or None.
+
+        The rows are (table index, cells) tuples, read from the file one at a
+        time; OSError or ValueError is raised while iterating if the entry
+        cannot be read.
+        """
+        path = self._touch(f"{key}.rows.jsonl")
+        if path is None:
+            return None
+        return self._read_rows(path)
+
+    def rows_writer(self, key):
+        """RowsWriter for storing the table rows for the key, one at a time"""
+        return RowsWriter(self, f"{key}.rows.jsonl")
+
+    def get_docx(self, key):
+        """Path of the cached converted .docx for the key, or None"""
+        return self._touch(f"{key}.docx")
+
+    def put_docx(self, key, docx_path):
+        """Move a converted .docx into the cache, returning its cached path"""
+        path = os.path.join(self.directory, f"{key}.docx")
+        shutil.move(docx_path, path)
+        self._evict()
+        return path
+
+    def clear(self):
+        """Remove every entry"""
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                self._remove(entry.path)
+
+    def _touch(self, name):
+        path = os.path.join(self.directory, name)
+        try:
+            # The modification time doubles as the last-used time for eviction
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.is_file() and not entry.name.startswith(".tmp-"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            except OSError:
+                continue
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            self._remove(path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def _read_rows(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                table_index, cells = json.loads(line)
+                yield table_index, cells
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class RowsWriter:
+    """A cache entry of table rows written one JSON line at a time.
+
+    The rows go to a temporary file, which commit() puts in place; abort(),
+    or commit() failing, removes it, so readers never see a partial entry.
+    """
+
+    def __init__(self, cache, name):
+        self.cache = cache
+        self.name = name
+        fd, self.temp_path = tempfile.mkstemp(dir=cache.directory, prefix=".tmp-")
+        self.file = os.fdopen(fd, 'w', encoding='utf-8')
+
+    def write(self, row):
+        """Add a (table index, cells) row"""
+        self.file.write(json.dumps(row, ensure_ascii=False, separators=(',', ':')))
+        self.file.write("\n")
+
+    def commit(self):
+        """Make the entry visible to readers"""
+        self.file.close()
+        os.replace(self.temp_path, os.path.join(self.cache.directory, self.name))
+        self.temp_path = None
+        self.cache._evict()
+
+    def abort(self):
+        """Drop the rows written so far; does nothing after commit()"""
+        if self.temp_path is not None:
+            self.file.close()
+            self.cache._remove(self.temp_path)
+            self.temp_path = None
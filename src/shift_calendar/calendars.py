@@ -0,0 +1,277 @@
+"""Calendar generation: event building, the icalendar and streaming writers, and pool workers."""
+from datetime import datetime, timedelta
+
+from .profiling import profile_stage
+from .roster import RosterIndex
+
+
+# PRODID of the generated calendars
+CALENDAR_PRODID = '-//Employee Shift Calendar//example.com//'
+
+# icalendar stores DTSTAMP as UTC without converting the naive local time
+DTSTAMP_LINE_FORMAT = "DTSTAMP:%Y%m%dT%H%M%SZ\r\n"
+
+
+def employee_events(roster, employee_name):
+    """Collect the all-day events for an employee's shifts, one per date.
+    
+    Each event is a dict with the summary, start/end dates, UID and description,
+    shared by the icalendar and streaming writers. Returns an empty list if the
+    employee has no shifts.
+    """
+    employee_key = roster.employee_key(employee_name)
+    
+    # Look up the shifts for this specific employee
+    employee_shifts = roster.shifts_by_employee.get(employee_key, [])
+    
+    # Also check if the employee has any cath lab or EP shifts
+    employee_cath_lab_shifts = roster.cath_lab_by_employee.get(employee_key, [])
+    employee_ep_shifts = roster.ep_by_employee.get(employee_key, [])
+    
+    if not employee_shifts and not employee_cath_lab_shifts and not employee_ep_shifts:
+        return []
+    
+    # Group shifts by date to combine multiple shifts on the same day
+    shifts_by_date = {}
+    
+    # Add regular shifts to the grouping
+    for shift in employee_shifts:
+        date_key = shift.date.isoformat()
+        if date_key not in shifts_by_date:
+            shifts_by_date[date_key] = []
+        shifts_by_date[date_key].append(shift)
+    
+    # Add cath lab shifts if they don't overlap with existing dates
+    for shift in employee_cath_lab_shifts:
+        date_key = shift.date.isoformat()
+        if date_key not in shifts_by_date:
+            shifts_by_date[date_key] = []
+        shifts_by_date[date_key].append(shift)
+    
+    # Add EP shifts if they don't overlap with existing dates
+    for shift in employee_ep_shifts:
+        date_key = shift.date.isoformat()
+        if date_key not in shifts_by_date:
+            shifts_by_date[date_key] = []
+        shifts_by_date[date_key].append(shift)
+    
+    # Create events for each date, combining shift information
+    events = []
+    for date_key, date_shifts in shifts_by_date.items():
+        # Combine all shift types for the summary
+        shift_types = [s.shift_type for s in date_shifts]
+        day_of_week = date_shifts[0].day_of_week  # They all have the same date
+        shift_date = date_shifts[0].date
+    
+        # Format the summary to show all shift types
+        summary = f"{', '.join(shift_types)} - {day_of_week}"
+    
+        # For all-day events, the end date should be the next day
+        # The end date is non-inclusive in the iCalendar spec
+        end_date = shift_date + timedelta(days=1)
+    
+        # Generate a unique ID for the event
+        uid = f"{employee_name.replace(' ', '')}-{shift_date.strftime('%Y%m%d')}@shifts.example.com"
+    
+        # Add description with details about all employees working that day
+        description_parts = [f"Your shifts: {', '.join(shift_types)}"]
+    
+        # Find all employees working on this date
+        coworkers_info = roster.coworkers_on(shift_date, employee_key)
+    
+        # Add coworkers section if any exist
+        if coworkers_info:
+            description_parts.append("\nCoworkers on this day:")
+            for info in coworkers_info:
+                description_parts.append(f"- {info}")
+        else:
+            description_parts.append("\nNo other employees scheduled on this day.")
+    
+        # Add Cath Lab on-call information if available
+        cath_lab_employee = roster.cath_lab_on_call(shift_date, employee_key)
+        if cath_lab_employee:
+            description_parts.append(f"\nCath Lab On-Call: {cath_lab_employee}")
+    
+        # Add Electrophysiology on-call information if available
+        ep_employee = roster.ep_on_call(shift_date, employee_key)
+        if ep_employee:
+            description_parts.append(f"\nElectrophysiology On-Call: {ep_employee}")
+    
+        events.append({
+            'summary': summary,
+            'start': shift_date,
+            'end': end_date,
+            'uid': uid,
+            'description': "\n".join(description_parts),
+        })
+    
+    return events
+
+
+def build_employee_calendar(roster, employee_name):
+    """Build the Calendar with all-day events for an employee, or None if they have no shifts."""
+    events = employee_events(roster, employee_name)
+    if not events:
+        return None
+    return calendar_from_events(events)
+
+
+def calendar_from_events(events):
+    """Build the Calendar for events from employee_events.
+    
+    An event may also carry a 'dtstamp' datetime to use instead of now and a
+    'sequence' revision number, written when above zero.
+    """
+    # icalendar takes a while to import and the streaming writer does not need it
+    from icalendar import Calendar, Event
+    
+    cal = Calendar()
+    cal.add('prodid', CALENDAR_PRODID)
+    cal.add('version', '2.0')
+    cal.add('calscale', 'GREGORIAN')
+    
+    for event_data in events:
+        event = Event()
+        event.add('summary', event_data['summary'])
+        # All-day events need a DATE value type
+        event.add('dtstart', event_data['start'])
+        event.add('dtend', event_data['end'])
+        event.add('dtstamp', event_data.get('dtstamp') or datetime.now())
+        event.add('uid', event_data['uid'])
+        event.add('description', event_data['description'])
+        if event_data.get('sequence'):
+            event.add('sequence', event_data['sequence'])
+        cal.add_component(event)
+    
+    return cal
+
+
+def _ics_text(value):
+    """Escape a TEXT property value as RFC 5545 section 3.3.11 (and icalendar) do"""
+    return (value.replace("\\N", "\n")
+            .replace("\\", "\\\\")
+            .replace(";", "\\;")
+            .replace(",", "\\,")
+            .replace("\r\n", "\\n")
+            .replace("\n", "\\n")
+            .replace("\r", "\\n"))
+
+
+def _ics_line(line):
+    """Encode a content line, folded to lines under 75 octets like icalendar does"""
+    data = line.encode('utf-8')
+    length = len(data)
+    if length < 75:
+        return data + b"\r\n"
+    
+    # Fold between characters, never inside a UTF-8 sequence, and keep a
+    # backslash escape together with the character it escapes
+    folded = []
+    start = 0
+    while length - start > 74:
+        end = start + 74
+        while data[end] & 0xC0 == 0x80:
+            end -= 1
+        if data[end - 1] in b"\\^" and end - 1 > start:
+            end -= 1
+        folded.append(data[start:end])
+        start = end
+    folded.append(data[start:])
+    return b"\r\n ".join(folded) + b"\r\n"
+
+
+def write_calendar_stream(f, events):
+    """Stream a calendar of all-day events to a binary file as RFC 5545 text.
+    
+    Writes the same properties as calendar_from_events, event by event,
+    without building icalendar objects or the whole serialized calendar in memory.
+    """
+    write = f.write
+    write(b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+    write(_ics_line("PRODID:" + _ics_text(CALENDAR_PRODID)))
+    write(b"CALSCALE:GREGORIAN\r\n")
+    
+    dtstamp = datetime.now().strftime(DTSTAMP_LINE_FORMAT).encode('ascii')
+    for event in events:
+        write(b"BEGIN:VEVENT\r\n")
+        write(_ics_line("SUMMARY:" + _ics_text(event['summary'])))
+        write(event['start'].strftime("DTSTART;VALUE=DATE:%Y%m%d\r\n").encode('ascii'))
+        write(event['end'].strftime("DTEND;VALUE=DATE:%Y%m%d\r\n").encode('ascii'))
+        event_dtstamp = event.get('dtstamp')
+        write(dtstamp if event_dtstamp is None else event_dtstamp.strftime(DTSTAMP_LINE_FORMAT).encode('ascii'))
+        write(_ics_line("UID:" + _ics_text(event['uid'])))
+        # icalendar's canonical order puts SEQUENCE before DESCRIPTION
+        if event.get('sequence'):
+            write(f"SEQUENCE:{event['sequence']}\r\n".encode('ascii'))
+        write(_ics_line("DESCRIPTION:" + _ics_text(event['description'])))
+        write(b"END:VEVENT\r\n")
+    write(b"END:VCALENDAR\r\n")
+
+
+def write_employee_calendar(roster, employee_name, output_file, fast_writer=False, profiler=None):
+    """Write an employee's calendar file, returning False if they have no shifts.
+    
+    The fast writer streams the file directly instead of going through icalendar.
+    Errors while saving are raised to the caller. With a StageProfiler, the
+    event building and writing are measured as stages.
+    """
+    with profile_stage(profiler, "events"):
+        events = employee_events(roster, employee_name)
+    if not events:
+        return False
+    write_events(events, output_file, fast_writer, profiler)
+    return True
+
+
+def write_events(events, output_file, fast_writer=False, profiler=None):
+    """Write a calendar file with events from employee_events, using either writer"""
+    with open(output_file, 'wb') as f:
+        write_events_to(f, events, fast_writer, profiler)
+
+
+def write_events_to(f, events, fast_writer=False, profiler=None):
+    """Write a calendar with events from employee_events to an open binary file, using either writer"""
+    if fast_writer:
+        # Building and writing are one step for the streaming writer
+        with profile_stage(profiler, "stream ics"):
+            write_calendar_stream(f, events)
+        return
+    
+    with profile_stage(profiler, "build ics"):
+        data = calendar_from_events(events).to_ical()
+    with profile_stage(profiler, "write ics"):
+        f.write(data)
+
+
+# Roster index of a parallel generation worker process, set once by _init_calendar_worker
+_worker_roster = None
+
+
+def _init_calendar_worker(shifts, cath_lab_shifts, ep_shifts):
+    """Index the shifts shipped to a worker process once, for all of its tasks."""
+    global _worker_roster
+    _worker_roster = RosterIndex(shifts, cath_lab_shifts, ep_shifts)
+
+
+def _calendar_worker(employee_name, output_file, fast_writer=False, incremental=False, previous=None,
+                     write_file=None):
+    """Build and write one employee's calendar in a worker process.
+    
+    The calendar is written to write_file, a temporary name for output_file,
+    if given. Returns (employee_name, output_file or None, error message or
+    None, update), where update is the (status, state entry) of an
+    incremental run, else None.
+    """
+    try:
+        if incremental:
+            from .incremental import update_employee_calendar
+            status, entry = update_employee_calendar(_worker_roster, employee_name, output_file, previous, fast_writer,
+                                                     write_file=write_file)
+            if status is None:
+                return employee_name, None, "No shifts found for the specified employee", None
+            return employee_name, output_file, None, (status, entry)
+        if not write_employee_calendar(_worker_roster, employee_name, write_file or output_file, fast_writer):
+            return employee_name, None, "No shifts found for the specified employee", None
+        return employee_name, output_file, None, None
+    except Exception as e:
+        return employee_name, None, f"Error saving calendar file: {e}", None
@@ -0,0 +1,96 @@
+"""Checks of a roster for double bookings, missed rest and overloaded weeks.
+
+The rules run as array operations over a ShiftMatrix of the main and
+specialty shifts, so a year of a department of thousands is checked in well
+under a second:
+
+- double booking: two or more shifts of the same table of the main schedule
+  on the same day (a Regular or On-Call shift from the first table alongside
+  a Μεγάλη, Μικρή or TEP shift from the second is a normal day);
+- back-to-back 24h: 24-hour shifts on two consecutive days, with no rest day
+  between them;
+- on call and on duty: a Cath Lab or EP on-call on the same day as a 24-hour
+  main shift;
+- too many shifts in a week: more days with main shifts than allowed in
+  some 7-day window, reported once from the first day of each overloaded run
+  of windows.
+"""
+from collections import namedtuple
+import csv
+
+from .matrix import ShiftMatrix
+from .shifts import FIRST_TABLE_TYPES, HOURS_24_TYPES, MAIN_TYPES, SECOND_TABLE_TYPES, SPECIALTY_TYPES
+
+CHECK_FILE_NAME = "roster-check.csv"
+
+DEFAULT_MAX_SHIFTS_PER_WEEK = 3
+
+DOUBLE_BOOKING = "double booking"
+BACK_TO_BACK = "back-to-back 24h"
+ON_CALL_ON_DUTY = "on call and on duty"
+TOO_MANY_IN_WEEK = "too many shifts in a week"
+RULES = (DOUBLE_BOOKING, BACK_TO_BACK, ON_CALL_ON_DUTY, TOO_MANY_IN_WEEK)
+
+Violation = namedtuple("Violation", "rule employee date detail")
+
+
+def check_roster(shifts, cath_lab_shifts=(), ep_shifts=(), max_shifts_per_week=DEFAULT_MAX_SHIFTS_PER_WEEK):
+    """Violations of every rule in the shifts, sorted by date, rule and employee"""
+    import numpy as np
+
+    matrix = ShiftMatrix(shifts, cath_lab_shifts, ep_shifts)
+    if not matrix.dates:
+        return []
+    counts, dates, employees = matrix.counts, matrix.dates, matrix.employees
+    first_mask = matrix.type_mask(FIRST_TABLE_TYPES)
+    second_mask = matrix.type_mask(SECOND_TABLE_TYPES)
+    first_table = counts[:, :, first_mask].sum(axis=2, dtype=np.int32)
+    second_table = counts[:, :, second_mask].sum(axis=2, dtype=np.int32)
+    on_duty = counts[:, :, matrix.type_mask(MAIN_TYPES)].any(axis=2)
+    on_24h = counts[:, :, matrix.type_mask(HOURS_24_TYPES)].any(axis=2)
+    on_call = counts[:, :, matrix.type_mask(SPECIALTY_TYPES)].any(axis=2)
+
+    def shift_types(employee, day, mask):
+        return " + ".join(f"{shift_type} ×{count}" if count > 1 else shift_type
+                          for shift_type, count, wanted in zip(matrix.types, counts[employee, day], mask)
+                          if count and wanted)
+
+    violations = []
+    for employee, day in zip(*np.nonzero((first_table >= 2) | (second_table >= 2))):
+        # The shifts of the table, or tables, booked twice
+        mask = ((first_mask if first_table[employee, day] >= 2 else False)
+                | (second_mask if second_table[employee, day] >= 2 else False))
+        violations.append(Violation(DOUBLE_BOOKING, employees[employee], dates[day],
+                                    shift_types(employee, day, mask)))
+    for employee, day in zip(*np.nonzero(on_24h[:, :-1] & on_24h[:, 1:])):
+        violations.append(Violation(BACK_TO_BACK, employees[employee], dates[day],
+                                    f"24h shifts on {dates[day]} and {dates[day + 1]}"))
+    for employee, day in zip(*np.nonzero(on_call & on_24h)):
+        violations.append(Violation(ON_CALL_ON_DUTY, employees[employee], dates[day],
+                                    shift_types(employee, day, np.ones(len(matrix.types), dtype=bool))))
+
+    # Days on duty in each 7-day window from the running total, counting a
+    # day once however many shifts it has; a shorter roster is one window
+    window = min(7, len(dates))
+    running = np.zeros((len(employees), len(dates) + 1), dtype=np.int32)
+    np.cumsum(on_duty, axis=1, out=running[:, 1:])
+    in_window = running[:, window:] - running[:, :-window]
+    over = in_window > max_shifts_per_week
+    first = over.copy()
+    first[:, 1:] &= ~over[:, :-1]
+    for employee, day in zip(*np.nonzero(first)):
+        violations.append(Violation(TOO_MANY_IN_WEEK, employees[employee], dates[day],
+                                    f"{in_window[employee, day]} days on duty in the {window} days from {dates[day]}"))
+
+    violations.sort(key=lambda violation: (violation.date, RULES.index(violation.rule), violation.employee))
+    return violations
+
+
+def write_violations(violations, path):
+    """Write violations as a CSV file with a header row"""
+    # utf-8-sig so that spreadsheet programs read the Greek names correctly
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(Violation._fields)
+        for violation in violations:
+            writer.writerow((violation.rule, violation.employee, violation.date.isoformat(), violation.detail))
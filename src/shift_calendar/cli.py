@@ -0,0 +1,327 @@
+"""Command-line interface: generate the calendars without the GUI.
+
+    python -m shift_calendar "ΕΦΗΜΕΡΙΕΣ ΜΑΡΤΙΟΣ 2025.docx" --cath-lab cath.docx -o calendars
+    python -m shift_calendar --batch schedules/ -o calendars
+    python -m shift_calendar --batch schedules/ --merge -o calendars
+    python -m shift_calendar "ΕΦΗΜΕΡΙΕΣ ΜΑΡΤΙΟΣ 2025.docx" --serve 8080
+    python -m shift_calendar --from-history 2025-01-01 2025-12-31 -o calendars
+    python -m shift_calendar --watch incoming/ -o calendars
+"""
+import argparse
+from datetime import date
+import logging
+import os
+import sys
+import threading
+import time
+
+from .cache import DocumentCache
+from .analytics import WORKLOAD_FILE_NAME
+from .checks import CHECK_FILE_NAME, DEFAULT_MAX_SHIFTS_PER_WEEK
+from .converter import LibreOfficeConverter
+from .logqueue import REDACTED, LogFile
+from .core import ShiftCalendarCore, extract_month_year_from_filename, find_batch_jobs
+from .output import ARCHIVE_FILE_NAMES
+from .profiling import StageProfiler
+
+
+def run_job(core, args, input_file, month, year, cath_lab_file, ep_file, output_dir):
+    """Process one month's schedules and write the calendars, returning True on success"""
+    def process():
+        return core.process_files(input_file, month, year, cath_lab_file=cath_lab_file, ep_file=ep_file)
+    
+    if not process():
+        return False
+    paths = [path for path in (input_file, cath_lab_file, ep_file) if path]
+    return write_calendars(core, args, output_dir, reload=(paths, process))
+
+
+def write_calendars(core, args, output_dir, reload=None):
+    """Write (or with --serve, serve) the calendars of the processed shifts, returning True if all were written.
+    
+    reload is (paths, process) of the schedules read, for --serve to process
+    them again when they change.
+    """
+    if args.check:
+        os.makedirs(output_dir, exist_ok=True)
+        core.check_roster(os.path.join(output_dir, CHECK_FILE_NAME), args.max_shifts_per_week)
+    if args.workload:
+        os.makedirs(output_dir, exist_ok=True)
+        core.analyze_workload(os.path.join(output_dir, WORKLOAD_FILE_NAME))
+    if args.serve is not None:
+        return serve_calendars(core, args, reload)
+    employees = args.employee or core.all_employees
+    os.makedirs(output_dir, exist_ok=True)
+    success_count = core.generate_calendars(employees, output_dir, parallel=args.parallel,
+                                            fast_writer=args.fast_writer, incremental=args.incremental,
+                                            archive=args.archive)
+    core.log_profile(output_dir if args.profile_report else None)
+    return success_count == len(employees)
+
+
+def serve_calendars(core, args, reload=None):
+    """Serve the processed shifts as webcal feeds until interrupted.
+    
+    With reload, (paths, process), the schedules are processed again once
+    their files change and have settled for --watch-interval seconds, and the
+    feeds switch to the new roster; if that fails, the previous one is kept.
+    """
+    # Imported here: only needed when serving
+    from .webcal import FEED_PREFIX, CalendarFeeds, CalendarServer
+    
+    employees = args.employee or core.all_employees
+    feeds = CalendarFeeds(core.roster, employees)
+    server = CalendarServer((args.host, args.serve), feeds, log=core.log)
+    core.log(f"Serving {len(employees)} calendars at http://{args.host}:{server.server_address[1]}"
+             f"{FEED_PREFIX}<employee>.ics, press Ctrl+C to stop")
+    thread = threading.Thread(target=server.serve_forever, name="webcal-server", daemon=True)
+    thread.start()
+    paths, process = reload or ((), None)
+    served = file_signatures(paths)
+    try:
+        while True:
+            time.sleep(args.watch_interval)
+            changed = file_signatures(paths)
+            if changed == served:
+                continue
+            # Still being written if it changes again within the interval
+            time.sleep(args.watch_interval)
+            if file_signatures(paths) != changed:
+                continue
+            served = changed
+            core.log("The schedules changed, processing them again...")
+            core.progress.reset()
+            if process():
+                employees = args.employee or core.all_employees
+                feeds.set_roster(core.roster, employees)
+                core.log(f"Serving the updated calendars of {len(employees)} employees")
+            else:
+                core.log("Still serving the previous calendars; the schedules are tried again when they change",
+                         level=logging.ERROR)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+    return True
+
+
+def file_signatures(paths):
+    """(mtime, size) of each of paths, None for those that cannot be read"""
+    signatures = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signatures.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signatures.append(None)
+    return signatures
+
+
+def watch_folder(parser, args, core, log):
+    """Process each month's schedules as they arrive in the --watch folder, until interrupted"""
+    # Imported here: only needed when watching
+    from .watch import WATCH_STATE_FILE_NAME, FolderWatcher
+    
+    if not os.path.isdir(args.watch):
+        parser.error(f"not a directory: {args.watch}")
+    os.makedirs(args.output_dir, exist_ok=True)
+    watcher = FolderWatcher(args.watch, os.path.join(args.output_dir, WATCH_STATE_FILE_NAME), log,
+                            settle=args.watch_interval)
+    
+    def process(job):
+        output_dir = os.path.join(args.output_dir, f"{job['year']:04d}-{job['month']:02d}")
+        log(f"New or changed schedules for {job['month']}/{job['year']}")
+        core.progress.reset()
+        # Errors are logged by the watcher, which keeps watching the other months
+        if not run_job(core, args, job['main'], job['month'], job['year'], job['cath_lab'], job['ep'], output_dir):
+            log(f"The schedules of {job['month']}/{job['year']} were not fully processed; "
+                f"they are tried again when they change", level=logging.ERROR)
+    
+    log(f"Watching {args.watch} for new schedules every {args.watch_interval:g} seconds, press Ctrl+C to stop")
+    try:
+        watcher.run(process, args.watch_interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def iso_date(text):
+    """argparse type of a YYYY-MM-DD date"""
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a YYYY-MM-DD date: {text}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="shift_calendar",
+        description="Create .ics calendar files from the Word shift schedules."
+    )
+    parser.add_argument("input_file", nargs="?", help="main shift schedule (.doc or .docx)")
+    parser.add_argument("--cath-lab", metavar="FILE", help="Cath Lab on-call schedule")
+    parser.add_argument("--ep", metavar="FILE", help="Electrophysiology on-call schedule")
+    parser.add_argument("--month", type=int, choices=range(1, 13), metavar="1-12",
+                        help="schedule month (default: from the file name)")
+    parser.add_argument("--year", type=int, help="schedule year (default: from the file name)")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="process every monthly schedule in DIR, grouped by the month in the file names; "
+                             "files named with CATH/ΑΙΜΟΔΥΝΑΜ or EP/ΗΛΕΚΤΡΟΦΥΣΙΟΛ are the on-call schedules")
+    parser.add_argument("-o", "--output-dir", default=".",
+                        help="where to write the calendars (batch runs use a YYYY-MM subfolder per month)")
+    parser.add_argument("--merge", action="store_true",
+                        help="with --batch, read all the months together and write one calendar per employee "
+                             "covering the whole period")
+    parser.add_argument("--employee", action="append", metavar="NAME",
+                        help="only generate this employee's calendar (can be repeated)")
+    parser.add_argument("--parallel", action="store_true", help="generate calendars on all CPU cores")
+    parser.add_argument("--fast-writer", action="store_true", help="use the streaming ICS writer")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only rewrite calendars whose events changed since the last incremental run")
+    parser.add_argument("--archive", choices=sorted(ARCHIVE_FILE_NAMES),
+                        help="write all the calendars into one zip archive or one combined .ics file")
+    parser.add_argument("--watch", metavar="DIR",
+                        help="keep running, processing each month's schedules when they arrive or change in DIR "
+                             "into YYYY-MM subfolders of the output folder")
+    parser.add_argument("--watch-interval", type=float, default=5.0, metavar="SECONDS",
+                        help="with --watch, how often to look for new files, and with --serve for changes to the "
+                             "schedules served; a file is taken once it has not changed for this long (default: 5)")
+    parser.add_argument("--history", nargs="?", const="", metavar="DB",
+                        help="also store the parsed shifts in a SQLite history database "
+                             "(default: history.sqlite3 in the user data folder)")
+    parser.add_argument("--from-history", nargs=2, type=iso_date, metavar=("FROM", "TO"),
+                        help="generate the calendars of the dates FROM to TO (YYYY-MM-DD) from the history database "
+                             "instead of schedule files")
+    parser.add_argument("--check", action="store_true",
+                        help=f"check the roster for double bookings, back-to-back 24h shifts and overloaded weeks, "
+                             f"saving the findings as {CHECK_FILE_NAME} in the output folder (needs numpy)")
+    parser.add_argument("--max-shifts-per-week", type=int, default=DEFAULT_MAX_SHIFTS_PER_WEEK, metavar="N",
+                        help=f"with --check, the most days with main shifts allowed in any 7 days "
+                             f"(default: {DEFAULT_MAX_SHIFTS_PER_WEEK})")
+    parser.add_argument("--workload", action="store_true",
+                        help=f"save each employee's shifts by type, weekday and month and their weekend and holiday "
+                             f"duties as {WORKLOAD_FILE_NAME} in the output folder (needs numpy)")
+    parser.add_argument("--no-warm-libreoffice", action="store_true",
+                        help="convert each .doc file with a new LibreOffice process instead of one kept running")
+    parser.add_argument("--cache-dir", metavar="DIR", help="document cache folder (default: the user cache folder)")
+    parser.add_argument("--no-cache", action="store_true", help="always convert and read the documents again")
+    parser.add_argument("--direct-doc", action="store_true",
+                        help="read .doc files with the built-in reader instead of converting them with LibreOffice "
+                             "or Word (it is used anyway when neither is installed)")
+    parser.add_argument("--no-fast-tables", action="store_true",
+                        help="read the document tables with python-docx instead of the streaming reader, "
+                             "converting .doc files first")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="serve the calendars over HTTP for calendar apps to subscribe to, instead of writing "
+                             "them; the schedules are read again when they change")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to serve on with --serve (default: 127.0.0.1, this computer only)")
+    parser.add_argument("--profile", action="store_true",
+                        help="log the time and peak memory of each stage of the run")
+    parser.add_argument("--profile-report", action="store_true",
+                        help="like --profile, and also save them as JSON next to the calendars")
+    parser.add_argument("--log-file", metavar="FILE",
+                        help="also append every message, with timestamps and details, to FILE")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="also print the details: every calendar written and month change found")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print errors")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if bool(args.input_file) + bool(args.batch) + bool(args.from_history) + bool(args.watch) != 1:
+        parser.error("give either a main schedule file, --batch DIR, --from-history FROM TO or --watch DIR")
+    if args.merge and not args.batch:
+        parser.error("--merge needs --batch DIR")
+    if args.serve is not None and args.batch and not args.merge:
+        parser.error("--serve needs a single schedule or --batch DIR --merge")
+    if args.watch and args.serve is not None:
+        parser.error("--serve cannot be used with --watch")
+    if args.archive and (args.incremental or args.serve is not None):
+        parser.error("--archive cannot be used with --incremental or --serve")
+    
+    log_file = None
+    if args.log_file:
+        try:
+            log_file = LogFile(args.log_file)
+        except OSError as e:
+            parser.error(f"cannot open the log file: {e}")
+    threshold = logging.ERROR if args.quiet else logging.DEBUG if args.verbose else logging.INFO
+    
+    # The schedules of a month are read on several threads, which all log
+    print_lock = threading.Lock()
+    
+    def log(message, sensitive=False, level=logging.INFO):
+        text = REDACTED if sensitive else message
+        if log_file is not None:
+            log_file.write([(level, text)])
+        if level >= threshold:
+            with print_lock:
+                print(text, file=sys.stderr if args.quiet else sys.stdout, flush=True)
+    
+    def on_error(title, message):
+        with print_lock:
+            print(f"{title}: {message}", file=sys.stderr, flush=True)
+    
+    converter = None if args.no_warm_libreoffice else LibreOfficeConverter()
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = DocumentCache(args.cache_dir)
+        except OSError as e:
+            on_error("Warning", f"Document cache disabled: {e}")
+    profiler = StageProfiler() if args.profile or args.profile_report else None
+    history = None
+    if args.history is not None or args.from_history:
+        # Imported here: sqlite3 is only needed with a history database
+        from .history import ShiftHistory
+        history = ShiftHistory(args.history or None)
+    core = ShiftCalendarCore(log=log, on_error=on_error, converter=converter, cache=cache,
+                             fast_tables=not args.no_fast_tables, profiler=profiler, history=history,
+                             direct_doc=args.direct_doc)
+    try:
+        return run(parser, args, core, log, on_error)
+    finally:
+        core.close()
+        if log_file is not None:
+            log_file.close()
+
+
+def run(parser, args, core, log, on_error):
+    """Run the single-file, batch, history or watch command, returning the exit status"""
+    if args.watch:
+        return watch_folder(parser, args, core, log)
+    if args.from_history:
+        ok = core.process_history(*args.from_history) and write_calendars(core, args, args.output_dir)
+        return 0 if ok else 1
+    if args.batch:
+        if not os.path.isdir(args.batch):
+            parser.error(f"not a directory: {args.batch}")
+        ok = True
+        jobs = []
+        for job in find_batch_jobs(args.batch, log):
+            if job['main']:
+                jobs.append(job)
+            else:
+                on_error("Error", f"No main schedule found for {job['month']}/{job['year']}")
+                ok = False
+        if args.merge:
+            paths = [job[kind] for job in jobs for kind in ('main', 'cath_lab', 'ep') if job[kind]]
+            ok &= core.process_schedules(jobs) and write_calendars(
+                core, args, args.output_dir, reload=(paths, lambda: core.process_schedules(jobs)))
+            return 0 if ok else 1
+        for job in jobs:
+            output_dir = os.path.join(args.output_dir, f"{job['year']:04d}-{job['month']:02d}")
+            ok &= run_job(core, args, job['main'], job['month'], job['year'], job['cath_lab'], job['ep'], output_dir)
+        return 0 if ok else 1
+    
+    if not os.path.exists(args.input_file):
+        parser.error(f"file not found: {args.input_file}")
+    month, year = extract_month_year_from_filename(os.path.basename(args.input_file))
+    ok = run_job(core, args, args.input_file, args.month or month, args.year or year,
+                 args.cath_lab, args.ep, args.output_dir)
+    return 0 if ok else 1
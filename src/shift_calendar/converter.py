@@ -0,0 +1,301 @@
+""".doc to .docx conversion through LibreOffice.
+
+LibreOffice takes several seconds to start, so LibreOfficeConverter keeps a
+few headless instances running, each with its own user profile, and forwards
+every conversion to one of them.
+"""
+import importlib.util
+import os
+import platform
+import queue
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+
+class ConversionError(Exception):
+    """A document could not be converted."""
+
+
+def find_libreoffice():
+    """Return the LibreOffice executable for this platform, or None if not found"""
+    if platform.system() == "Windows":
+        # Check common install locations
+        possible_paths = [
+            r"C:\Program Files\LibreOffice\program\soffice.exe",
+            r"C:\Program Files (x86)\LibreOffice\program\soffice.exe"
+        ]
+        for path in possible_paths:
+            if os.path.exists(path):
+                return path
+        return None
+    elif platform.system() == "Darwin":  # macOS
+        return "/Applications/LibreOffice.app/Contents/MacOS/soffice"
+    else:  # Linux and others
+        return shutil.which("soffice") or "libreoffice"
+
+
+class LibreOfficeConverter:
+    """A small pool of long-lived headless LibreOffice instances used for .doc -> .docx conversions.
+
+    Each instance runs with a private user profile, so it never clashes with a
+    desktop LibreOffice, with the other instances or with other runs. When
+    LibreOffice's Python bridge (the uno module) can be imported, each
+    conversion is driven over the instance's UNO socket: the document is loaded
+    hidden and stored as .docx. Otherwise it is handed over by a short-lived
+    soffice client started with the same profile, which LibreOffice forwards to
+    the running instance instead of starting a new one.
+
+    Jobs are queued to one worker thread per instance, each job with its own
+    timeout. A worker and its instance start when a job arrives while every
+    running worker is busy, up to `instances` of them, so the main, Cath Lab
+    and EP schedules are converted side by side. If an instance dies or a job
+    times out, it is restarted. Call close() to stop them.
+    """
+
+    def __init__(self, executable=None, timeout=60, startup_timeout=60, instances=3):
+        self.executable = executable or find_libreoffice()
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.instances = instances
+        self._jobs = queue.Queue()
+        self._workers = []
+        self._idle = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def running(self):
+        """Whether any LibreOffice instance is up"""
+        return any(instance.running for _, instance in self._workers)
+
+    def convert(self, doc_path, output_path, timeout=None):
+        """Convert doc_path to a .docx at output_path, waiting for the queued job.
+
+        Raises ConversionError if the conversion fails or times out.
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise ConversionError("The converter has been closed")
+            if self._idle:
+                self._idle -= 1
+            elif len(self._workers) < self.instances:
+                instance = _Instance(self.executable, self.startup_timeout)
+                worker = threading.Thread(target=self._run_jobs, args=(instance,),
+                                          name=f"LibreOfficeConverter-{len(self._workers) + 1}", daemon=True)
+                self._workers.append((worker, instance))
+                worker.start()
+            self._jobs.put((os.path.abspath(doc_path), os.path.abspath(output_path), timeout or self.timeout, future))
+        return future.result()
+
+    def close(self):
+        """Stop the workers and the LibreOffice instances and remove their profiles"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+            for _ in workers:
+                self._jobs.put(None)
+        for worker, instance in workers:
+            worker.join()
+            instance.stop()
+
+    def _run_jobs(self, instance):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            doc_path, output_path, timeout, future = job
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(instance.convert(doc_path, output_path, timeout))
+                except Exception as e:
+                    future.set_exception(e if isinstance(e, ConversionError) else ConversionError(str(e)))
+            with self._lock:
+                self._idle += 1
+
+
+class _Instance:
+    """One headless LibreOffice process with its own profile, driven by a single worker"""
+
+    def __init__(self, executable, startup_timeout):
+        self.executable = executable
+        self.startup_timeout = startup_timeout
+        self._process = None
+        self._profile_dir = None
+        self._port = None
+        self._desktop = None
+
+    @property
+    def running(self):
+        return self._process is not None and self._process.poll() is None
+
+    def convert(self, doc_path, output_path, timeout):
+        # Retry once on a fresh instance if the first one died under the job
+        for attempt in range(2):
+            self._ensure_started()
+            try:
+                return self._forward(doc_path, output_path, timeout)
+            except (subprocess.TimeoutExpired, TimeoutError):
+                self.stop()
+                raise ConversionError(f"LibreOffice conversion timed out after {timeout} s")
+            except ConversionError:
+                if attempt or self.running:
+                    raise
+
+    def _forward(self, doc_path, output_path, timeout):
+        if uno_available():
+            return self._forward_over_uno(doc_path, output_path, timeout)
+        return self._forward_to_client(doc_path, output_path, timeout)
+
+    def _forward_over_uno(self, doc_path, output_path, timeout):
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def properties(**values):
+            return tuple(PropertyValue(Name=name, Value=value) for name, value in values.items())
+
+        # A call cannot be interrupted, so a timed-out job stops the instance under it
+        expired = threading.Event()
+        timer = threading.Timer(timeout, lambda: (expired.set(), self.stop()))
+        timer.start()
+        try:
+            if self._desktop is None:
+                local = uno.getComponentContext()
+                resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+                remote = resolver.resolve(
+                    f"uno:socket,host=127.0.0.1,port={self._port};urp;StarOffice.ComponentContext")
+                self._desktop = remote.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", remote)
+            document = self._desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(doc_path), "_blank", 0, properties(Hidden=True, ReadOnly=True))
+            if document is None:
+                raise ConversionError(f"LibreOffice could not open {doc_path}")
+            try:
+                document.storeToURL(uno.systemPathToFileUrl(output_path),
+                                    properties(FilterName="MS Word 2007 XML", Overwrite=True))
+            finally:
+                document.close(True)
+            return output_path
+        except ConversionError:
+            raise
+        except Exception as e:
+            if expired.is_set():
+                raise TimeoutError
+            # The connection may have gone with the instance; reconnect next time
+            self._desktop = None
+            raise ConversionError(f"LibreOffice conversion failed: {e}")
+        finally:
+            timer.cancel()
+
+    def _forward_to_client(self, doc_path, output_path, timeout):
+        # Each job gets its own output folder, so files with the same name never clash
+        job_dir = tempfile.mkdtemp(prefix="shiftcal-convert-")
+        try:
+            process = subprocess.run(
+                self._command("--convert-to", "docx", "--outdir", job_dir, doc_path),
+                capture_output=True, text=True, timeout=timeout
+            )
+            expected_file = os.path.join(job_dir, os.path.splitext(os.path.basename(doc_path))[0] + ".docx")
+            if not os.path.exists(expected_file):
+                raise ConversionError(
+                    f"LibreOffice conversion output file not found: {expected_file} {process.stderr.strip()}".strip()
+                )
+            shutil.move(expected_file, output_path)
+            return output_path
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+    def _command(self, *args):
+        profile_url = Path(self._profile_dir).as_uri()
+        return [self.executable, f"-env:UserInstallation={profile_url}",
+                "--headless", "--invisible", "--nologo", "--norestore", "--nolockcheck", *args]
+
+    def _ensure_started(self):
+        if self.running:
+            return
+        self.stop()
+        if not self.executable:
+            raise ConversionError("LibreOffice was not found")
+
+        self._profile_dir = tempfile.mkdtemp(prefix="shiftcal-lo-profile-")
+        port = self._port = _free_port()
+        kwargs = {}
+        if platform.system() == "Windows":
+            kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            # Own process group, so the soffice.bin child is stopped with it
+            kwargs['start_new_session'] = True
+        try:
+            self._process = subprocess.Popen(
+                self._command("--nodefault", f"--accept=socket,host=127.0.0.1,port={port};urp;"),
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs
+            )
+        except OSError as e:
+            raise ConversionError(f"Could not start LibreOffice: {e}")
+
+        # The instance is ready once it accepts connections on its port
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                self.stop()
+                raise ConversionError("LibreOffice exited during start-up")
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.1)
+        self.stop()
+        raise ConversionError(f"LibreOffice did not start within {self.startup_timeout} s")
+
+    def stop(self):
+        self._desktop = None
+        process, self._process = self._process, None
+        if process is not None and process.poll() is None:
+            try:
+                if platform.system() == "Windows":
+                    subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+                else:
+                    os.killpg(process.pid, signal.SIGTERM)
+                process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                if platform.system() != "Windows":
+                    try:
+                        os.killpg(process.pid, signal.SIGKILL)
+                    except OSError:
+                        pass
+                process.kill()
+                process.wait()
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+
+
+def uno_available():
+    """Whether LibreOffice's Python bridge can be imported, to drive conversions over UNO"""
+    global _uno_available
+    if _uno_available is None:
+        _uno_available = importlib.util.find_spec("uno") is not None
+    return _uno_available
+
+
+_uno_available = None
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
@@ -0,0 +1,1220 @@
+"""GUI-free core: reading and parsing the shift schedules and generating the calendars.
+
+Used by both the tkinter application and the command-line interface.
+"""
+from datetime import datetime, date
+import importlib.util
+from itertools import groupby, islice
+import logging
+import os
+import re
+import platform
+import subprocess
+import tempfile
+import shutil
+from operator import itemgetter
+
+from .calendars import (_calendar_worker, _init_calendar_worker, employee_events, write_employee_calendar,
+                        write_events_to)
+from .converter import ConversionError, find_libreoffice
+from .doc_tables import read_doc_tables
+from .docx_tables import UnsupportedDocument, iter_tables_fast
+from .incremental import CalendarState, update_employee_calendar
+from .months import find_month
+from .output import ARCHIVE_FILE_NAMES, AtomicFiles
+from .profiling import profile_items, profile_stage, report_path
+from .progress import RunCancelled, RunProgress
+from .roster import RosterIndex
+from .shifts import Shift
+
+# Version of the table extraction; bump when read_docx_tables output changes
+# so cached tables from older versions are not reused
+PARSER_VERSION = "2"
+
+SCHEDULE_EXTENSIONS = ('.doc', '.docx')
+
+# Filename markers of the specialty on-call schedules in batch runs
+CATH_LAB_MARKERS = ("CATH", "ΑΙΜΟΔΥΝΑΜ")
+EP_MARKERS = ("ΗΛΕΚΤΡΟΦΥΣΙΟΛ",)
+EP_WORD = re.compile(r'(?<![A-ZΑ-Ω])EP(?![A-ZΑ-Ω])')
+
+
+def find_month_year_in_filename(filename):
+    """Return (month, year) named in the filename, or None if it names no month.
+    
+    The year is None when the filename contains no year.
+    """
+    # Example: "ΕΦΗΜΕΡΙΕΣ ΜΑΡΤΙΟΣ 2025.docx"
+    month_num = find_month(filename)
+    if month_num is None:
+        return None
+    
+    # Found month, now look for year
+    year_match = re.search(r'20\d\d', filename)
+    if year_match:
+        return month_num, int(year_match.group())
+    return month_num, None
+
+
+def extract_month_year_from_filename(filename):
+    """Attempt to extract month and year from the filename."""
+    # Default to current month and year if extraction fails
+    default_month = datetime.now().month
+    default_year = datetime.now().year
+    
+    try:
+        found = find_month_year_in_filename(filename)
+        if found:
+            month, year = found
+            return month, year or default_year
+    except:
+        pass
+    
+    return default_month, default_year
+
+
+def classify_schedule(filename):
+    """Return 'cath_lab', 'ep' or 'main' for a schedule file name"""
+    name = filename.upper()
+    if any(marker in name for marker in CATH_LAB_MARKERS):
+        return 'cath_lab'
+    if any(marker in name for marker in EP_MARKERS) or EP_WORD.search(name):
+        return 'ep'
+    return 'main'
+
+
+def find_batch_jobs(directory, log):
+    """Group the schedules in a directory by the month and year in their names.
+    
+    Skipped files are reported to log(message, level=logging.WARNING).
+    Returns a list of jobs sorted by date, each a dict with month, year and
+    the main, cath_lab and ep file paths (None when missing).
+    """
+    jobs = {}
+    for filename in sorted(os.listdir(directory)):
+        if not filename.lower().endswith(SCHEDULE_EXTENSIONS):
+            continue
+        found = find_month_year_in_filename(filename)
+        if not found:
+            log(f"Skipping {filename}: no month in the file name", level=logging.WARNING)
+            continue
+        month, year = found
+        year = year or datetime.now().year
+        job = jobs.setdefault((year, month), {'month': month, 'year': year, 'main': None, 'cath_lab': None, 'ep': None})
+        kind = classify_schedule(filename)
+        if job[kind]:
+            log(f"Skipping {filename}: another {kind} schedule was found for {month}/{year}", level=logging.WARNING)
+            continue
+        job[kind] = os.path.join(directory, filename)
+    return [jobs[key] for key in sorted(jobs)]
+
+
+def merge_months(months):
+    """Merge the shifts of several monthly schedules into one list.
+    
+    months is a list of ((year, month), shifts), one entry per schedule.
+    Schedules run a few days into the next month, so consecutive ones both
+    list those days. Each date's shifts are taken from the schedule of the
+    date's own month when there is one, otherwise from the latest schedule
+    listing the date. Returns the merged shifts, in schedule order, and the
+    number of duplicate shifts dropped.
+    """
+    owners = {}
+    for period, shifts in months:
+        for shift in shifts:
+            owner = owners.get(shift.date)
+            if owner is None or owner == period:
+                owners[shift.date] = period
+                continue
+            own_month = (shift.date.year, shift.date.month)
+            if owner != own_month and (period == own_month or period > owner):
+                owners[shift.date] = period
+    
+    merged = []
+    for period, shifts in sorted(months, key=lambda entry: entry[0]):
+        merged.extend(shift for shift in shifts if owners[shift.date] == period)
+    return merged, sum(len(shifts) for _, shifts in months) - len(merged)
+
+
+def calendar_file_name(employee):
+    """File name of an employee's calendar in the output directory"""
+    return f"{employee.replace(' ', '_')}_shifts.ics"
+
+
+class ShiftCalendarCore:
+    """Reads the shift schedules and writes the calendar files, without any GUI.
+    
+    Status messages go to log(message, sensitive=False, level=logging.INFO)
+    and errors the user should see to on_error(title, message). Both default
+    to printing; per-row and per-calendar details are logged at DEBUG level.
+    
+    If a LibreOfficeConverter is given, .doc files are converted by its warm
+    instance, falling back to a one-off LibreOffice process and then Word.
+    With a DocumentCache, conversions and extracted tables are reused for
+    files whose content has not changed.
+    
+    Tables are read by the streaming reader in docx_tables, falling back to
+    python-docx for documents it does not handle, unless fast_tables is False.
+    .doc files are converted to .docx first; they are read directly by
+    doc_tables when direct_doc is True or when neither LibreOffice nor Word
+    is there to convert them, and converted after all if it cannot read them.
+    
+    With a StageProfiler, each stage of processing and generation is measured
+    per input file (see log_profile).
+    
+    The files read, rows parsed and calendars written are counted on
+    progress, a RunProgress. Cancelling it stops processing with no shifts
+    and stops generation after the calendars already written.
+    
+    With a ShiftHistory, the shifts and holidays read from each document are
+    also stored in its database, and process_history loads them back from it.
+    """
+    
+    def __init__(self, log=None, on_error=None, converter=None, cache=None, fast_tables=True, profiler=None,
+                 progress=None, history=None, direct_doc=False):
+        self._log = log or self._print_log
+        self.on_error = on_error or (lambda title, message: self._print_log(f"{title}: {message}", level=logging.ERROR))
+        self.converter = converter
+        self.cache = cache
+        self.fast_tables = fast_tables
+        self.direct_doc = direct_doc
+        self._can_convert = None
+        self.profiler = profiler
+        self.progress = progress if progress is not None else RunProgress()
+        self.history = history
+        
+        # Data storage
+        self.all_shifts = []
+        self.cath_lab_shifts = []
+        self.ep_shifts = []
+        self.all_employees = []
+        self.roster = None
+        # Dates marked as holidays in the main schedules ("*01**")
+        self.holidays = set()
+        # new/updated/skipped counts of the last generate_calendars run
+        self.generation_counts = {'new': 0, 'updated': 0, 'skipped': 0}
+        
+    @staticmethod
+    def _print_log(message, sensitive=False, level=logging.INFO):
+        if level >= logging.INFO:
+            print("[REDACTED]" if sensitive else message)
+        
+    def log(self, message, sensitive=False, level=logging.INFO):
+        """Pass a status message to the log callback"""
+        self._log(message, sensitive, level)
+        
+    def close(self):
+        """Stop the LibreOffice converter and the profiler's memory tracing, if any"""
+        if self.converter is not None:
+            self.converter.close()
+        if self.profiler is not None:
+            self.profiler.close()
+        
+    def process_files(self, input_file, month, year, cath_lab_file=None, ep_file=None):
+        """Read and parse the schedules, replacing any previously processed shifts.
+        
+        cath_lab_file/ep_file are None when those schedules are not included.
+        Returns True if any shifts were found in the main schedule.
+        """
+        self._clear()
+        self.progress.expect('files', 1 + (cath_lab_file is not None) + (ep_file is not None))
+        
+        try:
+            shifts, self.cath_lab_shifts, self.ep_shifts = self.read_month(input_file, month, year,
+                                                                           cath_lab_file, ep_file)
+        except RunCancelled:
+            return self._cancel_processing()
+        self.all_shifts = shifts
+        job = {'month': month, 'year': year, 'main': input_file, 'cath_lab': cath_lab_file, 'ep': ep_file}
+        self._store_history([(job, (shifts, self.cath_lab_shifts, self.ep_shifts))])
+        return self._index_shifts()
+        
+    def process_schedules(self, jobs, max_workers=None):
+        """Read and parse several months' schedules concurrently into one roster.
+        
+        jobs is a list of dicts with the month, year and the main, cath_lab and
+        ep file paths (the last two may be None), as from find_batch_jobs. The
+        months are read on a thread pool, so .doc conversions and document
+        reads overlap, then merged with merge_months, dropping the rollover
+        days listed again by the next month's schedule. Returns True if any
+        shifts were found in the main schedules.
+        """
+        self._clear()
+        if not jobs:
+            self.log("No schedules to process.")
+            return False
+        
+        # Imported here: only multi-month runs use a thread pool
+        from concurrent.futures import ThreadPoolExecutor
+        
+        workers = max_workers or min(len(jobs), 8)
+        self.log(f"Processing {len(jobs)} monthly schedules with {workers} threads...")
+        self.progress.expect('files', sum(1 + bool(job['cath_lab']) + bool(job['ep']) for job in jobs))
+        try:
+            with profile_stage(self.profiler, "read schedules"), ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda job: self.read_month(job['main'], job['month'], job['year'], job['cath_lab'], job['ep']),
+                    jobs
+                ))
+        except RunCancelled:
+            return self._cancel_processing()
+        self._store_history(zip(jobs, results))
+        
+        merged = []
+        for index, label in enumerate(("main", "Cath Lab", "Electrophysiology")):
+            months = [((job['year'], job['month']), result[index])
+                      for job, result in zip(jobs, results) if result[index]]
+            shifts, dropped = merge_months(months)
+            if dropped:
+                self.log(f"Dropped {dropped} {label} shifts on rollover days listed again by the next month")
+            merged.append(shifts)
+        self.all_shifts, self.cath_lab_shifts, self.ep_shifts = merged
+        return self._index_shifts()
+        
+    def process_history(self, start, end):
+        """Load the stored shifts dated start to end (inclusive) from the history, instead of reading documents.
+        
+        Replaces any previously processed shifts. Returns True if any shifts
+        were found in the main schedules.
+        """
+        self._clear()
+        # Imported here: sqlite3 is only needed with a history database
+        from .history import HistoryError
+        
+        self.log(f"Loading the shifts from {start} to {end} from the history...")
+        try:
+            with profile_stage(self.profiler, "load history"):
+                self.all_shifts, self.cath_lab_shifts, self.ep_shifts = self.history.load(start, end)
+                self.holidays = self.history.holidays(start, end)
+        except HistoryError as e:
+            self.on_error("Error", f"Could not load the shift history: {e}")
+            return False
+        return self._index_shifts()
+        
+    def _store_history(self, months):
+        """Store the shifts of each (job, read_month result) in the history database, if any"""
+        if self.history is None:
+            return
+        # Imported here: sqlite3 is only needed with a history database
+        from .history import SOURCES, HistoryError
+        
+        documents = []
+        for job, result in months:
+            for source, shifts in zip(SOURCES, result):
+                # Failed or missing schedules give no shifts and leave the stored ones alone
+                if job[source] and shifts:
+                    # The holidays among the dates this schedule lists (only main schedules mark them)
+                    first, last = min(shift.date for shift in shifts), max(shift.date for shift in shifts)
+                    holidays = [day for day in self.holidays if first <= day <= last] if source == 'main' else []
+                    documents.append((source, job[source], job['year'], job['month'], shifts, holidays))
+        try:
+            with profile_stage(self.profiler, "store history"):
+                stored = self.history.store(documents, PARSER_VERSION)
+        except (HistoryError, OSError) as e:
+            self.log(f"Could not store the shifts in the history: {e}", level=logging.WARNING)
+            return
+        if stored:
+            self.log(f"Stored {stored} new or changed shifts in the history")
+        
+    def _clear(self):
+        """Drop the previously processed shifts and profiler measurements"""
+        self.all_shifts = []
+        self.cath_lab_shifts = []
+        self.ep_shifts = []
+        self.all_employees = []
+        self.roster = None
+        self.holidays = set()
+        if self.profiler is not None:
+            self.profiler.reset()
+        
+    def _cancel_processing(self):
+        """Drop what a cancelled processing run read, returning False"""
+        self._clear()
+        self.log("Processing cancelled", level=logging.WARNING)
+        return False
+        
+    def read_month(self, input_file, month, year, cath_lab_file=None, ep_file=None):
+        """Read and parse one month's schedules, without touching the processed shifts.
+        
+        The Cath Lab and EP schedules are converted, read and parsed on their
+        own threads while this one reads the main schedule, so a run takes
+        about as long as its slowest document; a source that fails gives no
+        shifts without holding up the others.
+        
+        Returns (shifts, cath_lab_shifts, ep_shifts), each empty if its
+        document has no shifts or cannot be read. Safe to call from several
+        threads at once.
+        Raises RunCancelled if the run is cancelled.
+        """
+        specialty_files = [(path, label, shift_type) for path, label, shift_type in (
+            (cath_lab_file, "Cath Lab", "Cath Lab On-Call"),
+            (ep_file, "Electrophysiology", "Electrophysiology On-Call"),
+        ) if path is not None]
+        if not specialty_files:
+            return self.read_main_schedule(input_file, month, year), [], []
+        
+        # Imported here: only runs with on-call schedules use a thread pool
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=len(specialty_files), thread_name_prefix="schedule") as executor:
+            futures = {label: executor.submit(self.read_specialty_shifts, path, label, shift_type)
+                       for path, label, shift_type in specialty_files}
+            shifts = self.read_main_schedule(input_file, month, year)
+        
+        specialty_shifts = {}
+        for label, future in futures.items():
+            try:
+                specialty_shifts[label] = future.result()
+            except RunCancelled:
+                raise
+            except Exception as e:
+                self.log(f"Error reading the {label} schedule: {e}", level=logging.WARNING)
+                specialty_shifts[label] = []
+        return shifts, specialty_shifts.get("Cath Lab", []), specialty_shifts.get("Electrophysiology", [])
+        
+    def read_main_schedule(self, input_file, month, year):
+        """Read and parse a main schedule's two tables, returning its shifts"""
+        # Process main file
+        self.log(f"Processing main file: {input_file}")
+        return self._read_schedule(self.iter_main_schedule(input_file, month, year), input_file)
+        
+    def iter_main_schedule(self, input_file, month, year):
+        """Yield the shifts of a main schedule's two tables as its rows are read.
+        
+        Each row is read, classified and parsed before the next one is read,
+        so no table is held in memory; the month of the rows is carried along
+        the first table and the second. The stream can be consumed directly,
+        e.g. by RosterIndex or ShiftHistory.store, without listing the shifts.
+        Errors reading the document are raised to the consumer.
+        """
+        for table_index, rows in groupby(self.iter_table_rows(input_file), key=itemgetter(0)):
+            cells = (row for _, row in rows)
+            if table_index == 0:
+                self.log("Parsing first table (Regular/On-Call shifts)...")
+                yield from self._counted_shifts(self.iter_first_table(cells, month, year),
+                                                "Found {} shifts in first table")
+            elif table_index == 1:
+                self.log("Parsing second table (Μεγάλη/Μικρή/ΤΕΠ shifts)...")
+                yield from self._counted_shifts(self.iter_second_table(cells, month, year),
+                                                "Found {} shifts in second table")
+        
+    def _read_schedule(self, shifts, file_path):
+        """List the shifts of a schedule's stream, or none if its document cannot be read"""
+        try:
+            # Timed without reading the rows, which iter_table_rows times as "extract tables"
+            return list(profile_items(self.profiler, "parse", shifts, os.path.basename(file_path), exclusive=True))
+        except RunCancelled:
+            raise
+        except Exception as e:
+            self._document_error(e)
+            return []
+        finally:
+            self.progress.advance('files')
+        
+    def _counted_shifts(self, shifts, found_message):
+        """Yield the shifts, then log found_message with their number"""
+        count = 0
+        for shift in shifts:
+            count += 1
+            yield shift
+        self.log(found_message.format(count))
+        
+    def _index_shifts(self):
+        """List the employees and index the processed shifts, returning False if there are none"""
+        if not self.all_shifts:
+            self.log("No shifts found in any table!", level=logging.WARNING)
+            return False
+            
+        # Get unique employee names
+        self.all_employees = sorted(set(shift.employee for shift in self.all_shifts))
+        self.log(f"Found {len(self.all_shifts)} total shift assignments for {len(self.all_employees)} employees")
+        
+        # Index the roster once so each calendar only touches its own shifts
+        with profile_stage(self.profiler, "index"):
+            self.roster = RosterIndex(self.all_shifts, self.cath_lab_shifts, self.ep_shifts)
+        return True
+        
+    def read_specialty_shifts(self, file_path, label, shift_type):
+        """Read a Cath Lab or Electrophysiology on-call schedule"""
+        if not (file_path and os.path.exists(file_path)):
+            self.progress.advance('files')
+            self.log(f"{label} file not selected or not found.")
+            return []
+        self.log(f"Processing {label} file: {file_path}")
+        rows = (cells for _, cells in self.iter_table_rows(file_path))
+        shifts = self._read_schedule(self.iter_specialty_table(rows, shift_type), file_path)
+        self.log(f"Found {len(shifts)} {label} on-call shifts")
+        return shifts
+        
+    def generate_calendars(self, employees, output_dir, parallel=False, fast_writer=False, incremental=False,
+                           archive=None):
+        """Generate calendar files for the specified employees, returning how many were written.
+        
+        The files are written under temporary names and only replace the
+        previous calendars once all of them are written (see
+        shift_calendar.output). With incremental, calendars whose events have
+        not changed since the last incremental run into output_dir are left as
+        they are (see shift_calendar.incremental); the new/updated/skipped
+        counts are left in generation_counts.
+        
+        With archive 'zip' or 'ics', all the calendars are written into one
+        zip archive or one combined .ics file in output_dir instead.
+        """
+        self.progress.expect('calendars', len(employees))
+        if archive is not None:
+            if parallel or incremental:
+                self.log("An archive is written in full on one core; the parallel and incremental options are ignored",
+                         level=logging.WARNING)
+            return self._generate_archive(employees, output_dir, fast_writer, archive)
+        
+        state = CalendarState(output_dir) if incremental else None
+        files = AtomicFiles(output_dir)
+        with profile_stage(self.profiler, "generate calendars"):
+            if parallel and len(employees) > 1:
+                success_count = self._generate_calendars_parallel(employees, output_dir, fast_writer, state, files)
+            else:
+                success_count = self._generate_calendars_serial(employees, output_dir, fast_writer, state, files)
+        try:
+            with profile_stage(self.profiler, "commit files"):
+                files.commit()
+        except OSError as e:
+            self.log(f"Error saving the calendar files, the previous ones were kept: {e}", level=logging.ERROR)
+            return 0
+        
+        if state is not None:
+            try:
+                state.save()
+            except OSError as e:
+                self.log(f"Could not save the incremental generation state: {e}", level=logging.WARNING)
+            self.generation_counts = dict(state.counts)
+            # Unchanged calendars count as done but are not written again
+            generated = (f"{state.counts['new'] + state.counts['updated']} calendars ({state.counts['new']} new, "
+                         f"{state.counts['updated']} updated)")
+            unchanged = f", {state.counts['skipped']} unchanged"
+        else:
+            self.generation_counts = {'new': success_count, 'updated': 0, 'skipped': 0}
+            generated, unchanged = None, ""
+                
+        if self.progress.cancelled:
+            self.log(f"Cancelled after generating {success_count} of {len(employees)} calendars"
+                     + (f": {generated}{unchanged}" if generated else ""), level=logging.WARNING)
+        else:
+            self.log(f"Completed! Generated {generated or f'{success_count} calendars'} "
+                     f"in the selected output directory{unchanged}")
+        return success_count
+        
+    def _generate_archive(self, employees, output_dir, fast_writer, archive):
+        """Write all the calendars into one zip archive or combined .ics file, in one sequential write"""
+        file_name = ARCHIVE_FILE_NAMES[archive]
+        files = AtomicFiles(output_dir)
+        success_count = 0
+        try:
+            with profile_stage(self.profiler, "generate calendars"), open(files.path_for(file_name), 'wb') as f:
+                zip_file = None
+                if archive == 'zip':
+                    # Imported here: only needed for zip archives
+                    import zipfile
+                    zip_file = zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED)
+                for employee in employees:
+                    if self.progress.cancelled:
+                        break
+                    with profile_stage(self.profiler, "events"):
+                        events = employee_events(self.roster, employee)
+                    if not events:
+                        self.log("No shifts found for the specified employee", sensitive=True, level=logging.WARNING)
+                    elif zip_file is not None:
+                        with zip_file.open(calendar_file_name(employee), 'w') as entry:
+                            write_events_to(entry, events, fast_writer, self.profiler)
+                        success_count += 1
+                    else:
+                        write_events_to(f, events, fast_writer, self.profiler)
+                        success_count += 1
+                    self.progress.advance('calendars')
+                if zip_file is not None:
+                    zip_file.close()
+            if self.progress.cancelled:
+                files.abort()
+                self.log(f"Cancelled, {file_name} was not written", level=logging.WARNING)
+                return 0
+            with profile_stage(self.profiler, "commit files"):
+                files.commit()
+        except OSError as e:
+            files.abort()
+            self.log(f"Error saving {file_name}: {e}", level=logging.ERROR)
+            return 0
+        
+        self.generation_counts = {'new': success_count, 'updated': 0, 'skipped': 0}
+        self.log(f"Completed! Wrote {success_count} calendars into {file_name} in the selected output directory")
+        return success_count
+        
+    def log_profile(self, output_dir=None):
+        """Log the stage measurements since the files were processed, and save them in output_dir if given"""
+        if self.profiler is None:
+            return
+        self.log("Stage timings:")
+        for line in self.profiler.summary_lines():
+            self.log(f"  {line}")
+        if output_dir:
+            path = report_path(output_dir)
+            try:
+                self.profiler.write_report(path)
+                self.log(f"Timing report saved to {path}")
+            except OSError as e:
+                self.log(f"Could not save the timing report: {e}", level=logging.WARNING)
+
+    def check_roster(self, csv_path=None, max_shifts_per_week=None):
+        """Check the processed shifts for double bookings, missed rest and overloaded weeks.
+
+        Logs how many violations of each rule were found (see
+        shift_calendar.checks) and, with csv_path, writes them all with the
+        employees' names to that CSV file. Returns the violations, or None if
+        the check could not run.
+        """
+        # Imported here: the checks need numpy, which nothing else does
+        try:
+            from .checks import DEFAULT_MAX_SHIFTS_PER_WEEK, RULES, check_roster, write_violations
+            with profile_stage(self.profiler, "check roster"):
+                violations = check_roster(self.all_shifts, self.cath_lab_shifts, self.ep_shifts,
+                                          max_shifts_per_week or DEFAULT_MAX_SHIFTS_PER_WEEK)
+        except ImportError as e:
+            self.log(f"The roster check needs numpy (pip install numpy): {e}", level=logging.ERROR)
+            return None
+
+        if violations:
+            self.log(f"Roster check found {len(violations)} possible problems:", level=logging.WARNING)
+            for rule in RULES:
+                count = sum(violation.rule == rule for violation in violations)
+                if count:
+                    self.log(f"  {rule}: {count}", level=logging.WARNING)
+            for violation in violations:
+                self.log(f"{violation.rule} on {violation.date}: {violation.detail}", level=logging.DEBUG)
+        else:
+            self.log("Roster check found no problems")
+        if csv_path:
+            try:
+                write_violations(violations, csv_path)
+                self.log(f"Roster check saved to {csv_path}")
+            except OSError as e:
+                self.log(f"Could not save the roster check: {e}", level=logging.WARNING)
+        return violations
+
+    def analyze_workload(self, csv_path=None):
+        """Count each employee's processed shifts by type, weekday and month, and their weekend and holiday duties.
+
+        Holidays are the dates marked like "*01**" in the main schedules read,
+        or stored with them in the history. Logs the spread of each
+        count across the staff and, with csv_path, writes every employee's
+        counts to that CSV file. Returns the Workload (see
+        shift_calendar.analytics), or None if it could not be computed.
+        """
+        # Imported here: the analytics need numpy, which nothing else does
+        try:
+            from .analytics import Workload
+            with profile_stage(self.profiler, "analyze workload"):
+                workload = Workload(self.all_shifts, self.cath_lab_shifts, self.ep_shifts, self.holidays)
+        except ImportError as e:
+            self.log(f"The workload report needs numpy (pip install numpy): {e}", level=logging.ERROR)
+            return None
+
+        self.log(f"Workload of {len(workload.employees)} employees over {len(workload.months)} months "
+                 f"({len(self.holidays)} holidays marked), shifts per person:")
+        for label, lowest, median, highest in workload.spread():
+            self.log(f"  {label}: {lowest} to {highest}, median {median:g}")
+        if csv_path:
+            try:
+                workload.write_csv(csv_path)
+                self.log(f"Workload report saved to {csv_path}")
+            except OSError as e:
+                self.log(f"Could not save the workload report: {e}", level=logging.WARNING)
+        return workload
+
+    def _generate_calendars_serial(self, employees, output_dir, fast_writer, state, files):
+        """Generate the calendar files one after another on the current thread"""
+        success_count = 0
+        
+        for employee in employees:
+            if self.progress.cancelled:
+                break
+            file_name = calendar_file_name(employee)
+            output_file = os.path.join(output_dir, file_name)
+            write_file = files.path_for(file_name)
+            
+            if state is not None:
+                result = self.update_calendar_for_employee(employee, output_file, state, fast_writer, write_file)
+            else:
+                # Create calendar
+                result = self.create_calendar_for_employee(
+                    self.all_shifts, 
+                    employee, 
+                    write_file, 
+                    self.cath_lab_shifts, 
+                    self.ep_shifts,
+                    roster=self.roster,
+                    fast_writer=fast_writer
+                )
+            
+            if result:
+                success_count += 1
+                self.log(f"Calendar created successfully for employee: [REDACTED]", sensitive=True, level=logging.DEBUG)
+            else:
+                files.discard(file_name)
+                self.log(f"Failed to create calendar for employee: [REDACTED]", sensitive=True, level=logging.WARNING)
+            self.progress.advance('calendars')
+        
+        return success_count
+        
+    def _generate_calendars_parallel(self, employees, output_dir, fast_writer, state, files):
+        """Generate the calendar files across a process pool, logging results as they finish"""
+        workers = min(os.cpu_count() or 1, len(employees))
+        self.log(f"Generating in parallel with {workers} worker processes...")
+        success_count = 0
+        
+        # Imported here: the process pool machinery is only needed for parallel runs
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        
+        # The shifts are handed to each worker once, through the pool initializer
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_calendar_worker,
+                                 initargs=(self.all_shifts, self.cath_lab_shifts, self.ep_shifts)) as executor:
+            futures = {}
+            for employee in employees:
+                file_name = calendar_file_name(employee)
+                previous = state.get(file_name) if state is not None else None
+                future = executor.submit(_calendar_worker, employee, os.path.join(output_dir, file_name),
+                                         fast_writer, state is not None, previous, files.path_for(file_name))
+                futures[future] = file_name
+            for future in as_completed(futures):
+                try:
+                    employee, result, error, update = future.result()
+                except Exception as e:
+                    result, error = None, f"Worker process failed: {e}"
+                
+                if result:
+                    success_count += 1
+                    if update is not None:
+                        state.record(futures[future], *update)
+                    self.log(f"Calendar created successfully for employee: [REDACTED]", sensitive=True, level=logging.DEBUG)
+                else:
+                    files.discard(futures[future])
+                    if error.startswith("No shifts found"):
+                        self.log(error, sensitive=True, level=logging.WARNING)
+                    else:
+                        self.log(error, level=logging.ERROR)
+                    self.log(f"Failed to create calendar for employee: [REDACTED]", sensitive=True, level=logging.WARNING)
+                self.progress.advance('calendars')
+                if self.progress.cancelled:
+                    # Drop the calendars not started yet; the running ones finish
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+        
+        return success_count
+        
+    def can_convert_doc(self):
+        """Whether LibreOffice, or Word on Windows, is installed to convert .doc files"""
+        if self._can_convert is None:
+            executable = self.converter.executable if self.converter is not None else find_libreoffice()
+            self._can_convert = bool(executable) and (os.path.exists(executable)
+                                                      or shutil.which(executable) is not None)
+            if not self._can_convert and platform.system() == "Windows":
+                self._can_convert = importlib.util.find_spec("win32com") is not None
+            if not self._can_convert:
+                self.log("Neither LibreOffice nor Word was found; reading .doc files directly")
+        return self._can_convert
+        
+    def convert_doc_to_docx(self, doc_path):
+        """Convert a .doc file to .docx format using available tools."""
+        file_name, file_ext = os.path.splitext(doc_path)
+        
+        # If already a docx file, return the original path
+        if file_ext.lower() == '.docx':
+            return doc_path
+        
+        # Create a temporary output file, in its own folder so files with the same name never clash
+        temp_dir = tempfile.mkdtemp(prefix="shiftcal-")
+        base_name = os.path.basename(file_name)
+        output_path = os.path.join(temp_dir, f"{base_name}_converted.docx")
+        
+        conversion_successful = False
+        error_message = ""
+        
+        # Try the warm LibreOffice instance first
+        if self.converter is not None:
+            try:
+                self.converter.convert(doc_path, output_path)
+                conversion_successful = True
+            except ConversionError as e:
+                error_message = f"LibreOffice conversion failed: {str(e)}\n"
+        
+        # Then a one-off LibreOffice process (cross-platform)
+        if not conversion_successful:
+            try:
+                # Determine LibreOffice executable based on platform
+                libreoffice_cmd = find_libreoffice()
+                
+                if libreoffice_cmd:
+                    process = subprocess.run([
+                        libreoffice_cmd,
+                        "--headless",
+                        "--convert-to", "docx",
+                        "--outdir", temp_dir,
+                        doc_path
+                    ], capture_output=True, text=True, timeout=30)
+                    
+                    # LibreOffice sometimes creates with original filename in the output dir
+                    expected_file = os.path.join(temp_dir, f"{base_name}.docx")
+                    if os.path.exists(expected_file):
+                        # Rename to our expected output path
+                        shutil.move(expected_file, output_path)
+                        conversion_successful = True
+                    else:
+                        error_message += f"LibreOffice conversion output file not found: {expected_file}"
+            except Exception as e:
+                error_message += f"LibreOffice conversion failed: {str(e)}"
+        
+        # If LibreOffice failed, try Microsoft Word automation (Windows only)
+        if not conversion_successful and platform.system() == "Windows":
+            try:
+                import win32com.client
+                word = win32com.client.Dispatch("Word.Application")
+                word.Visible = False
+                
+                doc = word.Documents.Open(doc_path)
+                doc.SaveAs(output_path, FileFormat=16)  # 16 = docx format
+                doc.Close()
+                word.Quit()
+                
+                if os.path.exists(output_path):
+                    conversion_successful = True
+                else:
+                    error_message += "\nMicrosoft Word conversion output file not found."
+            except Exception as e:
+                error_message += f"\nMicrosoft Word conversion failed: {str(e)}"
+        
+        if conversion_successful:
+            self.log(f"Successfully converted {doc_path} to {output_path}")
+            return output_path
+        else:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            self.log(f"Failed to convert .doc to .docx: {error_message}", level=logging.ERROR)
+            raise Exception(f"Could not convert {doc_path} to .docx format. Please convert it manually and try again.")
+
+    def read_docx_tables(self, file_path):
+        """Read all tables content from a DOCX file."""
+        tables = []
+        try:
+            for table_index, cells in self.iter_table_rows(file_path):
+                while len(tables) <= table_index:
+                    tables.append([])
+                tables[table_index].append(cells)
+        except RunCancelled:
+            raise
+        except Exception as e:
+            self._document_error(e)
+            return []
+        return tables
+        
+    def _document_error(self, e):
+        """Report a document that could not be read"""
+        self.log(f"Error reading document: {e}", level=logging.ERROR)
+        if "Could not convert" in str(e):
+            # This is our custom error from conversion function
+            self.log(str(e), level=logging.ERROR)
+        self.on_error("Error", f"Could not process the document: {e}")
+        
+    def iter_table_rows(self, file_path):
+        """Yield (table index, cells) for each non-empty row of a document's tables, as they are read.
+        
+        The cells are stripped of surrounding whitespace. .docx files are
+        streamed a row at a time; .doc files are read whole, or converted and
+        then streamed. The rows are also stored in the cache, if any, as they
+        pass, and an unchanged document's rows are streamed from it. Errors
+        are raised to the consumer; if a reader fails after some rows, its
+        fallback continues after them.
+        """
+        self.progress.check()
+        source = os.path.basename(file_path)
+        # Reuse the tables of a document we have already read
+        # Rows read one way are never served to another, so switching readers reads the document again
+        cache_key = (self.cache.key_for(file_path, f"{PARSER_VERSION}/{self._reader_mode(file_path)}")
+                     if self.cache is not None else None)
+        rows = self.cache.get_rows(cache_key) if cache_key else None
+        if rows is not None:
+            self.log(f"Using cached tables for {source}", level=logging.DEBUG)
+            rows = self._rows_with_fallback(
+                rows, lambda: self._clean_rows(self._document_rows(file_path, None, source)),
+                (OSError, ValueError), "Could not read the cached tables")
+        else:
+            rows = self._clean_rows(self._document_rows(file_path, cache_key, source))
+            if cache_key:
+                rows = self._cache_rows(cache_key, rows)
+        yield from self._logged_rows(profile_items(self.profiler, "extract tables", rows, source))
+        
+    def _reader_mode(self, file_path):
+        """Which readers the rows of a document come from, as part of its cache key"""
+        reader = "fast" if self.fast_tables else "python-docx"
+        if os.path.splitext(file_path)[1].lower() == '.doc':
+            return "direct" if self.direct_doc or not self.can_convert_doc() else f"converted/{reader}"
+        return reader
+        
+    def _document_rows(self, file_path, cache_key, source):
+        """Yield (table index, cells) for each row of the document, converting .doc files if needed"""
+        file_ext = os.path.splitext(file_path)[1].lower()
+        temp_dir = None
+        if file_ext == '.doc':
+            converted_path = self.cache.get_docx(cache_key) if cache_key else None
+            tables = None
+            if converted_path:
+                self.log("Using cached .docx conversion", level=logging.DEBUG)
+            elif self.direct_doc or not self.can_convert_doc():
+                # Read .doc files directly when asked to or when nothing can convert them
+                try:
+                    tables = read_doc_tables(file_path)
+                except UnsupportedDocument as e:
+                    self.log(f"Could not read the .doc file directly ({e})")
+            if tables is not None:
+                for table_index, table in enumerate(tables):
+                    for cells in table:
+                        yield table_index, cells
+                return
+            
+            if converted_path:
+                file_path = converted_path
+            else:
+                self.log("Converting .doc file to .docx format...")
+                with profile_stage(self.profiler, "convert", source):
+                    converted_path = self.convert_doc_to_docx(file_path)
+                file_path = self._cache_docx(cache_key, converted_path) if cache_key else converted_path
+                if file_path == converted_path:
+                    # Not kept in the cache: remove the conversion's folder once it is read
+                    temp_dir = os.path.dirname(converted_path)
+        
+        try:
+            if self.fast_tables:
+                yield from self._rows_with_fallback(iter_tables_fast(file_path),
+                                                    lambda: self._python_docx_rows(file_path, source),
+                                                    UnsupportedDocument, "Reading the document with python-docx")
+            else:
+                yield from self._python_docx_rows(file_path, source)
+        finally:
+            if temp_dir is not None:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        
+    def _python_docx_rows(self, docx_path, source):
+        """Yield (table index, cells) for each table row of a .docx read by python-docx"""
+        # python-docx is slow to import and is only needed as the fallback
+        import docx
+        with profile_stage(self.profiler, "python-docx load", source):
+            doc = docx.Document(docx_path)
+        for table_index, table in enumerate(doc.tables):
+            for row in table.rows:
+                yield table_index, [cell.text for cell in row.cells]
+        
+    def _rows_with_fallback(self, rows, fallback, errors, message):
+        """Yield the rows, continuing with those of fallback() after the ones already yielded if rows raise errors"""
+        count = 0
+        try:
+            for row in rows:
+                yield row
+                count += 1
+        except errors as e:
+            self.log(f"{message} ({e})")
+            yield from islice(fallback(), count, None)
+        
+    @staticmethod
+    def _clean_rows(rows):
+        """Strip the cells of each row, skipping the empty rows"""
+        for table_index, cells in rows:
+            row_data = [text.strip() for text in cells]
+            if any(row_data):
+                yield table_index, row_data
+        
+    def _cache_rows(self, cache_key, rows):
+        """Yield the rows, storing them in the cache once they have all been read"""
+        try:
+            writer = self.cache.rows_writer(cache_key)
+        except OSError as e:
+            self.log(f"Could not cache the document tables: {e}", level=logging.WARNING)
+            yield from rows
+            return
+        try:
+            for row in rows:
+                if writer is not None:
+                    try:
+                        writer.write(row)
+                    except OSError as e:
+                        self.log(f"Could not cache the document tables: {e}", level=logging.WARNING)
+                        writer.abort()
+                        writer = None
+                yield row
+            if writer is not None:
+                try:
+                    writer.commit()
+                except OSError as e:
+                    self.log(f"Could not cache the document tables: {e}", level=logging.WARNING)
+        finally:
+            # Rows not read to the end, or a failed commit, leave no entry
+            if writer is not None:
+                writer.abort()
+        
+    def _logged_rows(self, rows):
+        """Yield the rows, logging how many each table had"""
+        table_index, count = None, 0
+        for row in rows:
+            if row[0] != table_index:
+                if table_index is not None:
+                    self.log(f"Table {table_index+1}: Found {count} rows with data", level=logging.DEBUG)
+                table_index, count = row[0], 0
+            count += 1
+            yield row
+        if table_index is None:
+            self.log("No tables found in the document.")
+        else:
+            self.log(f"Table {table_index+1}: Found {count} rows with data", level=logging.DEBUG)
+        
+    def _cache_docx(self, cache_key, converted_path):
+        """Move a fresh conversion into the cache, returning the path to read it from"""
+        try:
+            cached_path = self.cache.put_docx(cache_key, converted_path)
+        except OSError as e:
+            self.log(f"Could not cache the converted document: {e}", level=logging.WARNING)
+            return converted_path
+        try:
+            os.rmdir(os.path.dirname(converted_path))
+        except OSError:
+            pass
+        return cached_path
+
+    def _counted_rows(self, rows):
+        """Yield the rows of a table, counting them as parsed and raising RunCancelled if the run is cancelled"""
+        progress = self.progress
+        for row in rows:
+            progress.check()
+            yield row
+            progress.advance('rows')
+        
+    def parse_first_table(self, rows, month, year):
+        """Parse the first table format (Regular and On-Call shifts) with month rollover detection."""
+        return list(self.iter_first_table(rows, month, year))
+        
+    def iter_first_table(self, rows, month, year):
+        """Yield the shifts of the first table's rows as parse_first_table finds them, one row at a time"""
+        current_month = month
+        current_year = year
+        last_day = 0  # Track the last day number we've seen
+        
+        for row in self._counted_rows(rows):
+            if len(row) < 4:  # Ensure row has enough columns
+                continue
+            
+            try:
+                # Extract day, month_text, day_of_week, and employees
+                day = row[0].strip()
+                month_text = row[1].strip() if len(row) > 1 else ""
+                day_of_week = row[2].strip()
+                employees_cell = row[3].strip()
+                
+                # Handle special formatting like "*01**" for May 1st, marking holidays
+                is_holiday = "*" in day
+                day = day.strip("*").strip()
+                
+                # Skip header rows or rows without day number
+                if not day.isdigit():
+                    continue
+                    
+                day = int(day)
+                
+                # Check for explicit month name in the month_text field
+                found_month = find_month(month_text)
+                
+                if found_month is not None:
+                    # Use explicitly mentioned month
+                    current_month = found_month
+                    # If the new month is less than the original month, we've moved to next year
+                    # (set rather than incremented, as every later month of the new year matches too)
+                    if current_month < month and month > 10 and current_month < 3:
+                        current_year = year + 1
+                    self.log(f"Explicit month found: now processing {current_month}/{current_year}", level=logging.DEBUG)
+                elif day < last_day and last_day > 20 and day < 10:
+                    # Move to next month based on day number patterns
+                    current_month += 1
+                    if current_month > 12:
+                        current_month = 1
+                        current_year += 1
+                    self.log(f"Month rollover detected: now processing {current_month}/{current_year}", level=logging.DEBUG)
+                
+                last_day = day
+                if is_holiday:
+                    self.holidays.add(date(current_year, current_month, day))
+                
+                # Parse employee names (may contain two employees, one with asterisk)
+                employees = employees_cell.split('\n')
+                employees = [e.strip() for e in employees if e.strip()]
+                
+                for employee in employees:
+                    is_on_call = "*" in employee
+                    employee_name = employee.replace("*", "").strip()
+                    
+                    # Create shift date using current_month and current_year
+                    shift_date = date(current_year, current_month, day)
+                    
+                    shift_type = "On-Call Shift" if is_on_call else "Regular Shift"
+                    
+                    yield Shift(employee_name, shift_date, day_of_week, shift_type)
+            except Exception as e:
+                self.log(f"Error parsing row in first table {row}: {e}", level=logging.WARNING)
+                continue
+
+    def parse_second_table(self, rows, month, year):
+        """Parse the second table format (Μεγάλη, Μικρή, ΤΕΠ shifts) with month rollover detection."""
+        return list(self.iter_second_table(rows, month, year))
+        
+    def iter_second_table(self, rows, month, year):
+        """Yield the shifts of the second table's rows as parse_second_table finds them, one row at a time"""
+        current_month = month
+        current_year = year
+        last_day = 0  # Track the last day number we've seen
+        
+        for row in self._counted_rows(rows):
+            if len(row) < 6:  # Ensure row has enough columns for second table format
+                continue
+            
+            try:
+                # Extract day, month_text, day_of_week, and employees from different shifts
+                day = row[0].strip()
+                month_text = row[1].strip() if len(row) > 1 else ""
+                day_of_week = row[2].strip()
+                megali_shift = row[3].strip()
+                mikri_shift = row[4].strip()
+                tep_shift = row[5].strip()
+                
+                # Handle special formatting like "*01**" for May 1st, marking holidays
+                is_holiday = "*" in day
+                day = day.strip("*").strip()
+                
+                # Skip header rows or rows without day number
+                if not day.isdigit():
+                    continue
+                    
+                day = int(day)
+                
+                # Check for explicit month name in the month_text field
+                found_month = find_month(month_text)
+                
+                if found_month is not None:
+                    # Use explicitly mentioned month
+                    current_month = found_month
+                    # If the new month is less than the original month, we've moved to next year
+                    # (set rather than incremented, as every later month of the new year matches too)
+                    if current_month < month and month > 10 and current_month < 3:
+                        current_year = year + 1
+                    self.log(f"Explicit month found: now processing {current_month}/{current_year}", level=logging.DEBUG)
+                elif day < last_day and last_day > 20 and day < 10:
+                    # Move to next month based on day number patterns
+                    current_month += 1
+                    if current_month > 12:
+                        current_month = 1
+                        current_year += 1
+                    self.log(f"Month rollover detected: now processing {current_month}/{current_year}", level=logging.DEBUG)
+                
+                last_day = day
+                
+                # Use current_month and current_year for the shift date
+                shift_date = date(current_year, current_month, day)
+                if is_holiday:
+                    self.holidays.add(shift_date)
+                
+                # Process Μεγάλη shift (24h)
+                if megali_shift:
+                    employee_name = megali_shift.replace(">", "").strip()
+                    if employee_name:
+                        yield Shift(employee_name, shift_date, day_of_week, "Μεγάλη Shift (24h)")
+                
+                # Process Μικρή shift (24h)
+                if mikri_shift:
+                    employee_name = mikri_shift.replace(">", "").strip()
+                    if employee_name:
+                        yield Shift(employee_name, shift_date, day_of_week, "Μικρή Shift (24h)")
+                
+                # Process ΤΕΠ shift (12h)
+                if tep_shift:
+                    employee_name = tep_shift.replace(">", "").strip()
+                    if employee_name:
+                        yield Shift(employee_name, shift_date, day_of_week, "TEP Shift (12h)")
+                    
+            except Exception as e:
+                self.log(f"Error parsing row in second table {row}: {e}", level=logging.WARNING)
+                continue
+
+    def parse_specialty_on_call_table(self, rows, shift_type="On-Call Specialty"):
+        """Parse the specialty on-call table format with date (DD-MM-YYYY or DD/MM/YYYY) in first column."""
+        return list(self.iter_specialty_table(rows, shift_type))
+        
+    def iter_specialty_table(self, rows, shift_type="On-Call Specialty"):
+        """Yield the shifts of specialty on-call table rows as parse_specialty_on_call_table finds them"""
+        for row in self._counted_rows(rows):
+            if len(row) < 3:  # Ensure row has enough columns
+                continue
+            
+            try:
+                # Extract date, day_of_week, and employee
+                date_str = row[0].strip()
+                day_of_week = row[1].strip()
+                employee_name = row[2].strip()
+                
+                # Skip header rows or rows without proper date format
+                # Updated regex to match both DD-MM-YYYY and DD/MM/YYYY formats
+                if not re.match(r"\d{1,2}[-/]\d{1,2}[-/]\d{4}", date_str):
+                    continue
+                
+                # Parse date (supports both DD-MM-YYYY and DD/MM/YYYY)
+                if '-' in date_str:
+                    day, month, year = map(int, date_str.split('-'))
+                elif '/' in date_str:
+                    day, month, year = map(int, date_str.split('/'))
+                else:
+                    continue  # Skip if date format doesn't match either pattern
+                    
+                shift_date = date(year, month, day)
+                
+                if employee_name:
+                    yield Shift(employee_name, shift_date, day_of_week, shift_type)
+                    
+            except Exception as e:
+                self.log(f"Error parsing row in specialty on-call table {row}: {e}", level=logging.WARNING)
+                continue
+
+    def update_calendar_for_employee(self, employee_name, output_file, state, fast_writer=False, write_file=None):
+        """Rewrite an employee's calendar only if its events changed since the state was saved.
+        
+        The calendar is written to write_file instead, if given. Records the
+        outcome in state and returns output_file, or None on failure.
+        """
+        file_name = os.path.basename(output_file)
+        try:
+            status, entry = update_employee_calendar(self.roster, employee_name, output_file,
+                                                     state.get(file_name), fast_writer, self.profiler,
+                                                     write_file=write_file)
+        except Exception as e:
+            self.log(f"Error saving calendar file: {e}", level=logging.ERROR)
+            return None
+        if status is None:
+            self.log("No shifts found for the specified employee", sensitive=True, level=logging.WARNING)
+            return None
+        state.record(file_name, status, entry)
+        return output_file
+        
+    def create_calendar_for_employee(self, shifts, employee_name, output_file, cath_lab_shifts=None, ep_shifts=None, roster=None, fast_writer=False):
+        """Create an iCalendar file with all-day events for a specific employee."""
+        # Build the index on the fly when called without one from process_files
+        if roster is None:
+            roster = RosterIndex(shifts, cath_lab_shifts, ep_shifts)
+        
+        # Write to file
+        try:
+            if not write_employee_calendar(roster, employee_name, output_file, fast_writer, self.profiler):
+                self.log("No shifts found for the specified employee", sensitive=True, level=logging.WARNING)
+                return None
+            return output_file
+        except Exception as e:
+            self.log(f"Error saving calendar file: {e}", level=logging.ERROR)
+            return None
@@ -0,0 +1,470 @@
+"""Table extraction straight from a Word 97-2003 .doc file, without LibreOffice.
+
+A .doc file is an OLE compound file whose WordDocument stream holds the text
+and the paragraph properties, and whose table stream (0Table or 1Table)
+holds the piece table mapping the text to the WordDocument stream. In the
+text, every table cell ends with a cell mark (\\x07), and every row with one
+more \\x07 paragraph marked as the row end, whose properties carry the row's
+cell layout and merges.
+
+read_doc_tables returns the same rows of cell text as read_tables_fast does
+for the same document saved as .docx, merged cells repeating the merged
+text. Documents it cannot read exactly (Word 6/95 files, encrypted files,
+nested tables) raise UnsupportedDocument so the caller can convert them with
+LibreOffice instead.
+"""
+import re
+import struct
+from bisect import bisect_right
+
+from .docx_tables import UnsupportedDocument
+
+_CFB_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+_END_OF_CHAIN = 0xFFFFFFFE
+_FREE_SECTOR = 0xFFFFFFFF
+_STREAM = 2
+
+_WORD_IDENT = 0xA5EC
+# nFib of Word 97 and later; Word 6 and 95 files have a different layout
+_WORD97_NFIB = 0x00C1
+_FKP_SIZE = 512
+
+# Indices into FibRgFcLcb97
+_FC_PLCF_BTE_PAPX = 13
+_FC_CLX = 33
+
+# Paragraph and table property modifiers (sprms) used
+_SPRM_P_IN_TABLE = 0x2416
+_SPRM_P_TTP = 0x2417
+_SPRM_P_INNER_TABLE_CELL = 0x244B
+_SPRM_P_INNER_TTP = 0x244C
+_SPRM_P_HUGE_PAPX = 0x6646
+_SPRM_P_ITAP = 0x6649
+_SPRM_P_DTAP = 0x664A
+_SPRM_P_CHG_TABS = 0xC615
+_SPRM_T_DEF_TABLE = 0xD608
+_SPRM_T_DEF_TABLE10 = 0xD606
+_SPRM_T_VERT_MERGE = 0xD62B
+# Operand sizes by the sprm's spra bits; 6 means variable
+_OPERAND_SIZES = (1, 1, 2, 4, 2, 2, None, 3)
+
+# Cell merge codes of a TC80
+_MERGED_WITH_PREVIOUS = (2, 3)
+_MERGED_WITH_ABOVE = 1
+# Narrowest grid column, in twips, laid out without converting
+_MIN_COLUMN_WIDTH = 20
+
+_PARAGRAPH_END = re.compile("[\r\x07\x0c]")
+_SPECIAL = re.compile("[\x00-\x08\x0b-\x1f]")
+# Text of the special characters kept, as the .docx equivalents read; the
+# other control characters (pictures, footnote and comment references, page
+# and column breaks, optional hyphens) have none
+_SPECIAL_TEXT = {"\x0b": "\n", "\x1e": "-"}
+_FIELD_BEGIN, _FIELD_SEPARATOR, _FIELD_END = "\x13", "\x14", "\x15"
+
+
+def read_doc_tables(file_path):
+    """Return the cell text of every table in a .doc, as read_tables_fast reads the same .docx.
+
+    Raises UnsupportedDocument when the document cannot be read this way.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    try:
+        return _read_tables(_CompoundFile(data))
+    except (struct.error, IndexError, KeyError, ValueError) as e:
+        raise UnsupportedDocument(f"damaged .doc file ({e})")
+
+
+class _CompoundFile:
+    """The streams of the root storage of an OLE compound file"""
+
+    def __init__(self, data):
+        if data[:8] != _CFB_SIGNATURE:
+            raise UnsupportedDocument("not a Word 97-2003 document")
+        self.data = data
+        major_version, _, sector_shift, mini_sector_shift = struct.unpack_from("<4H", data, 0x1A)
+        self.sector_size = 1 << sector_shift
+        self.mini_sector_size = 1 << mini_sector_shift
+        (fat_sectors, first_directory_sector, self.mini_cutoff, first_mini_fat_sector, mini_fat_sectors,
+         first_difat_sector, difat_sectors) = struct.unpack_from("<2I4x5I", data, 0x2C)
+
+        # The FAT sectors are listed in the header, then in a chain of DIFAT sectors
+        fat_sector_ids = [sector for sector in struct.unpack_from("<109I", data, 0x4C) if sector != _FREE_SECTOR]
+        per_difat_sector = self.sector_size // 4 - 1
+        sector = first_difat_sector
+        for _ in range(difat_sectors):
+            entries = struct.unpack_from(f"<{per_difat_sector + 1}I", data, self._offset(sector))
+            fat_sector_ids.extend(entry for entry in entries[:-1] if entry != _FREE_SECTOR)
+            sector = entries[-1]
+        fat_sector_ids = fat_sector_ids[:fat_sectors]
+        self.fat = self._table(fat_sector_ids)
+
+        directory = self._read_chain(first_directory_sector, self.fat, self._sector)
+        entries = [self._directory_entry(directory, offset, major_version)
+                   for offset in range(0, len(directory) - 127, 128)]
+        root = entries[0]
+        self.mini_stream = self._read_chain(root[5], self.fat, self._sector)[:root[6]]
+        if mini_fat_sectors:
+            self.mini_fat = self._table(self._chain(first_mini_fat_sector, self.fat))
+        else:
+            self.mini_fat = ()
+
+        # Streams directly in the root storage, by name: a tree of siblings under the root's child
+        self.streams = {}
+        seen = set()
+        pending = [root[4]]
+        while pending:
+            index = pending.pop()
+            if index >= len(entries) or index in seen:
+                continue
+            seen.add(index)
+            name, kind, left, right, _, start, size = entries[index]
+            if kind == _STREAM:
+                self.streams[name] = (start, size)
+            pending += [left, right]
+
+    def stream(self, name, required=True):
+        """The content of a stream of the root storage, or None if it is missing and not required"""
+        if name not in self.streams:
+            if required:
+                raise UnsupportedDocument(f"no {name} stream")
+            return None
+        start, size = self.streams[name]
+        if size < self.mini_cutoff:
+            return self._read_chain(start, self.mini_fat, self._mini_sector)[:size]
+        return self._read_chain(start, self.fat, self._sector)[:size]
+
+    def _offset(self, sector):
+        return (sector + 1) * self.sector_size
+
+    def _sector(self, sector):
+        offset = self._offset(sector)
+        return self.data[offset:offset + self.sector_size]
+
+    def _mini_sector(self, sector):
+        offset = sector * self.mini_sector_size
+        return self.mini_stream[offset:offset + self.mini_sector_size]
+
+    def _table(self, sectors):
+        """A FAT or mini FAT read from its sectors"""
+        content = b"".join(self._sector(sector) for sector in sectors)
+        return struct.unpack(f"<{len(content) // 4}I", content)
+
+    def _chain(self, start, table):
+        sectors = []
+        sector = start
+        while sector != _END_OF_CHAIN:
+            if sector >= len(table) or len(sectors) > len(table):
+                raise UnsupportedDocument("damaged sector chain")
+            sectors.append(sector)
+            sector = table[sector]
+        return sectors
+
+    def _read_chain(self, start, table, read_sector):
+        return b"".join(read_sector(sector) for sector in self._chain(start, table))
+
+    @staticmethod
+    def _directory_entry(directory, offset, major_version):
+        name_length, kind, _, left, right, child = struct.unpack_from("<HBBIII", directory, offset + 64)
+        start, size = struct.unpack_from("<IQ", directory, offset + 116)
+        if major_version == 3:
+            # Version 3 files only use the low 32 bits of the size
+            size &= 0xFFFFFFFF
+        name = directory[offset:offset + max(name_length - 2, 0)].decode('utf-16-le', 'replace')
+        return name, kind, left, right, child, start, size
+
+
+def _read_tables(compound_file):
+    word_document = compound_file.stream("WordDocument")
+    ident, nfib = struct.unpack_from("<HH", word_document, 0)
+    if ident != _WORD_IDENT:
+        raise UnsupportedDocument("not a Word document")
+    if nfib < _WORD97_NFIB:
+        raise UnsupportedDocument("Word 6/95 documents are not supported")
+    flags = struct.unpack_from("<H", word_document, 0x0A)[0]
+    if flags & 0x0100:
+        raise UnsupportedDocument("the document is encrypted")
+    table_stream = compound_file.stream("1Table" if flags & 0x0200 else "0Table")
+
+    # FibRgW97, FibRgLw97 and FibRgFcLcb follow the 32-byte FibBase, each after its count
+    offset = 32
+    rg_w_count = struct.unpack_from("<H", word_document, offset)[0]
+    offset += 2 + 2 * rg_w_count
+    rg_lw_count = struct.unpack_from("<H", word_document, offset)[0]
+    ccp_text = struct.unpack_from("<i", word_document, offset + 2 + 3 * 4)[0]
+    offset += 2 + 4 * rg_lw_count
+    fc_lcb_count = struct.unpack_from("<H", word_document, offset)[0]
+    fc_lcb = struct.unpack_from(f"<{2 * fc_lcb_count}I", word_document, offset + 2)
+
+    def blob(index):
+        fc, lcb = fc_lcb[2 * index], fc_lcb[2 * index + 1]
+        return table_stream[fc:fc + lcb]
+
+    text, pieces = _main_text(word_document, blob(_FC_CLX), ccp_text)
+    paragraphs = _ParagraphProperties(word_document, blob(_FC_PLCF_BTE_PAPX), compound_file.stream("Data", False))
+    return _TableBuilder().build(text, pieces, paragraphs)
+
+
+def _main_text(word_document, clx, ccp_text):
+    """The main document text and its pieces as (first character, fc, compressed) triples"""
+    # The CLX holds property modifiers (skipped) and then the piece table
+    offset = 0
+    while offset < len(clx) and clx[offset] == 0x01:
+        offset += 3 + struct.unpack_from("<h", clx, offset + 1)[0]
+    if offset >= len(clx) or clx[offset] != 0x02:
+        raise UnsupportedDocument("no piece table")
+    size = struct.unpack_from("<I", clx, offset + 1)[0]
+    count = (size - 4) // 12
+    cps = struct.unpack_from(f"<{count + 1}i", clx, offset + 5)
+    descriptors = offset + 5 + 4 * (count + 1)
+
+    parts = []
+    pieces = []
+    for index in range(count):
+        start, end = cps[index], min(cps[index + 1], ccp_text)
+        if start >= end:
+            break
+        fc = struct.unpack_from("<I", clx, descriptors + 8 * index + 2)[0]
+        compressed = bool(fc & 0x40000000)
+        fc &= 0x3FFFFFFF
+        if compressed:
+            # 8-bit text, stored at half the given offset
+            fc //= 2
+            parts.append(word_document[fc:fc + end - start].decode('cp1252', 'replace'))
+        else:
+            parts.append(word_document[fc:fc + 2 * (end - start)].decode('utf-16-le', 'replace'))
+        pieces.append((start, fc, compressed))
+    return "".join(parts), pieces
+
+
+class _ParagraphProperties:
+    """The table properties of the paragraphs, looked up by the position of their mark"""
+
+    def __init__(self, word_document, plcf_bte_papx, data_stream):
+        self.data_stream = data_stream
+        count = (len(plcf_bte_papx) - 4) // 8
+        page_numbers = struct.unpack_from(f"<{count}I", plcf_bte_papx, 4 * (count + 1))
+        self.starts = []
+        self.ends = []
+        self.properties = []
+        cache = {}
+        for page_number in page_numbers:
+            page = word_document[(page_number & 0x3FFFFF) * _FKP_SIZE:][:_FKP_SIZE]
+            runs = page[-1]
+            fcs = struct.unpack_from(f"<{runs + 1}I", page, 0)
+            for run in range(runs):
+                papx_offset = 2 * page[4 * (runs + 1) + 13 * run]
+                grpprl = self._grpprl(page, papx_offset) if papx_offset else b""
+                if grpprl not in cache:
+                    cache[grpprl] = self._parse(grpprl)
+                self.starts.append(fcs[run])
+                self.ends.append(fcs[run + 1])
+                self.properties.append(cache[grpprl])
+
+    def at(self, fc):
+        """Properties of the paragraph whose mark is at fc"""
+        index = bisect_right(self.starts, fc) - 1
+        if index >= 0 and fc < self.ends[index]:
+            return self.properties[index]
+        return _NO_PROPERTIES
+
+    @staticmethod
+    def _grpprl(page, offset):
+        # A PapxInFkp: a count of 16-bit words, then the style index and the property modifiers
+        size = page[offset]
+        if size:
+            return page[offset + 3:offset + 2 * size]
+        size = page[offset + 1]
+        return page[offset + 4:offset + 2 + 2 * size]
+
+    def _parse(self, grpprl):
+        properties = {}
+        for sprm, operand in _sprms(grpprl):
+            if sprm == _SPRM_P_IN_TABLE:
+                properties['in_table'] = bool(operand[0])
+            elif sprm == _SPRM_P_TTP:
+                properties['row_end'] = bool(operand[0])
+            elif sprm in (_SPRM_P_INNER_TABLE_CELL, _SPRM_P_INNER_TTP):
+                properties['nested'] = properties.get('nested', False) or bool(operand[0])
+            elif sprm == _SPRM_P_ITAP:
+                properties['nested'] = properties.get('nested', False) or struct.unpack("<i", operand)[0] > 1
+            elif sprm == _SPRM_P_DTAP:
+                properties['nested'] = properties.get('nested', False) or struct.unpack("<i", operand)[0] > 0
+            elif sprm == _SPRM_T_DEF_TABLE:
+                properties['cells'] = _table_definition(operand)
+            elif sprm == _SPRM_T_VERT_MERGE:
+                cell, merge = operand[1], operand[2]
+                if 'cells' in properties and cell < len(properties['cells']):
+                    properties['cells'][cell][3] = merge
+            elif sprm == _SPRM_P_HUGE_PAPX and self.data_stream is not None:
+                # The rest of the properties are in the Data stream
+                offset = struct.unpack("<I", operand)[0]
+                size = struct.unpack_from("<H", self.data_stream, offset)[0]
+                huge = self._parse(self.data_stream[offset + 2:offset + 2 + size])
+                properties.update(huge)
+        return properties
+
+
+_NO_PROPERTIES = {}
+
+
+def _sprms(grpprl):
+    """(sprm, operand) pairs of a list of property modifiers"""
+    offset = 0
+    while offset + 2 <= len(grpprl):
+        sprm = struct.unpack_from("<H", grpprl, offset)[0]
+        offset += 2
+        size = _OPERAND_SIZES[sprm >> 13]
+        if size is None:
+            if sprm in (_SPRM_T_DEF_TABLE, _SPRM_T_DEF_TABLE10):
+                # A 16-bit size, one more than the bytes after it
+                size = 2 + struct.unpack_from("<H", grpprl, offset)[0] - 1
+            elif sprm == _SPRM_P_CHG_TABS and grpprl[offset] == 255:
+                deleted = grpprl[offset + 1]
+                added = grpprl[offset + 2 + 4 * deleted]
+                size = 3 + 4 * deleted + 3 * added
+            else:
+                size = 1 + grpprl[offset]
+        yield sprm, grpprl[offset:offset + size]
+        offset += size
+
+
+def _table_definition(operand):
+    """[left edge, right edge, horizontal merge, vertical merge] of each cell of a row, from a TDefTable"""
+    count = operand[2]
+    edges = struct.unpack_from(f"<{count + 1}h", operand, 3)
+    tc_offset = 3 + 2 * (count + 1)
+    cells = []
+    for index in range(count):
+        flags = 0
+        if tc_offset + 20 * index + 2 <= len(operand):
+            flags = struct.unpack_from("<H", operand, tc_offset + 20 * index)[0]
+        cells.append([edges[index], edges[index + 1], flags & 0x3, (flags >> 5) & 0x3])
+    return cells
+
+
+class _TableBuilder:
+    """Splits the text into paragraphs and collects the cells of the top-level tables"""
+
+    def __init__(self):
+        self.tables = []
+        self.rows = []
+        self.row = []
+        self.paragraphs = []
+        # Open fields, True once past their instructions and into their result
+        self.fields = []
+
+    def build(self, text, pieces, paragraph_properties):
+        piece_starts = [piece[0] for piece in pieces]
+        start = 0
+        carried = ""
+        for match in _PARAGRAPH_END.finditer(text):
+            end = match.start()
+            mark = match.group()
+            paragraph = carried + self._text(text[start:end])
+            carried = ""
+            start = end + 1
+            if mark == "\x0c":
+                if self.row or self.paragraphs:
+                    # A page break inside a table, which has no text
+                    carried = paragraph
+                else:
+                    # A section or page break between paragraphs
+                    self._end_table()
+                continue
+
+            first, fc, compressed = pieces[bisect_right(piece_starts, end) - 1]
+            fc += (end - first) * (1 if compressed else 2)
+            properties = paragraph_properties.at(fc)
+            if properties.get('nested'):
+                raise UnsupportedDocument("nested tables are not supported")
+
+            if mark == "\x07":
+                if properties.get('row_end'):
+                    self._end_row(properties.get('cells'))
+                else:
+                    self.row.append("\n".join([*self.paragraphs, paragraph]))
+                    self.paragraphs = []
+            elif properties.get('in_table'):
+                self.paragraphs.append(paragraph)
+            else:
+                self._end_table()
+        self._end_table()
+        return self.tables
+
+    def _text(self, raw):
+        """Text of a paragraph without the field instructions and control characters"""
+        if not self.fields and not _SPECIAL.search(raw):
+            return raw
+        parts = []
+        for char in raw:
+            if char == _FIELD_BEGIN:
+                self.fields.append(False)
+            elif char == _FIELD_SEPARATOR:
+                if self.fields:
+                    self.fields[-1] = True
+            elif char == _FIELD_END:
+                if self.fields:
+                    self.fields.pop()
+            elif all(self.fields):
+                if char in _SPECIAL_TEXT:
+                    parts.append(_SPECIAL_TEXT[char])
+                elif char == "\t" or char >= " ":
+                    parts.append(char)
+        return "".join(parts)
+
+    def _end_row(self, cells):
+        if self.paragraphs:
+            # Paragraphs after the last cell mark belong to no cell
+            self.paragraphs = []
+        row, self.row = self.row, []
+        if cells is None:
+            raise UnsupportedDocument("a table row has no cell layout")
+        if len(cells) != len(row):
+            raise UnsupportedDocument("a row's cells do not match its definition")
+        self.rows.append((row, cells))
+
+    def _end_table(self):
+        self.row = []
+        self.paragraphs = []
+        if self.rows:
+            self.tables.append(_grid_rows(self.rows))
+            self.rows = []
+
+
+def _grid_rows(rows):
+    """Cell text of a table's (texts, cell layout) rows, laid out on its grid columns.
+
+    The grid columns lie between the cell edges of all the rows together, as
+    in the table grid of the .docx conversion. A cell spanning several
+    columns, whether one wide cell or older cells merged with the previous
+    one, repeats its text in each, like a w:gridSpan cell for
+    read_tables_fast; a vertically merged cell repeats the cell above it.
+    """
+    edges = sorted({edge for _, cells in rows for left, right, _, _ in cells for edge in (left, right)})
+    if any(right - left < _MIN_COLUMN_WIDTH for left, right in zip(edges, edges[1:])):
+        # Edges this close may be one column or two depending on the converter
+        raise UnsupportedDocument("table cell edges too close together to lay out in columns")
+    columns = {edge: index for index, edge in enumerate(edges)}
+
+    table = []
+    above = None
+    for texts, cells in rows:
+        # [first grid column, cell text repeated over its columns] of each cell
+        merged = []
+        for text, (left, right, horizontal, vertical) in zip(texts, cells):
+            if right <= left:
+                raise UnsupportedDocument("a table cell has no width")
+            span = columns[right] - columns[left]
+            if horizontal in _MERGED_WITH_PREVIOUS and merged:
+                merged[-1][1] = merged[-1][1] + [merged[-1][1][0]] * span
+            elif vertical == _MERGED_WITH_ABOVE:
+                if above is None or columns[left] not in above:
+                    raise UnsupportedDocument("vertical merge without a cell above it")
+                merged.append([columns[left], above[columns[left]]])
+            else:
+                merged.append([columns[left], [text] * span])
+        above = {column: cell_texts for column, cell_texts in merged}
+        table.append([text for _, cell_texts in merged for text in cell_texts])
+    return table
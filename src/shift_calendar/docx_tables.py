@@ -0,0 +1,223 @@
+"""Fast table extraction straight from a .docx file's main document XML.
+
+python-docx builds the whole document tree and rebuilds the cell grid on
+every row.cells call. read_tables_fast instead streams the main document part
+through expat and keeps only the text of the body's tables, resolving
+horizontal (gridSpan) and vertical (vMerge) merges the way python-docx's
+row.cells and cell.text do. Anything it cannot reproduce exactly raises
+UnsupportedDocument so the caller can fall back to python-docx.
+
+iter_tables_fast yields the same rows one at a time as the XML is parsed,
+for documents too large to hold every row at once.
+"""
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+# Element kinds by (parent kind, tag). Elements not listed here, and
+# everything inside them, are ignored, as they are by python-docx: it only
+# reads body-level tables, their direct rows and cells, the cells' direct
+# paragraphs and the runs directly in a paragraph or hyperlink.
+_CHILDREN = {
+    "root": {"document": "document"},
+    "document": {"body": "body"},
+    "body": {"tbl": "tbl"},
+    "tbl": {"tr": "tr"},
+    "tr": {"trPr": "trPr", "tc": "tc"},
+    "trPr": {"gridBefore": "gridBefore"},
+    "tc": {"tcPr": "tcPr", "p": "p"},
+    "tcPr": {"gridSpan": "gridSpan", "vMerge": "vMerge"},
+    "p": {"r": "r", "hyperlink": "hyperlink"},
+    "hyperlink": {"r": "r"},
+    "r": {"t": "t", "tab": "tab", "ptab": "ptab", "br": "br", "cr": "cr", "noBreakHyphen": "noBreakHyphen"},
+}
+_CHILDREN = {parent: {f"{W_NS} {tag}": kind for tag, kind in children.items()}
+             for parent, children in _CHILDREN.items()}
+
+# Text of the run content elements other than w:t (w:br depends on its type)
+_RUN_TEXT = {"tab": "\t", "ptab": "\t", "cr": "\n", "noBreakHyphen": "-"}
+
+_VAL = f"{W_NS} val"
+_TYPE = f"{W_NS} type"
+
+# Bytes of the document XML parsed at a time
+_CHUNK_SIZE = 64 * 1024
+
+
+class UnsupportedDocument(Exception):
+    """The document uses something the fast reader does not handle."""
+
+
+def main_document_part(archive):
+    """Name of the main document part in an open .docx zip"""
+    try:
+        rels = ET.fromstring(archive.read("_rels/.rels"))
+    except (KeyError, ET.ParseError):
+        raise UnsupportedDocument("no package relationships")
+    for rel in rels.iter(f"{{{_RELS_NS}}}Relationship"):
+        if rel.get("Type") == _OFFICE_DOCUMENT and rel.get("TargetMode") != "External":
+            return posixpath.normpath(rel.get("Target", "").lstrip("/"))
+    raise UnsupportedDocument("no main document part")
+
+
+def read_tables_fast(file_path):
+    """Return the cell text of every table in a .docx, as python-docx reads it.
+
+    The result has one list per body-level table, one list per row and one
+    string per layout-grid cell, equal to [cell.text for cell in row.cells].
+    Raises UnsupportedDocument when the document cannot be read this way.
+    """
+    reader = _TableReader()
+    rows = list(_read_rows(file_path, reader))
+    tables = [[] for _ in range(reader.table_count)]
+    for table_index, cells in rows:
+        tables[table_index].append(cells)
+    return tables
+
+
+def iter_tables_fast(file_path):
+    """Yield (table index, cells) for each table row of a .docx while it is being read.
+
+    The rows are those of read_tables_fast, but only the current and the
+    previous row are held in memory, so documents of any length read in
+    constant memory. Tables without rows yield nothing. Raises
+    UnsupportedDocument, possibly after some rows, when the document cannot
+    be read this way.
+    """
+    return _read_rows(file_path, _TableReader())
+
+
+def _read_rows(file_path, reader):
+    """Feed the main document part to reader in chunks, yielding the rows it completes"""
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            part_name = main_document_part(archive)
+            try:
+                stream = archive.open(part_name)
+            except KeyError:
+                raise UnsupportedDocument(f"main document part {part_name} is missing")
+            with stream:
+                parser = reader.parser()
+                while True:
+                    chunk = stream.read(_CHUNK_SIZE)
+                    parser.Parse(chunk, not chunk)
+                    completed, reader.completed = reader.completed, []
+                    yield from completed
+                    if not chunk:
+                        break
+    except (zipfile.BadZipFile, expat.ExpatError, ValueError) as e:
+        raise UnsupportedDocument(str(e))
+
+
+class _TableReader:
+    """expat handlers turning the body's tables into rows of cell text as each row ends"""
+
+    def __init__(self):
+        self.stack = ["root"]
+        # (table index, cells) of the rows finished since the caller last took them
+        self.completed = []
+        self.table_count = 0
+        self.row = None
+        self.tc = None
+        self.parts = None
+        # (grid before, [(span, cells)]) of the previous row of the table, for vertical merges
+        self.previous = None
+
+    def parser(self):
+        parser = expat.ParserCreate(namespace_separator=" ")
+        parser.buffer_text = True
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.characters
+        return parser
+
+    def start(self, tag, attrs):
+        children = _CHILDREN.get(self.stack[-1])
+        kind = children.get(tag) if children else None
+        if kind is None and self.stack[-1] == "root":
+            # Not a WordprocessingML document python-docx would open as is
+            raise UnsupportedDocument("unexpected main document element")
+        self.stack.append(kind)
+        if kind is None:
+            return
+        elif kind == "t":
+            pass
+        elif kind in _RUN_TEXT:
+            self.parts.append(_RUN_TEXT[kind])
+        elif kind == "br":
+            # Page and column breaks have no text equivalent
+            if attrs.get(_TYPE, "textWrapping") == "textWrapping":
+                self.parts.append("\n")
+        elif kind == "p":
+            self.parts = []
+            self.tc[2].append(self.parts)
+        elif kind == "tc":
+            # [grid span, vMerge value, paragraphs]
+            self.tc = [1, None, []]
+            self.row[1].append(self.tc)
+        elif kind == "gridSpan":
+            self.tc[0] = int(self._required_val(attrs))
+        elif kind == "vMerge":
+            merge = attrs.get(_VAL, "continue")
+            if merge not in ("continue", "restart"):
+                raise UnsupportedDocument(f"unknown vMerge value {merge!r}")
+            self.tc[1] = merge
+        elif kind == "tr":
+            # [grid columns before the first cell, cells]
+            self.row = [0, []]
+        elif kind == "gridBefore":
+            self.row[0] = int(self._required_val(attrs))
+        elif kind == "tbl":
+            self.table_count += 1
+            self.previous = None
+
+    def end(self, tag):
+        kind = self.stack.pop()
+        if kind == "tr":
+            self.completed.append((self.table_count - 1, self._row_cells(*self.row)))
+            self.row = self.tc = self.parts = None
+
+    def characters(self, data):
+        if self.stack[-1] == "t":
+            self.parts.append(data)
+
+    def _row_cells(self, grid_before, tcs):
+        """Expand the w:tc records of a row into its cell text, remembering them for the next row"""
+        cells = []
+        expanded = []
+        grid_offset = grid_before
+        for span, merge, paragraphs in tcs:
+            if merge != "continue":
+                tc_cells = ["\n".join("".join(parts) for parts in paragraphs)] * span
+            else:
+                tc_cells = self._cells_above(grid_offset)
+            expanded.append((span, tc_cells))
+            cells.extend(tc_cells)
+            grid_offset += span
+        self.previous = (grid_before, expanded)
+        return cells
+
+    def _cells_above(self, grid_offset):
+        """Cells of the w:tc at grid_offset in the previous row, which a vertically merged cell shows"""
+        if self.previous is None:
+            raise UnsupportedDocument("vertical merge continues from above the first row")
+        above_before, above = self.previous
+        remaining = grid_offset - above_before
+        for span, tc_cells in above:
+            if remaining < 0:
+                break
+            if remaining == 0:
+                return tc_cells
+            remaining -= span
+        raise UnsupportedDocument("vertical merge without a cell above it")
+
+    @staticmethod
+    def _required_val(attrs):
+        if _VAL not in attrs:
+            raise UnsupportedDocument("a w:val attribute is missing")
+        return attrs[_VAL]
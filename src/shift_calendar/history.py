@@ -0,0 +1,260 @@
+"""Persistent SQLite store of the shifts parsed from every schedule.
+
+Each processed document is recorded with its source (main, Cath Lab or EP
+schedule), the month it covers, its content hash and the parser version, and
+its shifts, and the holidays marked in it, are written in one transaction per
+run. Processing a changed
+version of a month's schedule replaces that month's shifts and holidays; the earlier
+versions stay listed in the documents table.
+
+Shifts can then be loaded for any period, or queried by employee, date,
+weekday and shift type, without reading the Word documents again. Schedules
+list the first days of the next month too; like merge_months, a date's shifts
+come from its own month's schedule when that lists the date.
+"""
+from datetime import date as _date
+from datetime import datetime
+import os
+import platform
+import sqlite3
+
+from .cache import DocumentCache
+from .shifts import Shift, employee_key
+
+# Bump when the tables change
+SCHEMA_VERSION = 2
+
+SOURCES = ('main', 'cath_lab', 'ep')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    period TEXT NOT NULL,
+    path TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    parser_version TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    shift_count INTEGER NOT NULL,
+    imported_at TEXT NOT NULL,
+    replaced_at TEXT
+);
+CREATE INDEX IF NOT EXISTS documents_period ON documents (source, period);
+CREATE TABLE IF NOT EXISTS shifts (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents (id),
+    source TEXT NOT NULL,
+    employee TEXT NOT NULL,
+    employee_key TEXT NOT NULL,
+    date TEXT NOT NULL,
+    day_of_week TEXT NOT NULL,
+    shift_type TEXT NOT NULL,
+    in_period INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS shifts_employee_date ON shifts (employee_key, date);
+CREATE INDEX IF NOT EXISTS shifts_date_type ON shifts (date, shift_type);
+CREATE INDEX IF NOT EXISTS shifts_document ON shifts (document_id);
+CREATE TABLE IF NOT EXISTS holidays (
+    document_id INTEGER NOT NULL REFERENCES documents (id),
+    date TEXT NOT NULL,
+    PRIMARY KEY (document_id, date)
+);
+CREATE VIEW IF NOT EXISTS merged_shifts AS
+    SELECT s.*, d.period FROM shifts s JOIN documents d ON d.id = s.document_id
+    WHERE s.in_period OR NOT EXISTS (
+        SELECT 1 FROM shifts o WHERE o.date = s.date AND o.source = s.source AND o.in_period
+    );
+"""
+
+
+class HistoryError(Exception):
+    """The history database could not be read or written."""
+
+
+def default_history_path():
+    """Per-user location of the history database for this platform"""
+    if platform.system() == "Windows":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "ShiftCalendarGenerator", "history.sqlite3")
+    elif platform.system() == "Darwin":  # macOS
+        return os.path.expanduser("~/Library/Application Support/ShiftCalendarGenerator/history.sqlite3")
+    else:  # Linux and others
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        return os.path.join(base, "shift-calendar-generator", "history.sqlite3")
+
+
+class ShiftHistory:
+    """The shift history database at path, created on first use.
+
+    Every call opens its own connection, so one ShiftHistory can be shared by
+    the GUI and its worker threads. sqlite3 errors are raised as HistoryError.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_history_path()
+
+    def store(self, documents, parser_version):
+        """Record the shifts read from documents, returning how many shifts were written.
+
+        documents is a list of (source, path, year, month, shifts, holidays),
+        source one of SOURCES; shifts may be any iterable, such as the stream of
+        ShiftCalendarCore.iter_main_schedule, and are inserted as they come.
+        holidays are the dates marked as holidays in the document, read after
+        its shifts. A document whose content and parser version match the
+        month's current one is skipped, apart from recording its holidays;
+        otherwise it replaces it.
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        written = 0
+        with self._connect() as connection:
+            for source, path, year, month, shifts, holidays in documents:
+                period = f"{year:04d}-{month:02d}"
+                content_hash = DocumentCache.key_for(path)
+                current = connection.execute(
+                    "SELECT id, content_hash, parser_version, version FROM documents "
+                    "WHERE source = ? AND period = ? AND replaced_at IS NULL", (source, period)).fetchone()
+                if current is not None and current[1:3] == (content_hash, parser_version):
+                    # Documents stored before the holidays table get theirs now
+                    self._insert_holidays(connection, current[0], holidays)
+                    continue
+                if current is not None:
+                    connection.execute("DELETE FROM shifts WHERE document_id = ?", (current[0],))
+                    connection.execute("DELETE FROM holidays WHERE document_id = ?", (current[0],))
+                    connection.execute("UPDATE documents SET replaced_at = ? WHERE id = ?", (now, current[0]))
+                document_id = connection.execute(
+                    "INSERT INTO documents (source, period, path, content_hash, parser_version, version, "
+                    "shift_count, imported_at) VALUES (?, ?, ?, ?, ?, ?, 0, ?)",
+                    (source, period, os.path.abspath(path), content_hash, parser_version,
+                     current[3] + 1 if current is not None else 1, now)).lastrowid
+                count = connection.executemany(
+                    "INSERT INTO shifts (document_id, source, employee, employee_key, date, day_of_week, "
+                    "shift_type, in_period) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    ((document_id, source, shift.employee, shift.key, shift.date.isoformat(), shift.day_of_week,
+                      shift.shift_type, (shift.date.year, shift.date.month) == (year, month))
+                     for shift in shifts)).rowcount
+                connection.execute("UPDATE documents SET shift_count = ? WHERE id = ?", (count, document_id))
+                self._insert_holidays(connection, document_id, holidays)
+                written += count
+        return written
+
+    @staticmethod
+    def _insert_holidays(connection, document_id, holidays):
+        connection.executemany("INSERT OR IGNORE INTO holidays (document_id, date) VALUES (?, ?)",
+                               ((document_id, day.isoformat()) for day in holidays))
+
+    def load(self, start, end):
+        """(shifts, cath_lab_shifts, ep_shifts) dated start to end (inclusive), in schedule order"""
+        loaded = {source: [] for source in SOURCES}
+        for source, shift in self._select(start, end):
+            loaded[source].append(shift)
+        return tuple(loaded[source] for source in SOURCES)
+
+    def holidays(self, start, end):
+        """The set of dates start to end (inclusive) marked as holidays in the current documents"""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT DISTINCT date FROM holidays WHERE date >= ? AND date <= ?",
+                (start.isoformat(), end.isoformat())).fetchall()
+        return {_date.fromisoformat(day) for day, in rows}
+
+    def shifts(self, start=None, end=None, employee=None, shift_type=None, weekdays=None, source=None):
+        """Stored shifts matching all the given filters, in schedule order.
+
+        employee is matched like employee_key, weekdays are numbers as from
+        date.weekday() (Monday is 0) and source is one of SOURCES.
+        """
+        return [shift for _, shift in self._select(start, end, employee, shift_type, weekdays, source)]
+
+    def documents(self):
+        """Every recorded document version as a dict, oldest first"""
+        with self._connect() as connection:
+            cursor = connection.execute("SELECT * FROM documents ORDER BY id")
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+
+    def _select(self, start=None, end=None, employee=None, shift_type=None, weekdays=None, source=None):
+        conditions, parameters = [], []
+        if start is not None:
+            conditions.append("date >= ?")
+            parameters.append(start.isoformat())
+        if end is not None:
+            conditions.append("date <= ?")
+            parameters.append(end.isoformat())
+        if employee is not None:
+            conditions.append("employee_key = ?")
+            parameters.append(employee_key(employee))
+        if shift_type is not None:
+            conditions.append("shift_type = ?")
+            parameters.append(shift_type)
+        if weekdays is not None:
+            weekdays = list(weekdays)
+            # strftime counts from Sunday, date.weekday() from Monday
+            conditions.append(f"(CAST(strftime('%w', date) AS INTEGER) + 6) % 7 IN ({', '.join('?' * len(weekdays))})")
+            parameters.extend(weekdays)
+        if source is not None:
+            conditions.append("source = ?")
+            parameters.append(source)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT source, employee, date, day_of_week, shift_type FROM merged_shifts {where}"
+                "ORDER BY period, id", parameters).fetchall()
+        # One date object per day, shared by that day's shifts as in the parsed rosters
+        dates = {}
+        selected = []
+        for source, employee, day, day_of_week, shift_type in rows:
+            shift_date = dates.get(day)
+            if shift_date is None:
+                shift_date = dates[day] = _date.fromisoformat(day)
+            selected.append((source, Shift(employee, shift_date, day_of_week, shift_type)))
+        return selected
+
+    def _connect(self):
+        """Open connection usable as a transaction context manager, with the schema in place"""
+        return _Connection(self.path)
+
+
+class _Connection:
+    """sqlite3 connection that commits or rolls back on exit and is always closed, raising HistoryError"""
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = None
+
+    def __enter__(self):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.connection = sqlite3.connect(self.path)
+            _create_schema(self.connection)
+        except (sqlite3.Error, OSError) as e:
+            self._close()
+            raise HistoryError(f"Cannot open the history database {self.path}: {e}") from e
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            if exc_type is None:
+                self.connection.commit()
+            else:
+                self.connection.rollback()
+        except sqlite3.Error as e:
+            raise HistoryError(f"Cannot save to the history database {self.path}: {e}") from e
+        finally:
+            self._close()
+        if isinstance(exc, sqlite3.Error):
+            raise HistoryError(f"History database error: {exc}") from exc
+        return False
+
+    def _close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def _create_schema(connection):
+    if connection.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        return
+    connection.executescript(_SCHEMA)
+    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
@@ -0,0 +1,122 @@
+"""Incremental generation: only rewrite the calendars whose events changed.
+
+A JSON state file in the output folder keeps, for every calendar written
+there, a fingerprint of its rendered events and the SEQUENCE and DTSTAMP of
+each event. The fingerprints cover the whole event text, including the
+coworker and on-call lines that depend on other people's shifts, so a swap
+between two colleagues updates everyone who worked with them that day.
+
+A calendar whose fingerprint is unchanged is left untouched. A changed one
+is rewritten with SEQUENCE bumped on its modified events, while its
+unchanged events keep their SEQUENCE and DTSTAMP, so calendar clients and
+sync tools only see the events that really changed.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from .calendars import employee_events, write_events
+from .profiling import profile_stage
+
+STATE_FILE_NAME = ".shift-calendars.json"
+
+# Bump when the state layout or the fingerprinted fields change
+STATE_VERSION = 1
+
+DTSTAMP_FORMAT = "%Y%m%dT%H%M%S"
+
+
+def event_fingerprint(event):
+    """Hash of the rendered content of an event from employee_events"""
+    content = [event['summary'], event['start'].isoformat(), event['end'].isoformat(), event['description']]
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class CalendarState:
+    """The fingerprints of the calendars in an output folder, and this run's counts.
+
+    Entries are keyed by calendar file name. A missing, unreadable or outdated
+    state file is treated as empty, so every calendar counts as new.
+    """
+
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, STATE_FILE_NAME)
+        self.calendars = {}
+        self.counts = {'new': 0, 'updated': 0, 'skipped': 0}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == STATE_VERSION:
+                self.calendars = data['calendars']
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def get(self, file_name):
+        """The entry saved for a calendar file, or None"""
+        return self.calendars.get(file_name)
+
+    def record(self, file_name, status, entry):
+        """Store the entry for a calendar generated with status 'new', 'updated' or 'skipped'"""
+        self.calendars[file_name] = entry
+        self.counts[status] += 1
+
+    def save(self):
+        """Write the state file, replacing the previous one atomically"""
+        data = json.dumps({'version': STATE_VERSION, 'calendars': self.calendars},
+                          ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        directory = os.path.dirname(self.path)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+
+def update_employee_calendar(roster, employee_name, output_file, previous=None, fast_writer=False, profiler=None,
+                             write_file=None):
+    """Write an employee's calendar unless its events match the previous state entry.
+
+    The calendar is written to write_file, a temporary name the caller moves
+    over output_file later, if given. Returns (status, entry) with status
+    'new', 'updated' or 'skipped' and the state entry to save, or (None, None)
+    if the employee has no shifts. Errors while saving are raised to the caller.
+    """
+    with profile_stage(profiler, "events"):
+        events = employee_events(roster, employee_name)
+    if not events:
+        return None, None
+
+    fingerprints = [event_fingerprint(event) for event in events]
+    fingerprint = hashlib.sha256(
+        "".join(event['uid'] + event_hash for event, event_hash in zip(events, fingerprints)).encode('utf-8')
+    ).hexdigest()
+    if previous and previous['fingerprint'] == fingerprint and os.path.exists(output_file):
+        return 'skipped', previous
+
+    previous_events = previous['events'] if previous else {}
+    now = datetime.now().replace(microsecond=0)
+    entry_events = {}
+    for event, event_hash in zip(events, fingerprints):
+        known = previous_events.get(event['uid'])
+        if known is None:
+            sequence, dtstamp = 0, now
+        elif known['fingerprint'] == event_hash:
+            sequence, dtstamp = known['sequence'], datetime.strptime(known['dtstamp'], DTSTAMP_FORMAT)
+        else:
+            # A modified event gets a new revision number
+            sequence, dtstamp = known['sequence'] + 1, now
+        event['sequence'] = sequence
+        event['dtstamp'] = dtstamp
+        entry_events[event['uid']] = {'fingerprint': event_hash, 'sequence': sequence,
+                                      'dtstamp': dtstamp.strftime(DTSTAMP_FORMAT)}
+
+    write_events(events, write_file or output_file, fast_writer, profiler)
+    return ('updated' if previous else 'new'), {'fingerprint': fingerprint, 'events': entry_events}
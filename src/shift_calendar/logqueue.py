@@ -0,0 +1,110 @@
+"""Thread-safe log pipeline between the worker threads and a display.
+
+Workers put records on a LogQueue from any thread; the display (the GUI's
+log area, polled from the Tk main loop) drains them in batches. Sensitive
+messages are redacted when they are queued, so the raw text never reaches
+the display or the log file. A message repeated many times in a short while,
+like one line per calendar written, is shown a few times and then counted,
+with one summary line when the burst is over.
+"""
+import logging
+import queue
+import threading
+import time
+
+REDACTED = "[REDACTED]"
+
+
+class LogFile:
+    """Append-only log file sink, one timestamped line per record"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def write(self, records):
+        """Write (level, text) records"""
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        lines = "".join(f"{stamp} {logging.getLevelName(level)} {text}\n" for level, text in records)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class LogQueue:
+    """Log records queued from any thread and drained in batches by one consumer.
+
+    Within repeat_window seconds, only the first repeat_limit copies of the
+    same message are queued. The rest are counted and reported as one
+    "(repeated N more times)" record once the window has passed.
+    """
+
+    def __init__(self, log_file=None, repeat_limit=5, repeat_window=2.0):
+        self.log_file = log_file
+        self.repeat_limit = repeat_limit
+        self.repeat_window = repeat_window
+        self._records = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        # message -> [window start, count in the window, level]
+        self._recent = {}
+
+    def put(self, message, sensitive=False, level=logging.INFO):
+        """Queue a message; safe to call from any thread"""
+        text = REDACTED if sensitive else message
+        now = time.monotonic()
+        with self._lock:
+            recent = self._recent.get(text)
+            if recent is None or now - recent[0] > self.repeat_window:
+                if recent is not None:
+                    self._report_repeats(text, recent)
+                self._recent[text] = [now, 1, level]
+            else:
+                recent[1] += 1
+                if recent[1] > self.repeat_limit:
+                    return
+        self._records.put((level, text))
+
+    def drain(self, max_records=1000):
+        """Take up to max_records queued (level, text) records, writing them to the log file"""
+        self._flush_repeats()
+        records = []
+        while len(records) < max_records:
+            try:
+                records.append(self._records.get_nowait())
+            except queue.Empty:
+                break
+        if records and self.log_file is not None:
+            try:
+                self.log_file.write(records)
+            except (OSError, ValueError):
+                pass
+        return records
+
+    def close(self):
+        """Report pending repeat counts and write everything left to the log file"""
+        with self._lock:
+            for text, recent in self._recent.items():
+                self._report_repeats(text, recent)
+            self._recent.clear()
+        while self.drain():
+            pass
+        if self.log_file is not None:
+            self.log_file.close()
+
+    def _flush_repeats(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [text for text, recent in self._recent.items() if now - recent[0] > self.repeat_window]
+            for text in expired:
+                self._report_repeats(text, self._recent.pop(text))
+
+    def _report_repeats(self, text, recent):
+        # Called with the lock held
+        suppressed = recent[1] - self.repeat_limit
+        if suppressed > 0:
+            self._records.put((recent[2], f"{text} (repeated {suppressed} more times)"))
@@ -0,0 +1,53 @@
+"""Dense employee × day × shift type counts of the shifts, for array-based checks.
+
+Rules over a year of a large department touch every employee on every day;
+as array operations over one count array they take milliseconds, where
+loops over the shift lists would take minutes. numpy is only needed for
+this, and is imported when a matrix is built.
+"""
+from datetime import date
+from itertools import chain
+
+
+class ShiftMatrix:
+    """How many shifts of each type each employee has on each day.
+
+    counts[e, d, t] counts the shifts of types[t] that employees[e] has on
+    dates[d], every day from the first shift to the last. Names are matched
+    like employee_key, keeping the first spelling seen.
+    """
+
+    def __init__(self, *shift_lists):
+        # Imported here: numpy is only needed for the array-based checks
+        import numpy as np
+
+        shifts = list(chain(*shift_lists))
+        # Index and first spelling of each employee by key, index of each type
+        employees = {}
+        types = {}
+        ordinals = {day: day.toordinal() for day in {shift.date for shift in shifts}}
+        employee_indices = np.fromiter((employees.setdefault(shift.key, (len(employees), shift.employee))[0]
+                                        for shift in shifts), np.int64, len(shifts))
+        type_indices = np.fromiter((types.setdefault(shift.shift_type, len(types)) for shift in shifts),
+                                   np.int64, len(shifts))
+        day_ordinals = np.fromiter((ordinals[shift.date] for shift in shifts), np.int64, len(shifts))
+        self.employees = [name for _, name in employees.values()]
+        self.types = list(types)
+        if not shifts:
+            self.dates = []
+            self.counts = np.zeros((0, 0, 0), dtype=np.uint8)
+            return
+        first = int(day_ordinals.min())
+        self.dates = [date.fromordinal(ordinal) for ordinal in range(first, int(day_ordinals.max()) + 1)]
+        shape = (len(self.employees), len(self.dates), len(self.types))
+        cells = np.ravel_multi_index((employee_indices, day_ordinals - first, type_indices), shape)
+        # Counting the distinct cells keeps to one byte per cell, where
+        # bincount would first fill a full array of 8-byte counts
+        cells, cell_counts = np.unique(cells, return_counts=True)
+        self.counts = np.zeros(shape, dtype=np.uint8)
+        self.counts.flat[cells] = cell_counts
+
+    def type_mask(self, shift_types):
+        """Boolean array over types, True for the given shift types"""
+        import numpy as np
+        return np.array([shift_type in shift_types for shift_type in self.types], dtype=bool)
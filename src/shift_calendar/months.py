@@ -0,0 +1,107 @@
+"""Greek month names in schedule cells and file names.
+
+One regular expression, compiled at import, finds any month in a single pass
+over the text. It matches nominative and genitive month names with or without
+accents and in any case ("ΜΑΡΤΙΟΣ", "Μαρτίου", "μαρτιου"), and the usual
+abbreviations as whole words ("ΜΑΡ", "Σεπτ."). When a text names more than one
+month, the first one in the text wins.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+# Month number -> stem of the full name, without accents, upper case
+MONTH_STEMS = {
+    1: "ΙΑΝΟΥΑΡΙ", 2: "ΦΕΒΡΟΥΑΡΙ", 3: "ΜΑΡΤΙ", 4: "ΑΠΡΙΛΙ", 5: "ΜΑΙ", 6: "ΙΟΥΝΙ",
+    7: "ΙΟΥΛΙ", 8: "ΑΥΓΟΥΣΤ", 9: "ΣΕΠΤΕΜΒΡΙ", 10: "ΟΚΤΩΒΡΙ", 11: "ΝΟΕΜΒΡΙ", 12: "ΔΕΚΕΜΒΡΙ",
+}
+
+# Month number -> abbreviations, only matched as whole words
+MONTH_ABBREVIATIONS = {
+    1: ("ΙΑΝ",), 2: ("ΦΕΒ", "ΦΕΒΡ"), 3: ("ΜΑΡ", "ΜΑΡΤ"), 4: ("ΑΠΡ",), 5: ("ΜΑΙ",), 6: ("ΙΟΥΝ",),
+    7: ("ΙΟΥΛ",), 8: ("ΑΥΓ",), 9: ("ΣΕΠ", "ΣΕΠΤ"), 10: ("ΟΚΤ",), 11: ("ΝΟΕ", "ΝΟΕΜ"), 12: ("ΔΕΚ",),
+}
+
+# Accents and diaeresis marks removed by normalize_greek, after NFD decomposition
+_COMBINING_MARKS = dict.fromkeys(
+    c for c in range(0x300, 0x370) if unicodedata.combining(chr(c))
+)
+
+
+def normalize_greek(text):
+    """Upper-case text with the Greek accents and diaeresis marks removed"""
+    return unicodedata.normalize("NFD", text).translate(_COMBINING_MARKS).upper()
+
+
+def _letter_variants():
+    # Base capital letter -> every Greek letter that normalizes to it
+    variants = {}
+    for code in [*range(0x370, 0x400), *range(0x1F00, 0x2000)]:
+        base = normalize_greek(chr(code))
+        if len(base) == 1 and base.isalpha():
+            variants.setdefault(base, {base}).add(chr(code))
+    return {base: f"[{''.join(sorted(letters))}]" for base, letters in variants.items()}
+
+
+_LETTER_VARIANTS = _letter_variants()
+
+
+def _trie_pattern(node):
+    # Alternatives sharing a prefix are merged, so a failed match is usually
+    # given up at the first letter. Longer words are tried first: a full name
+    # wins over the abbreviation it starts with.
+    alternatives = [_LETTER_VARIANTS[letter] + _trie_pattern(child)
+                    for letter, child in sorted(node.items()) if letter]
+    if node.get("") == "full":
+        alternatives.append("")
+    elif node.get("") == "abbreviation":
+        # Abbreviations must not run on into a longer word
+        alternatives.append("(?![^\\W\\d_])")
+    return alternatives[0] if len(alternatives) == 1 else f"(?:{'|'.join(alternatives)})"
+
+
+def _compile_month_pattern(full_names, abbreviations):
+    """Regex matching the month words in any case, with or without accents"""
+    trie = {}
+    for kind, words in (("full", full_names), ("abbreviation", abbreviations)):
+        for word in words:
+            node = trie
+            for letter in word:
+                node = node.setdefault(letter, {})
+            node[""] = kind
+    return re.compile(_trie_pattern(trie))
+
+
+# Normalized matched text -> month number
+_FULL_NAMES = {stem + ending: month for month, stem in MONTH_STEMS.items() for ending in ("ΟΣ", "ΟΥ")}
+_ABBREVIATIONS = {abbreviation: month for month, abbreviations in MONTH_ABBREVIATIONS.items()
+                  for abbreviation in abbreviations}
+_MONTHS = {**_FULL_NAMES, **_ABBREVIATIONS}
+
+# Full names are found anywhere, as the schedules sometimes run them into
+# other text. The pattern runs on the text as written, so only the (short)
+# matched text is ever normalized.
+MONTH_PATTERN = _compile_month_pattern(_FULL_NAMES, _ABBREVIATIONS)
+
+
+@lru_cache(maxsize=1024)
+def find_month(text):
+    """Number of the first month named in text, or None.
+
+    Results are cached: a schedule's month column repeats the same few values.
+    """
+    if not text or text.isascii():
+        return None
+    text = unicodedata.normalize("NFC", text)
+    position = 0
+    while True:
+        match = MONTH_PATTERN.search(text, position)
+        if match is None:
+            return None
+        word = normalize_greek(match.group())
+        start = match.start()
+        # Abbreviations only count as whole words
+        if word in _ABBREVIATIONS and start and text[start - 1].isalpha():
+            position = start + 1
+            continue
+        return _MONTHS[word]
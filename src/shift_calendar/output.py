@@ -0,0 +1,93 @@
+"""Crash-safe output of a run's calendar files.
+
+AtomicFiles hands out a temporary name in the output folder for each file a
+run writes, and only moves the written files over their final names at
+commit(), after syncing them to disk in one batch at the end instead of after
+every file. A run that crashes or is aborted leaves the previous calendars as
+they were, rather than a mix of old and new ones.
+
+The archive modes write every calendar of a run into one file, a zip archive
+or a single .ics stream of one VCALENDAR per employee, in one sequential
+write, which is much faster than thousands of small files on network shares.
+"""
+import os
+
+# File names of the archive modes, in the output folder
+ARCHIVE_FILE_NAMES = {
+    'zip': "shift-calendars.zip",
+    'ics': "shift-calendars.ics",
+}
+
+
+class AtomicFiles:
+    """Files of one run written under temporary names, put in place together by commit()"""
+
+    def __init__(self, directory, sync=True):
+        self.directory = directory
+        self.sync = sync
+        # Unique per run, so concurrent or crashed runs never share temporary files
+        self._suffix = f".{os.urandom(4).hex()}.tmp"
+        # final path -> temporary path
+        self._pending = {}
+
+    def path_for(self, file_name):
+        """Temporary path to write file_name to; the file need not be created"""
+        final_path = os.path.join(self.directory, file_name)
+        temp_path = os.path.join(self.directory, f".{file_name}{self._suffix}")
+        self._pending[final_path] = temp_path
+        return temp_path
+
+    def discard(self, file_name):
+        """Drop a file that failed halfway, leaving the previous one in place"""
+        temp_path = self._pending.pop(os.path.join(self.directory, file_name), None)
+        if temp_path is not None:
+            _remove(temp_path)
+
+    def commit(self):
+        """Sync the written files to disk and move them over their final names, returning how many were moved"""
+        written = [(final_path, temp_path) for final_path, temp_path in self._pending.items()
+                   if os.path.exists(temp_path)]
+        self._pending = {}
+        try:
+            if self.sync:
+                for _, temp_path in written:
+                    _fsync(temp_path)
+            for final_path, temp_path in written:
+                os.replace(temp_path, final_path)
+        except OSError:
+            for _, temp_path in written:
+                _remove(temp_path)
+            raise
+        if self.sync and written:
+            _fsync_directory(self.directory)
+        return len(written)
+
+    def abort(self):
+        """Remove the files written so far, leaving the previous ones in place"""
+        for temp_path in self._pending.values():
+            _remove(temp_path)
+        self._pending = {}
+
+
+def _fsync(path, flags=os.O_RDWR):
+    # Windows only syncs files opened for writing (EBADF otherwise)
+    fd = os.open(path, flags | getattr(os, 'O_BINARY', 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directory(directory):
+    """Persist the renames; not possible (nor needed) on Windows"""
+    try:
+        _fsync(directory, os.O_RDONLY)
+    except OSError:
+        pass
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
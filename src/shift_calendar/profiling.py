@@ -0,0 +1,216 @@
+"""Per-stage timing and memory measurements of a run.
+
+A StageProfiler records the wall time, CPU time and peak traced memory of
+each stage (converting, reading, parsing, indexing, building and writing the
+calendars), per input file where there is one. Calls of the same stage on the
+same file add up, so the thousands of per-calendar stages of a run make one
+line each. The code being measured wraps its stages in profile_stage(profiler,
+name, source), which costs next to nothing when profiler is None.
+
+Streamed documents are read and parsed a row at a time, with the reading and
+the parsing taking turns. profile_items measures the time taken to produce
+the items of such a stream as one stage, and can leave out the time of the
+stages nested in it, so the reader and the parser of a stream are still
+timed apart.
+
+Peak memory comes from tracemalloc, which the profiler starts on its first
+stage and which slows Python allocations down while it runs. It only sees the
+current process: the calendars built by parallel worker processes are timed as
+a whole, without their memory. Its peak is also process-wide, so the peak of
+a stage that ran while another thread was in a stage includes that stage's
+allocations; such peaks are reported as shared.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# Name of the JSON report written next to the calendars
+PROFILE_FILE_NAME = "shift-calendar-profile.json"
+
+_NO_STAGE = nullcontext()
+_END = object()
+
+
+def profile_stage(profiler, name, source=None):
+    """Context manager measuring a stage with profiler, or doing nothing if it is None"""
+    if profiler is None:
+        return _NO_STAGE
+    return profiler.stage(name, source)
+
+
+def profile_items(profiler, name, items, source=None, exclusive=False):
+    """Iterate over items, measuring the time taken to produce them with profiler if it is not None"""
+    if profiler is None:
+        return items
+    return profiler.items(name, items, source, exclusive)
+
+
+class StageProfiler:
+    """Wall time, CPU time and peak memory of the stages of a run.
+
+    Stages may nest: an outer stage's time and peak include its inner ones,
+    unless it is measured as exclusive, when its time leaves them out.
+    Stages may also run on several threads at once, as when several months
+    are read together; CPU time and memory are those of the whole process,
+    so concurrent stages share them, and their peaks are marked as shared.
+    """
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._lock = threading.Lock()
+        # Per thread, the measurements in progress of the open stages (see _measure)
+        self._local = threading.local()
+        # Thread ident -> that thread's open stages, to see which stages overlap
+        self._open = {}
+        self._started_tracing = False
+
+    def reset(self):
+        """Forget the stages measured so far"""
+        self.stages = {}
+
+    def close(self):
+        """Stop tracemalloc if this profiler started it"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name, source=None):
+        """Measure the code run in the with block as one call of a stage"""
+        totals = [0.0, 0.0, 0, False]
+        try:
+            with self._measure(totals):
+                yield
+        finally:
+            self._add(name, source, *totals)
+
+    def items(self, name, items, source=None, exclusive=False):
+        """Yield the items, measuring the time taken to produce them as one call of a stage.
+
+        The time the consumer spends on each item is left out. With
+        exclusive, so is the time of the stages measured while an item is
+        produced, such as those of an inner stream the items are made from.
+        """
+        totals = [0.0, 0.0, 0, False]
+        iterator = iter(items)
+        try:
+            while True:
+                with self._measure(totals, exclusive):
+                    item = next(iterator, _END)
+                if item is _END:
+                    return
+                yield item
+        finally:
+            self._add(name, source, *totals)
+
+    @contextmanager
+    def _measure(self, totals, exclusive=False):
+        """Add the wall time, CPU time and peak memory of the with block to totals, and whether the peak is shared"""
+        open_stages = getattr(self._local, 'open', None)
+        if open_stages is None:
+            open_stages = self._local.open = []
+        tracing = self.trace_memory
+        shared = False
+        if tracing:
+            with self._lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._started_tracing = True
+                self._open[threading.get_ident()] = open_stages
+                # The stages open on other threads now overlap this one: all their peaks are shared
+                for stages in self._open.values():
+                    if stages is not open_stages and stages:
+                        shared = True
+                        for other in stages:
+                            other[4] = True
+            current, peak = tracemalloc.get_traced_memory()
+            if open_stages:
+                # Keep the enclosing stage's peak before resetting it for this one
+                open_stages[-1][1] = max(open_stages[-1][1], peak)
+            tracemalloc.reset_peak()
+            # memory at start, highest peak seen before inner stages reset it, wall and CPU time of inner
+            # stages, whether another thread was in a stage meanwhile
+            frame = [current, current, 0.0, 0.0, shared]
+        else:
+            frame = [0, 0, 0.0, 0.0, False]
+        open_stages.append(frame)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            open_stages.pop()
+            if open_stages:
+                open_stages[-1][2] += wall
+                open_stages[-1][3] += cpu
+            if exclusive:
+                wall -= frame[2]
+                cpu -= frame[3]
+            totals[0] += wall
+            totals[1] += cpu
+            if tracing and tracemalloc.is_tracing():
+                peak = max(tracemalloc.get_traced_memory()[1], frame[1])
+                totals[2] = max(totals[2], peak - frame[0])
+                if open_stages:
+                    open_stages[-1][1] = max(open_stages[-1][1], peak)
+                with self._lock:
+                    totals[3] = totals[3] or frame[4]
+
+    def _add(self, name, source, wall, cpu, peak_bytes, peak_shared):
+        with self._lock:
+            entry = self.stages.get((name, source))
+            if entry is None:
+                self.stages[(name, source)] = {'calls': 1, 'wall': wall, 'cpu': cpu, 'peak': peak_bytes,
+                                               'peak_shared': peak_shared}
+            else:
+                entry['calls'] += 1
+                entry['wall'] += wall
+                entry['cpu'] += cpu
+                entry['peak'] = max(entry['peak'], peak_bytes)
+                entry['peak_shared'] = entry['peak_shared'] or peak_shared
+
+    def report(self):
+        """The measurements as a JSON-serializable dict, stages in the order they first ran"""
+        with self._lock:
+            stages = list(self.stages.items())
+        return {
+            'trace_memory': self.trace_memory,
+            'stages': [
+                {'stage': name, 'source': source, 'calls': entry['calls'],
+                 'wall_seconds': round(entry['wall'], 6), 'cpu_seconds': round(entry['cpu'], 6),
+                 'peak_bytes': entry['peak'] if self.trace_memory else None,
+                 'peak_shared': entry['peak_shared'] if self.trace_memory else None}
+                for (name, source), entry in stages
+            ],
+        }
+
+    def summary_lines(self):
+        """One human-readable line per stage and source"""
+        with self._lock:
+            stages = list(self.stages.items())
+        lines = []
+        for (name, source), entry in stages:
+            label = f"{name} ({source})" if source else name
+            if entry['calls'] > 1:
+                label += f" x{entry['calls']}"
+            line = f"{label}: {entry['wall']:.3f} s wall, {entry['cpu']:.3f} s CPU"
+            if self.trace_memory:
+                line += f", peak {entry['peak'] / 2**20:.1f} MiB"
+                if entry['peak_shared']:
+                    line += " (shared with concurrent stages)"
+            lines.append(line)
+        return lines
+
+    def write_report(self, path):
+        """Write the JSON report to path"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+
+def report_path(output_dir):
+    """Where the JSON report of a run writing calendars into output_dir goes"""
+    return os.path.join(output_dir, PROFILE_FILE_NAME)
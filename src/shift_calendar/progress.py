@@ -0,0 +1,63 @@
+"""Progress counts and cancellation of a processing or generation run.
+
+The core counts the files read, the table rows parsed and the calendars
+written on a RunProgress, from whichever threads do the work, and checks it
+for cancellation between them. A display polls snapshot() at its own pace,
+so reporting costs one counter update per item however often the display is
+refreshed.
+"""
+import threading
+
+COUNTERS = ("files", "rows", "calendars")
+
+
+class RunCancelled(Exception):
+    """The run was cancelled through RunProgress.cancel()."""
+
+
+class RunProgress:
+    """How many files, rows and calendars of a run are done, out of how many expected.
+
+    Totals grow as the run finds out about more work. Rows are parsed as
+    the documents are read, so they are only counted as done, with no total.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self.reset()
+
+    def reset(self):
+        """Zero the counts and clear the cancellation, for a new run"""
+        with self._lock:
+            self._done = dict.fromkeys(COUNTERS, 0)
+            self._total = dict.fromkeys(COUNTERS, 0)
+        self._cancel.clear()
+
+    def expect(self, counter, count):
+        """Add count to the items of counter the run will go through"""
+        with self._lock:
+            self._total[counter] += count
+
+    def advance(self, counter, count=1):
+        """Count count more items of counter as done"""
+        with self._lock:
+            self._done[counter] += count
+
+    def cancel(self):
+        """Ask the run to stop at the next file, row or calendar; safe from any thread"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        """Raise RunCancelled if the run has been cancelled"""
+        if self._cancel.is_set():
+            raise RunCancelled()
+
+    def snapshot(self):
+        """{counter: (done, total)} at this moment"""
+        with self._lock:
+            return {counter: (self._done[counter], self._total[counter]) for counter in COUNTERS}
@@ -0,0 +1,61 @@
+"""Index over the parsed shifts used to build each employee's calendar."""
+from . import shifts as _shifts
+
+
+class RosterIndex:
+    """Lookup tables over the parsed shifts, built once per processed document.
+
+    Maps each employee to their own shifts and each date to the roster lines
+    used in event descriptions, so a calendar can be built from an employee's
+    own shifts without rescanning every shift list.
+    """
+
+    def __init__(self, shifts, cath_lab_shifts=None, ep_shifts=None):
+        # employee key -> shifts in document order
+        self.shifts_by_employee = {}
+        self.cath_lab_by_employee = {}
+        self.ep_by_employee = {}
+        # date -> sorted [(coworker line, employee key)]
+        self.roster_by_date = {}
+        # date -> [(employee key, employee name)] in document order
+        self.cath_lab_by_date = {}
+        self.ep_by_date = {}
+
+        for shift in shifts:
+            self.shifts_by_employee.setdefault(shift.key, []).append(shift)
+            line = f"{shift.employee}: {shift.shift_type}"
+            self.roster_by_date.setdefault(shift.date, []).append((line, shift.key))
+        for lines in self.roster_by_date.values():
+            lines.sort()
+
+        self._index_on_call(cath_lab_shifts or [], self.cath_lab_by_employee, self.cath_lab_by_date)
+        self._index_on_call(ep_shifts or [], self.ep_by_employee, self.ep_by_date)
+
+    @staticmethod
+    def employee_key(name):
+        """Normalized key used to match employee names"""
+        return _shifts.employee_key(name)
+
+    def _index_on_call(self, shifts, by_employee, by_date):
+        for shift in shifts:
+            by_employee.setdefault(shift.key, []).append(shift)
+            by_date.setdefault(shift.date, []).append((shift.key, shift.employee))
+
+    def coworkers_on(self, shift_date, employee_key):
+        """Sorted "name: shift type" lines for everyone else on the main roster that day"""
+        return [line for line, key in self.roster_by_date.get(shift_date, ()) if key != employee_key]
+
+    def cath_lab_on_call(self, shift_date, employee_key):
+        """Name of the Cath Lab on-call specialist for the day, other than the employee"""
+        return self._first_other(self.cath_lab_by_date, shift_date, employee_key)
+
+    def ep_on_call(self, shift_date, employee_key):
+        """Name of the Electrophysiology on-call specialist for the day, other than the employee"""
+        return self._first_other(self.ep_by_date, shift_date, employee_key)
+
+    @staticmethod
+    def _first_other(by_date, shift_date, employee_key):
+        for key, name in by_date.get(shift_date, ()):
+            if key != employee_key:
+                return name
+        return None
@@ -0,0 +1,49 @@
+"""Compact record of one parsed shift assignment."""
+import sys
+from functools import lru_cache
+
+# Shift types given by the parsers: the main schedule's 24-hour and 12-hour
+# shifts, and the specialty on-call schedules'
+HOURS_24_TYPES = ("Regular Shift", "On-Call Shift", "Μεγάλη Shift (24h)", "Μικρή Shift (24h)")
+MAIN_TYPES = HOURS_24_TYPES + ("TEP Shift (12h)",)
+# The main shifts of the main schedule's first table and of its second one
+FIRST_TABLE_TYPES = ("Regular Shift", "On-Call Shift")
+SECOND_TABLE_TYPES = ("Μεγάλη Shift (24h)", "Μικρή Shift (24h)", "TEP Shift (12h)")
+SPECIALTY_TYPES = ("Cath Lab On-Call", "Electrophysiology On-Call")
+
+
+@lru_cache(maxsize=4096)
+def employee_key(name):
+    """Normalized key used to match employee names"""
+    return sys.intern(name.lower())
+
+
+class Shift:
+    """One employee's shift on one date.
+
+    A roster holds thousands of these, so they use __slots__ instead of a
+    dict, and the names, weekdays and shift types are interned: every shift
+    of an employee shares one name string. key is the employee's normalized
+    name, computed once here instead of on every comparison.
+    """
+
+    __slots__ = ('employee', 'key', 'date', 'day_of_week', 'shift_type')
+
+    def __init__(self, employee, date, day_of_week, shift_type):
+        self.employee = sys.intern(employee)
+        self.key = employee_key(self.employee)
+        self.date = date
+        self.day_of_week = sys.intern(day_of_week)
+        self.shift_type = sys.intern(shift_type)
+
+    def __repr__(self):
+        return f"Shift({self.employee!r}, {self.date!r}, {self.day_of_week!r}, {self.shift_type!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Shift):
+            return NotImplemented
+        return (self.employee, self.date, self.day_of_week, self.shift_type) == \
+            (other.employee, other.date, other.day_of_week, other.shift_type)
+
+    def __hash__(self):
+        return hash((self.employee, self.date, self.shift_type))
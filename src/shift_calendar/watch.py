@@ -0,0 +1,186 @@
+"""Watching a folder for schedules and handing each new or changed month over as it arrives.
+
+The folder is polled with os.stat every few seconds, which only needs the
+standard library and also works on network shares, where change
+notifications are unreliable. A file is only taken once its size and
+modification time have stayed the same for the settle time, so files still
+being copied are not read halfway.
+
+Files are grouped by the month in their names like find_batch_jobs; when a
+folder has two schedules of the same kind for a month, the most recently
+modified one is taken. A month is handed over once its main schedule is
+there, and again whenever the content of any of its files changes. The
+content hashes of the versions handed over are kept in a state file, so
+the same versions are never processed twice, across restarts too.
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+
+from .cache import DocumentCache
+from .core import (SCHEDULE_EXTENSIONS, classify_schedule, extract_month_year_from_filename,
+                   find_month_year_in_filename)
+
+WATCH_STATE_FILE_NAME = ".shift-watch.json"
+
+# Bump when the state layout changes
+WATCH_STATE_VERSION = 1
+
+
+class FolderWatcher:
+    """Schedules in directory, polled for months whose files changed since they were processed.
+
+    The processed versions are saved to state_path. Messages go to
+    log(message, level=...), each warning only once per file.
+    """
+
+    def __init__(self, directory, state_path, log, settle=2.0, clock=time.monotonic):
+        self.directory = directory
+        self.state_path = state_path
+        self.log = log
+        self.settle = settle
+        self.clock = clock
+        # path -> ((mtime, size), time that signature was first seen)
+        self._seen = {}
+        # path -> ((mtime, size), content hash)
+        self._hashes = {}
+        self._warned = set()
+        # 'YYYY-MM' -> {kind: content hash} of the last versions handed over
+        self.processed = {}
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == WATCH_STATE_VERSION:
+                self.processed = data['processed']
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def poll(self):
+        """Jobs of the months whose settled files changed since last processed.
+
+        Each job is a dict like those of find_batch_jobs, with the month,
+        year and main, cath_lab and ep paths, plus the content hash of each
+        file in 'versions'. Pass it to mark_processed once it is handled.
+        """
+        now = self.clock()
+        try:
+            names = os.listdir(self.directory)
+        except OSError as e:
+            self._warn(self.directory, f"Cannot read the watched folder: {e}")
+            return []
+
+        months = {}
+        unsettled = set()
+        for name in sorted(names):
+            # Skip the lock files Word leaves next to open documents
+            if not name.lower().endswith(SCHEDULE_EXTENSIONS) or name.startswith(("~$", ".")):
+                continue
+            path = os.path.join(self.directory, name)
+            if find_month_year_in_filename(name) is None:
+                self._warn(path, f"Skipping {name}: no month in the file name")
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            month, year = extract_month_year_from_filename(name)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            seen = self._seen.get(path)
+            if seen is None or seen[0] != signature:
+                self._seen[path] = (signature, now)
+                unsettled.add((year, month))
+            elif now - seen[1] < self.settle:
+                unsettled.add((year, month))
+            months.setdefault((year, month), []).append((signature, classify_schedule(name), path))
+        self._forget(path for files in months.values() for _, _, path in files)
+
+        jobs = []
+        for (year, month), files in sorted(months.items()):
+            if (year, month) in unsettled:
+                continue
+            job = {'month': month, 'year': year, 'main': None, 'cath_lab': None, 'ep': None}
+            # Oldest first, so the most recently modified file of each kind wins
+            for signature, kind, path in sorted(files):
+                if job[kind]:
+                    self._warn(path, f"{os.path.basename(job[kind])} replaces {os.path.basename(path)} "
+                                     f"as the {kind} schedule of {month}/{year}")
+                job[kind] = path
+            if not job['main']:
+                self._warn(f"{year}-{month}", f"Waiting for the main schedule of {month}/{year}")
+                continue
+            try:
+                job['versions'] = {kind: self._hash(job[kind]) if job[kind] else None
+                                   for kind in ('main', 'cath_lab', 'ep')}
+            except OSError as e:
+                self.log(f"Cannot read the schedules of {month}/{year}, will retry: {e}", level=logging.WARNING)
+                continue
+            if job['versions'] != self.processed.get(_period(job)):
+                jobs.append(job)
+        return jobs
+
+    def mark_processed(self, job):
+        """Record the job's file versions as processed and save the state"""
+        self.processed[_period(job)] = job['versions']
+        data = json.dumps({'version': WATCH_STATE_VERSION, 'processed': self.processed},
+                          separators=(',', ':')).encode('utf-8')
+        directory = os.path.dirname(self.state_path) or "."
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            self.log(f"Could not save the watch state: {e}", level=logging.WARNING)
+
+    def run(self, process, interval=5.0, stop=None):
+        """Call process(job) for each job found, polling every interval seconds until stop is set.
+
+        stop is a threading.Event, or None to run until interrupted. A job
+        is marked processed once process returns or raises an Exception, so
+        a schedule that fails is only tried again once it changes; a job
+        interrupted (KeyboardInterrupt, SystemExit) stays pending and is
+        processed again after a restart.
+        """
+        while stop is None or not stop.is_set():
+            for job in self.poll():
+                try:
+                    process(job)
+                except Exception as e:
+                    # Keep watching: one bad schedule should not stop the others
+                    self.log(f"Error processing the schedules of {job['month']}/{job['year']}: {e}",
+                             level=logging.ERROR)
+                self.mark_processed(job)
+            if stop is None:
+                time.sleep(interval)
+            else:
+                stop.wait(interval)
+
+    def _hash(self, path):
+        """Content hash of a settled file, only read again when it changes"""
+        signature = self._seen[path][0]
+        known = self._hashes.get(path)
+        if known is None or known[0] != signature:
+            known = self._hashes[path] = (signature, DocumentCache.key_for(path))
+        return known[1]
+
+    def _forget(self, present):
+        """Drop what is known about files no longer in the folder"""
+        present = set(present)
+        for known in (self._seen, self._hashes):
+            for path in [path for path in known if path not in present]:
+                del known[path]
+
+    def _warn(self, key, message):
+        if key not in self._warned:
+            self._warned.add(key)
+            self.log(message, level=logging.WARNING)
+
+
+def _period(job):
+    return f"{job['year']:04d}-{job['month']:02d}"
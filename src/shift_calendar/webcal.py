@@ -0,0 +1,205 @@
+"""Calendar subscription server: serves the processed roster as webcal feeds.
+
+Phones and calendar apps subscribe to http://host:port/calendars/<employee>.ics
+instead of being handed files. Each feed is rendered with the streaming
+writer the first time it is asked for, and kept, with a gzip copy, until the
+roster is replaced. Clients revalidate with If-None-Match or
+If-Modified-Since and get a bodiless 304 while nothing changed, so hundreds of
+subscribers polling every few minutes cost a dictionary lookup each.
+
+Requests are handled by a fixed pool of threads rather than one new thread
+per connection. Only the standard library is used.
+"""
+import gzip
+import hashlib
+import io
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import quote, unquote, urlsplit
+
+from .calendars import employee_events, write_calendar_stream
+from .shifts import employee_key
+
+FEED_PREFIX = "/calendars/"
+
+# Feeds change when the roster does; clients should always revalidate
+CACHE_CONTROL = "no-cache"
+
+Feed = namedtuple("Feed", "body gzip_body etag gzip_etag last_modified")
+
+
+class CalendarFeeds:
+    """The calendars of a roster, rendered on first request and cached until the roster changes.
+
+    Employees are looked up by name, case-insensitively, with spaces or with
+    the underscores of the calendar file names.
+    """
+
+    def __init__(self, roster=None, employees=()):
+        self._lock = threading.Lock()
+        self.set_roster(roster, employees)
+
+    def set_roster(self, roster, employees):
+        """Serve the calendars of employees from roster, dropping every cached feed"""
+        names = {}
+        for name in employees:
+            names[employee_key(name)] = name
+            names.setdefault(employee_key(name.replace(' ', '_')), name)
+        # DTSTAMP and Last-Modified of every feed: when the roster was loaded
+        modified = datetime.now().replace(microsecond=0)
+        with self._lock:
+            self._roster = roster
+            self._names = names
+            self._modified = modified
+            self._feeds = {}
+
+    def feed(self, name):
+        """The Feed of an employee, or None if there is no such employee with shifts"""
+        with self._lock:
+            roster, names, modified, feeds = self._roster, self._names, self._modified, self._feeds
+        employee = names.get(employee_key(name))
+        if roster is None or employee is None:
+            return None
+        cached = feeds.get(employee)
+        if cached is not None:
+            return cached
+
+        # Rendered outside the lock: two clients asking at once just render it twice
+        feed = _render_feed(roster, employee, modified)
+        with self._lock:
+            if self._feeds is feeds and feed is not None:
+                feeds[employee] = feed
+        return feed
+
+
+def _render_feed(roster, employee, modified):
+    events = employee_events(roster, employee)
+    if not events:
+        return None
+    for event in events:
+        event['dtstamp'] = modified
+    buffer = io.BytesIO()
+    write_calendar_stream(buffer, events)
+    body = buffer.getvalue()
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    last_modified = modified.astimezone(timezone.utc)
+    return Feed(body, gzip.compress(body, mtime=0), f'"{digest}"', f'"{digest}-gz"', last_modified)
+
+
+class CalendarRequestHandler(BaseHTTPRequestHandler):
+    """GET and HEAD of /calendars/<employee>.ics with conditional requests and gzip"""
+
+    server_version = "ShiftCalendar"
+    # Seconds a client may stall a read or write before its connection is dropped,
+    # so idle or slow clients cannot hold every worker thread
+    timeout = 30
+
+    def do_GET(self):
+        self._send_feed(include_body=True)
+
+    def do_HEAD(self):
+        self._send_feed(include_body=False)
+
+    def _send_feed(self, include_body):
+        path = urlsplit(self.path).path
+        feed = None
+        if path.startswith(FEED_PREFIX) and path.endswith(".ics"):
+            feed = self.server.feeds.feed(unquote(path[len(FEED_PREFIX):-len(".ics")]))
+        if feed is None:
+            self.send_error(404)
+            return
+
+        use_gzip = _accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        etag = feed.gzip_etag if use_gzip else feed.etag
+        if self._not_modified(etag, feed.last_modified):
+            self.send_response(304)
+            self._send_validators(etag, feed.last_modified)
+            self.end_headers()
+            return
+
+        body = feed.gzip_body if use_gzip else feed.body
+        self.send_response(200)
+        self.send_header("Content-Type", "text/calendar; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self._send_validators(etag, feed.last_modified)
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def _send_validators(self, etag, last_modified):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", format_datetime(last_modified, usegmt=True))
+        self.send_header("Cache-Control", CACHE_CONTROL)
+        self.send_header("Vary", "Accept-Encoding")
+
+    def _not_modified(self, etag, last_modified):
+        """Whether the request's validators still match the feed"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            # If-None-Match takes precedence and uses the weak comparison
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since) >= last_modified
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def log_request(self, code='-', size='-'):
+        # Successful polls are too many to log
+        pass
+
+    def log_message(self, format, *args):
+        # The request lines hold employee names
+        self.server.log(f"{self.address_string()} - {format % args}", sensitive=True, level=logging.WARNING)
+
+
+def _accepts_gzip(accept_encoding):
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class CalendarServer(HTTPServer):
+    """HTTP server for CalendarFeeds, handling requests on a pool of worker threads.
+
+    log(message, sensitive=False, level=logging.INFO) receives the request
+    errors, like the core's log callback. Call server_close() to stop the pool.
+    """
+
+    def __init__(self, address, feeds, workers=16, log=None):
+        super().__init__(address, CalendarRequestHandler)
+        self.feeds = feeds
+        self.log = log or (lambda message, sensitive=False, level=None: None)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="webcal")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+    def feed_url(self, employee):
+        """URL of an employee's feed on this server"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{FEED_PREFIX}{quote(employee.replace(' ', '_'))}.ics"
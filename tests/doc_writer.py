@@ -0,0 +1,217 @@
+"""Minimal Word 97 .doc writer for the doc_tables tests.
+
+Writes just what read_doc_tables reads: a compound file with the
+WordDocument and 1Table streams, the piece table and one paragraph property
+run per paragraph mark, table rows described by a TDefTable. It is not a
+substitute for documents saved by Word, only a way to lay out table cells
+exactly.
+"""
+import struct
+
+_SECTOR = 512
+_MINI_SECTOR = 64
+_MINI_CUTOFF = 4096
+_END_OF_CHAIN = 0xFFFFFFFE
+_FREE_SECTOR = 0xFFFFFFFF
+_FAT_SECTOR = 0xFFFFFFFD
+
+_SPRM_P_IN_TABLE = 0x2416
+_SPRM_P_TTP = 0x2417
+_SPRM_P_ITAP = 0x6649
+_SPRM_T_DEF_TABLE = 0xD608
+
+# TC80 merge flags
+_FIRST_MERGED = 0x1
+_MERGED = 0x2
+_VERT_MERGE = 0x20
+
+DEFAULT_WIDTH = 1000
+
+
+def cell(text="", width=DEFAULT_WIDTH, merge=None):
+    """A table cell of width twips; merge is None, 'previous' or 'above'"""
+    return (text, width, merge)
+
+
+def write_doc(path, blocks, compressed=True):
+    """Write blocks as a .doc file.
+
+    blocks are ("p", text) paragraphs and ("t", rows) tables. A row is a list
+    of cells, plain strings (one DEFAULT_WIDTH wide) or cell() tuples, or a
+    (left edge, cells) tuple for a row that starts right of the table's edge.
+    Paragraphs within a cell are separated by "\\r". Text is stored as 8-bit
+    cp1252 when compressed, otherwise as UTF-16.
+    """
+    in_table = _sprm(_SPRM_P_IN_TABLE, b"\x01")
+    paragraphs = []
+    for kind, content in blocks:
+        if kind == "p":
+            paragraphs.append((content + "\r", b""))
+            continue
+        for row in content:
+            left, cells = row if isinstance(row, tuple) else (0, row)
+            cells = [cell(value) if isinstance(value, str) else value for value in cells]
+            edges = [left]
+            flags = []
+            for index, (text, width, merge) in enumerate(cells):
+                edges.append(edges[-1] + width)
+                if merge == "previous":
+                    flags.append(_MERGED)
+                    if flags[index - 1] & _MERGED == 0:
+                        flags[index - 1] |= _FIRST_MERGED
+                elif merge == "above":
+                    flags.append(_VERT_MERGE)
+                else:
+                    flags.append(0)
+                parts = text.split("\r")
+                paragraphs += [(part + "\r", in_table) for part in parts[:-1]]
+                paragraphs.append((parts[-1] + "\x07", in_table))
+            row_end = (in_table + _sprm(_SPRM_P_TTP, b"\x01") + _sprm(_SPRM_P_ITAP, struct.pack("<i", 1))
+                       + _table_definition(edges, flags))
+            paragraphs.append(("\x07", row_end))
+    paragraphs.append(("\r", b""))
+    text = "".join(paragraph for paragraph, _ in paragraphs)
+
+    # The text in one piece after the FIB, then the paragraph property pages
+    fc_text = 0x800
+    word_document = bytearray(fc_text)
+    word_document += text.encode("cp1252") if compressed else text.encode("utf-16-le")
+    char_size = 1 if compressed else 2
+    marks = []
+    cp = 0
+    for paragraph, grpprl in paragraphs:
+        cp += len(paragraph)
+        marks.append((fc_text + (cp - 1) * char_size, grpprl))
+    word_document += bytes(-len(word_document) % _SECTOR)
+    bte_fcs, bte_pages = _write_fkps(word_document, marks, char_size)
+
+    pieces = struct.pack("<2i", 0, len(text)) + struct.pack(
+        "<HIH", 0, (fc_text * 2) | 0x40000000 if compressed else fc_text, 0)
+    clx = b"\x02" + struct.pack("<I", len(pieces)) + pieces
+    plcf_bte_papx = struct.pack(f"<{len(bte_fcs)}I", *bte_fcs) + struct.pack(f"<{len(bte_pages)}I", *bte_pages)
+    table_stream = bytearray(64)
+    fc_clx = len(table_stream)
+    table_stream += clx
+    fc_bte = len(table_stream)
+    table_stream += plcf_bte_papx
+
+    # FibBase (Word 97, table stream 1Table), then the counted FIB sections
+    struct.pack_into("<HH", word_document, 0, 0xA5EC, 0x00C1)
+    struct.pack_into("<H", word_document, 0x0A, 0x0200)
+    offset = 32
+    struct.pack_into("<H", word_document, offset, 14)
+    offset += 2 + 2 * 14
+    struct.pack_into("<H", word_document, offset, 22)
+    struct.pack_into("<i", word_document, offset + 2 + 3 * 4, len(text))
+    offset += 2 + 4 * 22
+    struct.pack_into("<H", word_document, offset, 93)
+    struct.pack_into("<II", word_document, offset + 2 + 8 * 33, fc_clx, len(clx))
+    struct.pack_into("<II", word_document, offset + 2 + 8 * 13, fc_bte, len(plcf_bte_papx))
+
+    with open(path, "wb") as f:
+        f.write(_compound_file({"WordDocument": bytes(word_document), "1Table": bytes(table_stream)}))
+
+
+def _sprm(code, operand):
+    return struct.pack("<H", code) + operand
+
+
+def _table_definition(edges, flags):
+    body = struct.pack("<B", len(flags)) + struct.pack(f"<{len(edges)}h", *edges)
+    for value in flags:
+        body += struct.pack("<H", value) + bytes(18)
+    return _sprm(_SPRM_T_DEF_TABLE, struct.pack("<H", len(body) + 1) + body)
+
+
+def _write_fkps(word_document, marks, char_size):
+    """Append the paragraph property pages of the marks, returning the bin table's fcs and page numbers"""
+    bte_fcs, bte_pages = [], []
+    index = 0
+    while index < len(marks):
+        page = bytearray(_SECTOR)
+        chosen = []
+        top = _SECTOR - 1
+        while index < len(marks):
+            fc, grpprl = marks[index]
+            body = b"\0\0" + grpprl  # style index 0, then the property modifiers
+            papx = bytes([0, len(body) // 2]) + body if len(body) % 2 == 0 else bytes([(len(body) + 1) // 2]) + body
+            new_top = top - len(papx)
+            new_top -= new_top % 2
+            if new_top < 4 * (len(chosen) + 2) + 13 * (len(chosen) + 1):
+                break
+            top = new_top
+            page[top:top + len(papx)] = papx
+            chosen.append((fc, top // 2))
+            index += 1
+        count = len(chosen)
+        fcs = [fc for fc, _ in chosen] + [chosen[-1][0] + char_size]
+        struct.pack_into(f"<{count + 1}I", page, 0, *fcs)
+        for position, (_, papx_offset) in enumerate(chosen):
+            page[4 * (count + 1) + 13 * position] = papx_offset
+        page[-1] = count
+        bte_fcs.append(fcs[0])
+        bte_pages.append(len(word_document) // _SECTOR)
+        word_document += page
+    bte_fcs.append(marks[-1][0] + char_size)
+    return bte_fcs, bte_pages
+
+
+def _compound_file(streams):
+    """Version 3 compound file holding the streams in its root storage"""
+    sectors = []
+    fat = []
+
+    def allocate(data):
+        if not data:
+            return _END_OF_CHAIN
+        count = -(-len(data) // _SECTOR)
+        start = len(sectors)
+        for index in range(count):
+            sectors.append(data[index * _SECTOR:(index + 1) * _SECTOR].ljust(_SECTOR, b"\0"))
+            fat.append(start + index + 1 if index < count - 1 else _END_OF_CHAIN)
+        return start
+
+    mini_stream = b""
+    mini_fat = []
+    locations = {}
+    for name, data in streams.items():
+        if len(data) < _MINI_CUTOFF:
+            count = -(-len(data) // _MINI_SECTOR)
+            start = len(mini_stream) // _MINI_SECTOR
+            mini_fat += [start + index + 1 if index < count - 1 else _END_OF_CHAIN for index in range(count)]
+            mini_stream += data.ljust(count * _MINI_SECTOR, b"\0")
+            locations[name] = (start if count else _END_OF_CHAIN, len(data))
+        else:
+            locations[name] = (allocate(data), len(data))
+    root_start = allocate(mini_stream)
+    mini_fat_start = allocate(struct.pack(f"<{len(mini_fat)}I", *mini_fat)) if mini_fat else _END_OF_CHAIN
+
+    def entry(name, kind, right, child, start, size):
+        raw = name.encode("utf-16-le") + b"\0\0"
+        return (raw.ljust(64, b"\0") + struct.pack("<HBBIII", len(raw), kind, 1, _FREE_SECTOR, right, child)
+                + bytes(36) + struct.pack("<IQ", start, size))
+
+    # The streams as a chain of right siblings under the root
+    names = list(streams)
+    directory = entry("Root Entry", 5, _FREE_SECTOR, 1 if names else _FREE_SECTOR, root_start, len(mini_stream))
+    for index, name in enumerate(names):
+        right = index + 2 if index + 1 < len(names) else _FREE_SECTOR
+        directory += entry(name, 2, right, _FREE_SECTOR, *locations[name])
+    directory_start = allocate(directory)
+
+    fat_sectors = 1
+    while -(-(len(fat) + fat_sectors) * 4 // _SECTOR) > fat_sectors:
+        fat_sectors += 1
+    first_fat_sector = len(sectors)
+    fat += [_FAT_SECTOR] * fat_sectors
+    fat += [_FREE_SECTOR] * (fat_sectors * _SECTOR // 4 - len(fat))
+    fat_bytes = struct.pack(f"<{len(fat)}I", *fat)
+    sectors += [fat_bytes[index * _SECTOR:(index + 1) * _SECTOR] for index in range(fat_sectors)]
+    difat = [first_fat_sector + index for index in range(fat_sectors)] + [_FREE_SECTOR] * (109 - fat_sectors)
+
+    header = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + bytes(16)
+    header += struct.pack("<5H", 0x3E, 3, 0xFFFE, 9, 6) + bytes(6)
+    header += struct.pack("<9I", 0, fat_sectors, directory_start, 0, _MINI_CUTOFF, mini_fat_start,
+                          1 if mini_fat else 0, _END_OF_CHAIN, 0)
+    header += struct.pack("<109I", *difat)
+    return header + b"".join(sectors)
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from shift_calendar import DocumentCache, ShiftCalendarCore
+
+docx = pytest.importorskip("docx")
+
+
+def quiet(message, sensitive=False, level=None):
+    pass
+
+
+@pytest.fixture
+def schedule(tmp_path):
+    document = docx.Document()
+    table = document.add_table(rows=1, cols=2)
+    table.rows[0].cells[0].text = "01"
+    table.rows[0].cells[1].text = "ΠΑΠΑΔΟΠΟΥΛΟΣ"
+    path = tmp_path / "schedule.docx"
+    document.save(path)
+    return str(path)
+
+
+def rows_entries(cache):
+    return sorted(name for name in os.listdir(cache.directory) if name.endswith(".rows.jsonl"))
+
+
+def test_rows_are_cached_per_reader(tmp_path, schedule, monkeypatch):
+    cache = DocumentCache(str(tmp_path / "cache"))
+    fast = ShiftCalendarCore(log=quiet, cache=cache)
+    assert fast.read_docx_tables(schedule) == [[["01", "ΠΑΠΑΔΟΠΟΥΛΟΣ"]]]
+    assert len(rows_entries(cache)) == 1
+
+    # The same reader is served from the cache...
+    monkeypatch.setattr(fast, "_document_rows", lambda *args: pytest.fail("read the document again"))
+    assert fast.read_docx_tables(schedule) == [[["01", "ΠΑΠΑΔΟΠΟΥΛΟΣ"]]]
+
+    # ...but python-docx reads the document itself
+    read = []
+    slow = ShiftCalendarCore(log=quiet, cache=cache, fast_tables=False)
+    python_docx_rows = slow._python_docx_rows
+    monkeypatch.setattr(slow, "_python_docx_rows", lambda *args: read.append(args) or python_docx_rows(*args))
+    assert slow.read_docx_tables(schedule) == [[["01", "ΠΑΠΑΔΟΠΟΥΛΟΣ"]]]
+    assert read
+    assert len(rows_entries(cache)) == 2
+
+
+def test_doc_rows_are_cached_per_route(tmp_path, monkeypatch):
+    path = tmp_path / "schedule.doc"
+    path.write_bytes(b"not read here")
+    cache = DocumentCache(str(tmp_path / "cache"))
+    keys = set()
+    for direct_doc in (False, True):
+        core = ShiftCalendarCore(log=quiet, cache=cache, direct_doc=direct_doc)
+        monkeypatch.setattr(core, "can_convert_doc", lambda: True)
+        keys.add(cache.key_for(str(path), f"x/{core._reader_mode(str(path))}"))
+    assert len(keys) == 2
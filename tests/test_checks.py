@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+
+import pytest
+
+from shift_calendar import Shift
+from shift_calendar.checks import BACK_TO_BACK, DOUBLE_BOOKING, ON_CALL_ON_DUTY, TOO_MANY_IN_WEEK, check_roster
+
+pytest.importorskip("numpy")
+
+DAY = date(2025, 3, 3)
+
+
+def shift(shift_type, day=DAY, employee="ΠΑΠΑΔΟΠΟΥΛΟΣ"):
+    return Shift(employee, day, "ΔΕ", shift_type)
+
+
+def rules(violations):
+    return [(violation.rule, violation.date) for violation in violations]
+
+
+def test_first_and_second_table_shifts_on_one_day():
+    assert check_roster([shift("Regular Shift"), shift("Μεγάλη Shift (24h)")]) == []
+
+
+def test_two_second_table_shifts_on_one_day():
+    violations = check_roster([shift("Μεγάλη Shift (24h)"), shift("Μικρή Shift (24h)")])
+    assert rules(violations) == [(DOUBLE_BOOKING, DAY)]
+    assert violations[0].detail == "Μεγάλη Shift (24h) + Μικρή Shift (24h)"
+
+
+def test_two_first_table_shifts_on_one_day():
+    violations = check_roster([shift("Regular Shift"), shift("On-Call Shift")])
+    assert rules(violations) == [(DOUBLE_BOOKING, DAY)]
+
+
+def test_24h_shifts_on_consecutive_days():
+    shifts = [shift("Μεγάλη Shift (24h)"), shift("Regular Shift", DAY + timedelta(days=1)),
+              # A 12h TEP shift the next day is not a second 24h one
+              shift("TEP Shift (12h)", DAY + timedelta(days=2))]
+    violations = check_roster(shifts)
+    assert rules(violations) == [(BACK_TO_BACK, DAY)]
+    assert violations[0].detail == f"24h shifts on {DAY} and {DAY + timedelta(days=1)}"
+    # With a rest day between them
+    assert check_roster([shift("Μεγάλη Shift (24h)"), shift("Regular Shift", DAY + timedelta(days=2))]) == []
+
+
+def test_on_call_on_a_24h_shift_day():
+    cath_lab = [shift("Cath Lab On-Call"), shift("Cath Lab On-Call", DAY + timedelta(days=2))]
+    ep = [shift("Electrophysiology On-Call", DAY + timedelta(days=4))]
+    main = [shift("Μικρή Shift (24h)"), shift("TEP Shift (12h)", DAY + timedelta(days=4))]
+    violations = check_roster(main, cath_lab, ep)
+    # The on-calls of the 5th, with no shift, and the 7th, with a 12h one, are fine
+    assert rules(violations) == [(ON_CALL_ON_DUTY, DAY)]
+    assert violations[0].detail == "Μικρή Shift (24h) + Cath Lab On-Call"
+
+
+def test_week_counts_each_day_once():
+    # Two shifts every other day: 4 days on duty in a week, 8 shifts
+    shifts = [shift(shift_type, DAY + timedelta(days=offset))
+              for offset in range(0, 7, 2) for shift_type in ("TEP Shift (12h)", "On-Call Shift")]
+    assert check_roster(shifts, max_shifts_per_week=4) == []
+    assert rules(check_roster(shifts, max_shifts_per_week=3)) == [(TOO_MANY_IN_WEEK, DAY)]
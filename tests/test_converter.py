@@ -0,0 +1,153 @@
+import os
+import sys
+import threading
+import types
+
+import pytest
+
+from shift_calendar import converter as converter_module
+from shift_calendar.converter import LibreOfficeConverter
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="the fake soffice is a script run by its shebang")
+
+# Stands in for soffice: with --accept it listens like a headless instance,
+# with --convert-to it is a client that copies the .doc as the .docx. Each
+# client notes its profile in ACTIVE and waits until WAIT_FOR clients are
+# converting at once, so the copies only succeed if they run side by side.
+FAKE_SOFFICE = """#!{python}
+import os, socket, sys, time
+args = sys.argv[1:]
+profile = args[0].split("=", 1)[1]
+accept = [arg for arg in args if arg.startswith("--accept=")]
+if accept:
+    server = socket.socket()
+    server.bind(("127.0.0.1", int(accept[0].split("port=")[1].split(";")[0])))
+    server.listen()
+    while True:
+        server.accept()[0].close()
+active = os.environ["ACTIVE"]
+open(os.path.join(active, str(os.getpid())), "w").write(profile)
+deadline = time.monotonic() + 10
+while len(os.listdir(active)) < int(os.environ["WAIT_FOR"]) and time.monotonic() < deadline:
+    time.sleep(0.01)
+if len(os.listdir(active)) >= int(os.environ["WAIT_FOR"]):
+    out, source = args[args.index("--outdir") + 1], args[-1]
+    name = os.path.splitext(os.path.basename(source))[0] + ".docx"
+    with open(source, "rb") as f, open(os.path.join(out, name), "wb") as g:
+        g.write(f.read())
+"""
+
+
+@pytest.fixture
+def soffice(tmp_path, monkeypatch):
+    path = tmp_path / "soffice"
+    path.write_text(FAKE_SOFFICE.format(python=sys.executable))
+    path.chmod(0o755)
+    active = tmp_path / "active"
+    active.mkdir()
+    monkeypatch.setenv("ACTIVE", str(active))
+    # The soffice clients, even where LibreOffice's Python bridge is installed
+    monkeypatch.setattr(converter_module, "_uno_available", False)
+    return str(path), active
+
+
+def convert_all(converter, tmp_path, names):
+    results = {}
+
+    def convert(name):
+        doc_path = tmp_path / f"{name}.doc"
+        doc_path.write_bytes(name.encode())
+        converter.convert(str(doc_path), str(tmp_path / f"{name}.docx"))
+        results[name] = (tmp_path / f"{name}.docx").read_bytes()
+
+    threads = [threading.Thread(target=convert, args=(name,)) for name in names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_schedules_are_converted_side_by_side(tmp_path, monkeypatch, soffice):
+    executable, active = soffice
+    monkeypatch.setenv("WAIT_FOR", "3")
+    names = ["main", "cath", "ep"]
+    with LibreOfficeConverter(executable, timeout=30, instances=3) as converter:
+        assert convert_all(converter, tmp_path, names) == {name: name.encode() for name in names}
+        # One instance, with its own profile, per concurrent job
+        profiles = {(active / pid).read_text() for pid in os.listdir(active)}
+        assert len(profiles) == 3
+    assert not any(os.path.exists(profile[len("file://"):]) for profile in profiles)
+
+
+def test_idle_instances_are_reused(tmp_path, monkeypatch, soffice):
+    executable, active = soffice
+    monkeypatch.setenv("WAIT_FOR", "1")
+    with LibreOfficeConverter(executable, timeout=30, instances=3) as converter:
+        for name in ["main", "cath", "ep"]:
+            convert_all(converter, tmp_path, [name])
+        assert len(converter._workers) == 1
+        assert len({(active / pid).read_text() for pid in os.listdir(active)}) == 1
+
+
+class FakeDocument:
+    def __init__(self, source, calls):
+        self.source = source
+        self.calls = calls
+
+    def storeToURL(self, url, properties):
+        self.calls.append(("store", url, {p.Name: p.Value for p in properties}))
+        with open(self.source, "rb") as f, open(url[len("file://"):], "wb") as g:
+            g.write(f.read())
+
+    def close(self, deliver_ownership):
+        self.calls.append(("close",))
+
+
+@pytest.fixture
+def fake_uno(monkeypatch):
+    """LibreOffice's Python bridge, with a desktop that copies the files it loads"""
+    calls = []
+
+    class Desktop:
+        def loadComponentFromURL(self, url, frame, flags, properties):
+            calls.append(("load", url, {p.Name: p.Value for p in properties}))
+            return FakeDocument(url[len("file://"):], calls)
+
+    def service_manager(services):
+        return types.SimpleNamespace(createInstanceWithContext=lambda name, context: services[name]())
+
+    remote = types.SimpleNamespace(ServiceManager=service_manager({"com.sun.star.frame.Desktop": Desktop}))
+
+    def resolve(url):
+        calls.append(("resolve", url))
+        return remote
+
+    resolver = types.SimpleNamespace(resolve=resolve)
+    local = types.SimpleNamespace(
+        ServiceManager=service_manager({"com.sun.star.bridge.UnoUrlResolver": lambda: resolver}))
+    uno = types.SimpleNamespace(getComponentContext=lambda: local, systemPathToFileUrl=lambda path: f"file://{path}")
+    beans = types.SimpleNamespace(PropertyValue=lambda Name, Value: types.SimpleNamespace(Name=Name, Value=Value))
+    monkeypatch.setitem(sys.modules, "uno", uno)
+    monkeypatch.setitem(sys.modules, "com.sun.star.beans", beans)
+    for name in ["com", "com.sun", "com.sun.star"]:
+        monkeypatch.setitem(sys.modules, name, types.ModuleType(name))
+    monkeypatch.setattr(converter_module, "_uno_available", True)
+    return calls
+
+
+def test_conversions_are_driven_over_uno(tmp_path, monkeypatch, soffice, fake_uno):
+    executable, active = soffice
+    monkeypatch.setenv("WAIT_FOR", "1")
+    with LibreOfficeConverter(executable, timeout=30, instances=1) as converter:
+        for name in ["main", "cath"]:
+            assert convert_all(converter, tmp_path, [name]) == {name: name.encode()}
+        port = converter._workers[0][1]._port
+
+    # One connection to the instance's socket, no soffice client
+    assert not os.listdir(active)
+    assert [call for call in fake_uno if call[0] == "resolve"] == [
+        ("resolve", f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext")]
+    assert [call[0] for call in fake_uno if call[0] != "resolve"] == ["load", "store", "close"] * 2
+    assert fake_uno[2] == ("store", f"file://{tmp_path / 'main.docx'}",
+                           {"FilterName": "MS Word 2007 XML", "Overwrite": True})
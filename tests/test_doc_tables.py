@@ -0,0 +1,182 @@
+"""read_doc_tables against read_tables_fast on the same tables, without LibreOffice.
+
+Each table is built with python-docx, read back with read_tables_fast, and
+written as a .doc with the same cell layout (one grid column 1000 twips
+wide, gridSpan as wider cells, vMerge as vertically merged cells), which
+read_doc_tables must read to the same rows.
+"""
+import os
+
+import pytest
+
+from doc_writer import DEFAULT_WIDTH, cell, write_doc
+from shift_calendar import DocumentCache, ShiftCalendarCore, UnsupportedDocument, read_tables_fast
+from shift_calendar.doc_tables import read_doc_tables
+
+docx = pytest.importorskip("docx")
+from docx.table import _Cell  # noqa: E402
+
+
+def doc_rows(table):
+    """The rows of a python-docx table as doc_writer rows with the same layout"""
+    rows = []
+    for tr in table._tbl.tr_lst:
+        cells = []
+        for tc in tr.tc_lst:
+            # Paragraphs end with \r in a .doc, line breaks are \x0b
+            text = "\r".join(paragraph.text.replace("\n", "\x0b") for paragraph in _Cell(tc, table).paragraphs)
+            cells.append(cell(text, tc.grid_span * DEFAULT_WIDTH, "above" if tc.vMerge == "continue" else None))
+        rows.append((tr.grid_before * DEFAULT_WIDTH, cells))
+    return rows
+
+
+def assert_same_tables(tmp_path, document, compressed=False):
+    docx_path = tmp_path / "tables.docx"
+    doc_path = tmp_path / "tables.doc"
+    document.save(docx_path)
+    blocks = []
+    for table in document.tables:
+        blocks += [("p", "Title"), ("t", doc_rows(table))]
+    write_doc(doc_path, blocks, compressed=compressed)
+    expected = read_tables_fast(str(docx_path))
+    assert read_doc_tables(str(doc_path)) == expected
+    return expected
+
+
+def add_row(table, values):
+    cells = table.add_row().cells
+    for table_cell, value in zip(cells, values):
+        table_cell.text = value
+    return cells
+
+
+def test_schedule_table_with_title_row(tmp_path):
+    document = docx.Document()
+    table = document.add_table(rows=0, cols=4)
+    title = add_row(table, [""] * 4)
+    title[0].merge(title[-1]).text = "ΠΡΟΓΡΑΜΜΑ ΕΦΗΜΕΡΙΩΝ ΜΑΡΤΙΟΣ"
+    add_row(table, ["ΜΗΝΑΣ", "ΗΜΕΡΑ", "ΗΜ/ΝΙΑ", "ΙΑΤΡΟΣ"])
+    add_row(table, ["ΜΑΡΤΙΟΥ", "ΣΑ", "01", "ΠΑΠΑΔΟΠΟΥΛΟΣ\n*ΓΕΩΡΓΙΟΥ"])
+    add_row(table, ["", "ΚΥ", "*02**", "ΝΙΚΟΛΑΟΥ"])
+
+    tables = assert_same_tables(tmp_path, document)
+    assert tables[0][0] == ["ΠΡΟΓΡΑΜΜΑ ΕΦΗΜΕΡΙΩΝ ΜΑΡΤΙΟΣ"] * 4
+
+
+def test_rows_with_unaligned_cell_edges(tmp_path):
+    document = docx.Document()
+    table = document.add_table(rows=2, cols=4)
+    first, second = table.rows[0].cells, table.rows[1].cells
+    first[0].merge(first[1]).text = "a"
+    first[2].merge(first[3]).text = "b"
+    second[0].text = "x"
+    second[1].merge(second[2]).text = "y"
+    second[3].text = "z"
+
+    tables = assert_same_tables(tmp_path, document, compressed=True)
+    assert tables == [[["a", "a", "b", "b"], ["x", "y", "y", "z"]]]
+
+
+def test_vertically_merged_wide_cell(tmp_path):
+    document = docx.Document()
+    table = document.add_table(rows=3, cols=3)
+    rows = [row.cells for row in table.rows]
+    rows[0][0].merge(rows[1][1]).text = "wide"
+    rows[0][2].text = "c"
+    rows[1][2].text = "d"
+    for column, value in enumerate(["e", "f", "g"]):
+        rows[2][column].text = value
+
+    tables = assert_same_tables(tmp_path, document)
+    assert tables == [[["wide", "wide", "c"], ["wide", "wide", "d"], ["e", "f", "g"]]]
+
+
+def test_cells_merged_with_the_previous_one(tmp_path):
+    # Word 97 style merges: equal cells flagged as merged into the first
+    path = tmp_path / "merged.doc"
+    write_doc(path, [("t", [["title", cell(merge="previous"), cell(merge="previous")],
+                            ["a", "b", "c"]])])
+    assert read_doc_tables(str(path)) == [[["title"] * 3, ["a", "b", "c"]]]
+
+
+def test_row_starting_after_the_table_edge(tmp_path):
+    # Like w:gridBefore, the columns before the first cell have no cells
+    path = tmp_path / "indented.doc"
+    write_doc(path, [("t", [["a", "b", "c"], (DEFAULT_WIDTH, ["y", "z"])])])
+    assert read_doc_tables(str(path)) == [[["a", "b", "c"], ["y", "z"]]]
+
+
+def test_edges_too_close_together(tmp_path):
+    path = tmp_path / "close.doc"
+    write_doc(path, [("t", [["a", "b"], [cell("x", DEFAULT_WIDTH + 5), cell("y", DEFAULT_WIDTH - 5)]])])
+    with pytest.raises(UnsupportedDocument):
+        read_doc_tables(str(path))
+
+
+def test_vertical_merge_in_the_first_row(tmp_path):
+    path = tmp_path / "orphan.doc"
+    write_doc(path, [("t", [[cell("a", merge="above"), "b"]])])
+    with pytest.raises(UnsupportedDocument):
+        read_doc_tables(str(path))
+
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def test_document_saved_by_word():
+    # Word's own FIB, piece table and paragraph properties, with no tables in them
+    assert read_doc_tables(os.path.join(DATA, "word-saved-no-tables.doc")) == []
+
+
+def test_document_encrypted_by_word():
+    with pytest.raises(UnsupportedDocument, match="encrypted"):
+        read_doc_tables(os.path.join(DATA, "word-saved-encrypted.doc"))
+
+
+def quiet(message, sensitive=False, level=None):
+    pass
+
+
+@pytest.mark.parametrize("direct_doc, can_convert, converted", [
+    (False, True, True),
+    (False, False, False),
+    (True, True, False),
+])
+def test_doc_files_are_converted_first(tmp_path, monkeypatch, direct_doc, can_convert, converted):
+    document = docx.Document()
+    add_row(document.add_table(rows=0, cols=2), ["a", "b"])
+    docx_path = tmp_path / "converted.docx"
+    document.save(docx_path)
+    doc_path = tmp_path / "schedule.doc"
+    write_doc(doc_path, [("t", [["a", "b"]])])
+
+    calls = []
+    core = ShiftCalendarCore(log=quiet, direct_doc=direct_doc)
+    monkeypatch.setattr(core, "can_convert_doc", lambda: can_convert)
+    monkeypatch.setattr(core, "convert_doc_to_docx", lambda path: calls.append(path) or str(docx_path))
+    assert core.read_docx_tables(str(doc_path)) == [[["a", "b"]]]
+    assert bool(calls) == converted
+
+
+@pytest.mark.parametrize("with_cache", [False, True])
+def test_conversion_folder_is_removed(tmp_path, monkeypatch, with_cache):
+    doc_path = tmp_path / "schedule.doc"
+    write_doc(doc_path, [("t", [["a", "b"]])])
+    conversions = []
+
+    def convert(path):
+        # Like convert_doc_to_docx, a .docx in a folder of its own
+        directory = tmp_path / f"shiftcal-{len(conversions)}"
+        directory.mkdir()
+        document = docx.Document()
+        add_row(document.add_table(rows=0, cols=2), ["a", "b"])
+        document.save(directory / "schedule_converted.docx")
+        conversions.append(directory)
+        return str(directory / "schedule_converted.docx")
+
+    cache = DocumentCache(str(tmp_path / "cache")) if with_cache else None
+    core = ShiftCalendarCore(log=quiet, cache=cache)
+    monkeypatch.setattr(core, "can_convert_doc", lambda: True)
+    monkeypatch.setattr(core, "convert_doc_to_docx", convert)
+    assert core.read_docx_tables(str(doc_path)) == [[["a", "b"]]]
+    assert len(conversions) == 1 and not conversions[0].exists()
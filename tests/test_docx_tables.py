@@ -0,0 +1,161 @@
+"""read_tables_fast against python-docx's row.cells / cell.text on the same documents.
+
+Each document covers one structure: merged cells, hyperlinks, tabs and
+breaks, nested tables and content controls, rows starting after the grid's
+edge, empty tables. The fast reader must return exactly what python-docx
+does, or give up with UnsupportedDocument where python-docx cannot read the
+document either.
+"""
+import pytest
+
+from shift_calendar import UnsupportedDocument, read_tables_fast
+
+docx = pytest.importorskip("docx")
+from docx.enum.text import WD_BREAK  # noqa: E402
+from docx.oxml import OxmlElement, parse_xml  # noqa: E402
+from docx.oxml.ns import nsdecls  # noqa: E402
+
+
+def python_docx_tables(path):
+    """The cell text of every table as read_docx_tables read it with python-docx"""
+    document = docx.Document(path)
+    return [[[cell.text for cell in row.cells] for row in table.rows] for table in document.tables]
+
+
+def fill(table, prefix):
+    for row_index, row in enumerate(table.rows):
+        for column_index, cell in enumerate(row.cells):
+            cell.text = f"{prefix} {row_index}.{column_index}"
+
+
+def add_run_xml(paragraph, inner_xml):
+    paragraph._p.append(parse_xml(f"<w:r {nsdecls('w')}>{inner_xml}</w:r>"))
+
+
+def add_grid_before(row, count):
+    trPr = row._tr.get_or_add_trPr()
+    trPr.append(parse_xml(f'<w:gridBefore {nsdecls("w")} w:val="{count}"/>'))
+
+
+def doc_merges(document):
+    table = document.add_table(rows=6, cols=5)
+    fill(table, "merge")
+    table.cell(0, 0).merge(table.cell(0, 2))           # horizontal
+    table.cell(1, 0).merge(table.cell(4, 0))           # vertical
+    table.cell(1, 2).merge(table.cell(3, 4))           # both
+    table.cell(5, 1).merge(table.cell(5, 3))
+
+
+def doc_text_content(document):
+    table = document.add_table(rows=3, cols=3)
+    fill(table, "text")
+    cell = table.cell(0, 0)
+    cell.add_paragraph("second paragraph")
+    cell.add_paragraph("")
+    run = cell.paragraphs[0].add_run("tab\tand\nnewline")
+    run.add_break()
+    run.add_break(WD_BREAK.PAGE)
+    run.add_break(WD_BREAK.COLUMN)
+    run.add_text("after breaks")
+    add_run_xml(table.cell(0, 1).paragraphs[0],
+                '<w:t xml:space="preserve">  spaced  </w:t><w:noBreakHyphen/><w:ptab w:relativeTo="margin" '
+                'w:alignment="left" w:leader="none"/><w:cr/><w:t>&amp;&lt;&gt;</w:t><w:t/>')
+    add_run_xml(table.cell(0, 2).paragraphs[0], '<w:t xml:space="preserve"> </w:t>')
+    add_run_xml(table.cell(0, 2).paragraphs[0], '<w:t> </w:t><w:t>x</w:t>')
+    hyperlink = parse_xml(f'<w:hyperlink {nsdecls("w", "r")} r:id="rId99">'
+                          f'<w:r><w:t>link </w:t></w:r><w:r><w:t>text</w:t></w:r></w:hyperlink>')
+    table.cell(1, 0).paragraphs[0]._p.append(hyperlink)
+    # Text python-docx does not read: tracked insertions, smart tags, fields
+    # and deleted or field-code text
+    table.cell(1, 1).paragraphs[0]._p.append(
+        parse_xml(f'<w:ins {nsdecls("w")} w:id="1" w:author="a"><w:r><w:t>inserted</w:t></w:r></w:ins>'))
+    table.cell(1, 1).paragraphs[0]._p.append(
+        parse_xml(f'<w:smartTag {nsdecls("w")} w:uri="u" w:element="e"><w:r><w:t>tagged</w:t></w:r></w:smartTag>'))
+    table.cell(1, 1).paragraphs[0]._p.append(
+        parse_xml(f'<w:fldSimple {nsdecls("w")} w:instr="PAGE"><w:r><w:t>1</w:t></w:r></w:fldSimple>'))
+    add_run_xml(table.cell(1, 2).paragraphs[0], '<w:delText>deleted</w:delText><w:instrText>PAGE</w:instrText>')
+    table.cell(2, 0).paragraphs[0].add_run("Ελληνικά ΜΑΡΤΙΟΣ — ✓")
+
+
+def doc_nested_and_wrapped(document):
+    table = document.add_table(rows=2, cols=2)
+    fill(table, "outer")
+    nested = table.cell(0, 0).add_table(rows=2, cols=2)
+    fill(nested, "nested")
+    # A content control around a cell and one around a whole row
+    row_tr = table.rows[1]._tr
+    tc = row_tr.tc_lst[1]
+    sdt = parse_xml(f'<w:sdt {nsdecls("w")}><w:sdtContent/></w:sdt>')
+    tc.addprevious(sdt)
+    sdt[0].append(tc)
+    # Tables inside a body-level content control are not document.tables
+    body_sdt = parse_xml(f'<w:sdt {nsdecls("w")}><w:sdtContent/></w:sdt>')
+    hidden = document.add_table(rows=1, cols=1)
+    hidden.cell(0, 0).text = "inside sdt"
+    hidden._tbl.addprevious(body_sdt)
+    body_sdt[0].append(hidden._tbl)
+
+
+def doc_grid_before(document):
+    table = document.add_table(rows=4, cols=4)
+    fill(table, "grid")
+    table.cell(1, 1).merge(table.cell(3, 1))
+    # Drop the first cell of the last row and mark it as skipped grid
+    last = table.rows[3]
+    last._tr.remove(last._tr.tc_lst[0])
+    add_grid_before(last, 1)
+
+
+def doc_empty(document):
+    document.add_paragraph("no rows")
+    tbl = document.add_table(rows=1, cols=2)._tbl
+    tbl.remove(tbl.tr_lst[0])
+    table = document.add_table(rows=3, cols=2)
+    table.cell(1, 1).text = "   "
+
+
+def doc_many_tables(document):
+    names = [f"ΥΠΑΛΛΗΛΟΣ {index}" for index in range(12)]
+    for index in range(5):
+        document.add_paragraph(f"Table {index}")
+        table = document.add_table(rows=4, cols=3)
+        for row_index, row in enumerate(table.rows):
+            row.cells[0].text = f"{row_index + 1:02d}"
+            row.cells[1].text = ["ΔΕ", "ΤΡ", "ΤΕ", "ΠΕ", "ΠΑ", "ΣΑ", "ΚΥ"][row_index % 7]
+            row.cells[2].text = f"{names[row_index]}\n{names[row_index + index]}*"
+
+
+def doc_bad_vmerge(document):
+    # python-docx raises on a merge with nothing above it; the fast reader gives up
+    table = document.add_table(rows=2, cols=2)
+    fill(table, "bad")
+    tcPr = table.rows[0]._tr.tc_lst[0].get_or_add_tcPr()
+    tcPr.append(OxmlElement("w:vMerge"))
+
+
+def saved(tmp_path, build):
+    document = docx.Document()
+    build(document)
+    path = str(tmp_path / f"{build.__name__}.docx")
+    document.save(path)
+    return path
+
+
+@pytest.mark.parametrize("build", [doc_merges, doc_text_content, doc_nested_and_wrapped, doc_grid_before,
+                                   doc_empty, doc_many_tables])
+def test_same_tables_as_python_docx(tmp_path, build):
+    path = saved(tmp_path, build)
+    assert read_tables_fast(path) == python_docx_tables(path)
+
+
+def test_gives_up_on_a_merge_with_nothing_above(tmp_path):
+    path = saved(tmp_path, doc_bad_vmerge)
+    with pytest.raises(UnsupportedDocument):
+        read_tables_fast(path)
+
+
+def test_gives_up_on_a_file_that_is_not_a_docx(tmp_path):
+    path = tmp_path / "not_a_docx.docx"
+    path.write_text("plain text")
+    with pytest.raises(UnsupportedDocument):
+        read_tables_fast(str(path))
@@ -0,0 +1,65 @@
+from datetime import date
+
+import pytest
+
+from shift_calendar import ShiftCalendarCore
+from shift_calendar.history import ShiftHistory
+from shift_calendar.shifts import Shift
+
+docx = pytest.importorskip("docx")
+
+
+def quiet(message, sensitive=False, level=None):
+    pass
+
+
+def write_schedule(path, rows):
+    document = docx.Document()
+    table = document.add_table(rows=0, cols=4)
+    for values in rows:
+        for table_cell, value in zip(table.add_row().cells, values):
+            table_cell.text = value
+    document.save(path)
+
+
+def test_holidays_follow_the_current_version(tmp_path):
+    path = tmp_path / "schedule.docx"
+    path.write_bytes(b"first version")
+    history = ShiftHistory(str(tmp_path / "history.sqlite3"))
+    shifts = [Shift("ΠΑΠΑΔΟΠΟΥΛΟΣ", date(2025, 5, 1), "ΠΕ", "Regular")]
+    history.store([("main", str(path), 2025, 5, shifts, [date(2025, 5, 1), date(2025, 6, 1)])], "1")
+    assert history.holidays(date(2025, 5, 1), date(2025, 5, 31)) == {date(2025, 5, 1)}
+
+    path.write_bytes(b"second version")
+    history.store([("main", str(path), 2025, 5, shifts, [date(2025, 5, 2)])], "1")
+    assert history.holidays(date(2025, 1, 1), date(2025, 12, 31)) == {date(2025, 5, 2)}
+
+
+def test_unchanged_document_gets_its_holidays(tmp_path):
+    # As for a document stored before holidays were
+    path = tmp_path / "schedule.docx"
+    path.write_bytes(b"schedule")
+    history = ShiftHistory(str(tmp_path / "history.sqlite3"))
+    shifts = [Shift("ΠΑΠΑΔΟΠΟΥΛΟΣ", date(2025, 5, 1), "ΠΕ", "Regular")]
+    history.store([("main", str(path), 2025, 5, shifts, [])], "1")
+    assert history.store([("main", str(path), 2025, 5, shifts, [date(2025, 5, 1)])], "1") == 0
+    assert history.holidays(date(2025, 5, 1), date(2025, 5, 31)) == {date(2025, 5, 1)}
+    assert len(history.documents()) == 1
+
+
+def test_process_history_loads_the_holidays(tmp_path):
+    schedule = tmp_path / "ΕΦΗΜΕΡΙΕΣ ΜΑΪΟΣ 2025.docx"
+    write_schedule(schedule, [
+        ["ΗΜ/ΝΙΑ", "ΜΗΝΑΣ", "ΗΜΕΡΑ", "ΙΑΤΡΟΣ"],
+        ["*01**", "ΜΑΪΟΥ", "ΠΕ", "ΠΑΠΑΔΟΠΟΥΛΟΣ"],
+        ["02", "", "ΠΑ", "ΝΙΚΟΛΑΟΥ"],
+    ])
+    history = ShiftHistory(str(tmp_path / "history.sqlite3"))
+    core = ShiftCalendarCore(log=quiet, history=history)
+    assert core.process_files(str(schedule), 5, 2025)
+    assert core.holidays == {date(2025, 5, 1)}
+
+    loaded = ShiftCalendarCore(log=quiet, history=history)
+    assert loaded.process_history(date(2025, 5, 1), date(2025, 5, 31))
+    assert loaded.all_shifts == core.all_shifts
+    assert loaded.holidays == {date(2025, 5, 1)}
@@ -0,0 +1,62 @@
+import os
+from datetime import date
+
+from shift_calendar import Shift, ShiftCalendarCore
+from shift_calendar.roster import RosterIndex
+
+
+def generate(core, output_dir, messages):
+    messages.clear()
+    core.generate_calendars(core.all_employees, str(output_dir), incremental=True)
+    return [message for message in messages if message.startswith("Completed!")]
+
+
+def test_completion_counts_written_and_unchanged(tmp_path):
+    messages = []
+    core = ShiftCalendarCore(log=lambda message, sensitive=False, level=None: messages.append(message))
+    core.all_shifts = [Shift("ΑΛΦΑ", date(2025, 3, 3), "ΔΕ", "Regular Shift"),
+                       Shift("ΒΗΤΑ", date(2025, 3, 4), "ΤΡ", "On-Call Shift")]
+    core.all_employees = ["ΑΛΦΑ", "ΒΗΤΑ"]
+    core.roster = RosterIndex(core.all_shifts)
+
+    assert generate(core, tmp_path, messages) == [
+        "Completed! Generated 2 calendars (2 new, 0 updated) in the selected output directory, 0 unchanged"]
+    assert generate(core, tmp_path, messages) == [
+        "Completed! Generated 0 calendars (0 new, 0 updated) in the selected output directory, 2 unchanged"]
+
+    core.all_shifts.append(Shift("ΑΛΦΑ", date(2025, 3, 5), "ΤΕ", "Regular Shift"))
+    core.roster = RosterIndex(core.all_shifts)
+    assert generate(core, tmp_path, messages) == [
+        "Completed! Generated 1 calendars (0 new, 1 updated) in the selected output directory, 1 unchanged"]
+
+
+def sequence_of(path):
+    """SEQUENCE of a one-event calendar, 0 when the line is left out"""
+    lines = [line for line in path.read_text(encoding="utf-8").splitlines() if line.startswith("SEQUENCE:")]
+    return int(lines[0].split(":")[1]) if lines else 0
+
+
+def test_only_changed_calendars_are_rewritten(tmp_path):
+    messages = []
+    core = ShiftCalendarCore(log=lambda message, sensitive=False, level=None: messages.append(message))
+    core.all_shifts = [Shift("ΑΛΦΑ", date(2025, 3, 3), "ΔΕ", "Regular Shift"),
+                       Shift("ΒΗΤΑ", date(2025, 3, 4), "ΤΡ", "On-Call Shift")]
+    core.all_employees = ["ΑΛΦΑ", "ΒΗΤΑ"]
+    core.roster = RosterIndex(core.all_shifts)
+    generate(core, tmp_path, messages)
+
+    alpha, beta = tmp_path / "ΑΛΦΑ_shifts.ics", tmp_path / "ΒΗΤΑ_shifts.ics"
+    # An old mtime, so an unwanted rewrite cannot go unnoticed within the clock's resolution
+    os.utime(beta, ns=(10 ** 9, 10 ** 9))
+    beta_bytes = beta.read_bytes()
+    assert sequence_of(alpha) == 0
+
+    # ΑΛΦΑ's shift of the 3rd becomes an on-call: same event, new revision
+    core.all_shifts[0] = Shift("ΑΛΦΑ", date(2025, 3, 3), "ΔΕ", "On-Call Shift")
+    core.roster = RosterIndex(core.all_shifts)
+    assert generate(core, tmp_path, messages) == [
+        "Completed! Generated 1 calendars (0 new, 1 updated) in the selected output directory, 1 unchanged"]
+    assert "On-Call Shift" in alpha.read_text(encoding="utf-8")
+    assert sequence_of(alpha) == 1
+    assert beta.read_bytes() == beta_bytes
+    assert beta.stat().st_mtime_ns == 10 ** 9
@@ -0,0 +1,53 @@
+import errno
+import os
+
+import pytest
+
+from shift_calendar.output import AtomicFiles
+
+
+def write(files, file_name, content):
+    with open(files.path_for(file_name), 'wb') as f:
+        f.write(content)
+
+
+def test_commit_replaces_the_files_together(tmp_path):
+    (tmp_path / "a.ics").write_bytes(b"old a")
+    (tmp_path / "b.ics").write_bytes(b"old b")
+    files = AtomicFiles(str(tmp_path))
+    write(files, "a.ics", b"new a")
+    write(files, "c.ics", b"new c")
+    files.path_for("unwritten.ics")
+
+    assert (tmp_path / "a.ics").read_bytes() == b"old a"
+    assert files.commit() == 2
+    assert sorted(os.listdir(tmp_path)) == ["a.ics", "b.ics", "c.ics"]
+    assert (tmp_path / "a.ics").read_bytes() == b"new a"
+    assert (tmp_path / "b.ics").read_bytes() == b"old b"
+    assert (tmp_path / "c.ics").read_bytes() == b"new c"
+
+
+def test_commit_syncs_files_opened_for_writing(tmp_path, monkeypatch):
+    fcntl = pytest.importorskip("fcntl")
+    fsync = os.fsync
+
+    def windows_fsync(fd):
+        # Like Windows, refuse to sync anything opened read-only
+        if fcntl.fcntl(fd, fcntl.F_GETFL) & os.O_ACCMODE == os.O_RDONLY:
+            raise OSError(errno.EBADF, "Bad file descriptor")
+        fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", windows_fsync)
+    files = AtomicFiles(str(tmp_path))
+    write(files, "a.ics", b"calendar")
+    assert files.commit() == 1
+    assert (tmp_path / "a.ics").read_bytes() == b"calendar"
+
+
+def test_abort_keeps_the_previous_files(tmp_path):
+    (tmp_path / "a.ics").write_bytes(b"old")
+    files = AtomicFiles(str(tmp_path))
+    write(files, "a.ics", b"new")
+    files.abort()
+    assert os.listdir(tmp_path) == ["a.ics"]
+    assert (tmp_path / "a.ics").read_bytes() == b"old"
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from shift_calendar import profiling
+from shift_calendar.profiling import StageProfiler, profile_items
+
+
+class Clock:
+    """Stands in for the time module: both clocks only move when told to"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def perf_counter(self):
+        return self.now
+
+    def process_time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(profiling, "time", clock)
+    return clock
+
+
+def slow(items, clock, seconds):
+    for item in items:
+        clock.advance(seconds)
+        yield item
+
+
+def test_stream_stages_are_timed_apart(clock):
+    profiler = StageProfiler(trace_memory=False)
+    rows = profile_items(profiler, "extract tables", slow(range(5), clock, 0.02), "schedule.docx")
+    shifts = profile_items(profiler, "parse", slow(rows, clock, 0.01), "schedule.docx", exclusive=True)
+    for _ in shifts:
+        clock.advance(0.01)
+
+    extract = profiler.stages["extract tables", "schedule.docx"]
+    parse = profiler.stages["parse", "schedule.docx"]
+    assert extract['calls'] == parse['calls'] == 1
+    # Each leaves out the time of the consumer, parse that of the rows too
+    assert extract['wall'] == pytest.approx(0.1)
+    assert parse['wall'] == pytest.approx(0.05)
+    assert parse['cpu'] == pytest.approx(0.05)
+
+
+def test_nested_stages(clock):
+    profiler = StageProfiler(trace_memory=False)
+    with profiler.stage("read schedules"):
+        clock.advance(1)
+        with profiler.stage("parse", "schedule.docx"):
+            clock.advance(2)
+    assert profiler.stages["read schedules", None]['wall'] == pytest.approx(3)
+    assert profiler.stages["parse", "schedule.docx"]['wall'] == pytest.approx(2)
+
+
+def test_without_profiler():
+    items = [1, 2]
+    assert profile_items(None, "parse", items) is items
+
+
+def test_peaks_of_concurrent_stages_are_shared():
+    profiler = StageProfiler()
+    try:
+        with profiler.stage("alone"):
+            pass
+        both_open = threading.Barrier(2)
+
+        def read(source):
+            with profiler.stage("read", source):
+                both_open.wait(timeout=10)
+
+        threads = [threading.Thread(target=read, args=(source,)) for source in ("main.docx", "cath.docx")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        profiler.close()
+
+    shared = {(stage['stage'], stage['source']): stage['peak_shared'] for stage in profiler.report()['stages']}
+    assert shared == {("alone", None): False, ("read", "main.docx"): True, ("read", "cath.docx"): True}
+    assert profiler.summary_lines()[1].endswith("(shared with concurrent stages)")
@@ -0,0 +1,126 @@
+import logging
+import os
+import threading
+
+import pytest
+
+from shift_calendar.watch import FolderWatcher
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def settled_watcher(directory, state_path, messages):
+    """A watcher past the settle time of the files already in directory"""
+    clock = Clock()
+    watcher = FolderWatcher(str(directory), str(state_path), lambda message, level=logging.INFO:
+                            messages.append((level, message)), settle=2, clock=clock)
+    watcher.poll()
+    clock.now = 3
+    return watcher
+
+
+def run_once(watcher, process):
+    """Run the watcher for one poll"""
+    stop = threading.Event()
+
+    def process_and_stop(job):
+        stop.set()
+        process(job)
+
+    watcher.run(process_and_stop, interval=0, stop=stop)
+
+
+@pytest.fixture
+def folder(tmp_path):
+    directory = tmp_path / "in"
+    directory.mkdir()
+    (directory / "ΕΦΗΜΕΡΙΕΣ ΜΑΡΤΙΟΣ 2025.docx").write_bytes(b"main schedule")
+    return directory
+
+
+def test_interrupted_job_stays_pending(folder, tmp_path):
+    state_path = tmp_path / "state.json"
+    messages = []
+
+    def interrupt(job):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        run_once(settled_watcher(folder, state_path, messages), interrupt)
+
+    jobs = settled_watcher(folder, state_path, messages).poll()
+    assert [(job['month'], job['year']) for job in jobs] == [(3, 2025)]
+
+
+def test_failed_job_is_logged_and_marked(folder, tmp_path):
+    state_path = tmp_path / "state.json"
+    messages = []
+
+    def fail(job):
+        raise ValueError("unreadable")
+
+    run_once(settled_watcher(folder, state_path, messages), fail)
+
+    assert any(level == logging.ERROR and "unreadable" in message for level, message in messages)
+    assert settled_watcher(folder, state_path, messages).poll() == []
+
+
+def rewrite(path, content, mtime):
+    path.write_bytes(content)
+    os.utime(path, ns=(mtime * 10 ** 9, mtime * 10 ** 9))
+
+
+def test_file_still_changing_is_not_taken(folder, tmp_path):
+    clock = Clock()
+    watcher = FolderWatcher(str(folder), str(tmp_path / "state.json"), lambda message, level=logging.INFO: None,
+                            settle=2, clock=clock)
+    assert watcher.poll() == []
+
+    # Still being copied a second later: the settle time starts again
+    clock.now = 1
+    rewrite(folder / "ΕΦΗΜΕΡΙΕΣ ΜΑΡΤΙΟΣ 2025.docx", b"main schedule, copied", 1000)
+    assert watcher.poll() == []
+    clock.now = 2.5
+    assert watcher.poll() == []
+    clock.now = 3.5
+    jobs = watcher.poll()
+    assert [(job['month'], job['year']) for job in jobs] == [(3, 2025)]
+
+
+def test_unchanged_version_is_handed_over_once(folder, tmp_path):
+    state_path = tmp_path / "state.json"
+    messages = []
+    watcher = settled_watcher(folder, state_path, messages)
+    jobs = watcher.poll()
+    assert len(jobs) == 1
+    watcher.mark_processed(jobs[0])
+    assert watcher.poll() == []
+
+    # Nor after a restart, once the state file is read back
+    assert settled_watcher(folder, state_path, messages).poll() == []
+    # Touching the file without changing its content hands nothing over either
+    rewrite(folder / "ΕΦΗΜΕΡΙΕΣ ΜΑΡΤΙΟΣ 2025.docx", b"main schedule", 2000)
+    assert settled_watcher(folder, state_path, messages).poll() == []
+
+
+@pytest.mark.parametrize("name, kind", [("CATH ΜΑΡΤΙΟΣ 2025.docx", 'cath_lab'), ("EP ΜΑΡΤΙΟΣ 2025.docx", 'ep')])
+def test_changed_on_call_schedule_requeues_its_month(folder, tmp_path, name, kind):
+    state_path = tmp_path / "state.json"
+    messages = []
+    rewrite(folder / name, b"on-call schedule", 1000)
+    watcher = settled_watcher(folder, state_path, messages)
+    jobs = watcher.poll()
+    assert jobs[0][kind] == str(folder / name)
+    watcher.mark_processed(jobs[0])
+
+    rewrite(folder / name, b"on-call schedule, corrected", 2000)
+    jobs = settled_watcher(folder, state_path, messages).poll()
+    assert [(job['month'], job['year'], job[kind]) for job in jobs] == [(3, 2025, str(folder / name))]
+    assert jobs[0]['versions']['main'] == watcher.processed["2025-03"]['main']
+    assert jobs[0]['versions'][kind] != watcher.processed["2025-03"][kind]
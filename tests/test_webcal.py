@@ -0,0 +1,93 @@
+import argparse
+import http.client
+import os
+import re
+import socket
+import threading
+import time
+from urllib.parse import quote
+
+import pytest
+
+from shift_calendar import ShiftCalendarCore, cli
+from shift_calendar.webcal import CalendarFeeds, CalendarRequestHandler, CalendarServer
+
+docx = pytest.importorskip("docx")
+
+
+def write_schedule(path, employee):
+    document = docx.Document()
+    table = document.add_table(rows=0, cols=4)
+    for values in (["01", "ΜΑΡΤΙΟΥ", "ΣΑ", employee], ["02", "", "ΚΥ", employee]):
+        for table_cell, value in zip(table.add_row().cells, values):
+            table_cell.text = value
+    document.save(path)
+
+
+def status_of(port, name):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        connection.request("GET", f"/calendars/{quote(name)}.ics")
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def test_served_schedules_are_processed_again_when_changed(tmp_path, monkeypatch):
+    schedule = tmp_path / "ΕΦΗΜΕΡΙΕΣ ΜΑΡΤΙΟΣ 2025.docx"
+    write_schedule(schedule, "ΠΑΠΑΔΟΠΟΥΛΟΣ")
+    messages = []
+    core = ShiftCalendarCore(log=lambda message, sensitive=False, level=None: messages.append(message))
+    args = argparse.Namespace(serve=0, host="127.0.0.1", employee=None, watch_interval=0.05, check=False,
+                              workload=False)
+
+    # Ctrl+C once the test is done
+    stop = threading.Event()
+    sleep = time.sleep
+
+    def interruptible_sleep(seconds):
+        if stop.is_set():
+            raise KeyboardInterrupt
+        sleep(seconds)
+
+    monkeypatch.setattr(cli.time, "sleep", interruptible_sleep)
+    server = threading.Thread(target=cli.run_job, args=(core, args, str(schedule), 3, 2025, None, None,
+                                                       str(tmp_path)))
+    server.start()
+    try:
+        wait_for(lambda: any(message.startswith("Serving") for message in messages))
+        port = int(re.search(r":(\d+)/", messages[-1]).group(1))
+        assert status_of(port, "ΠΑΠΑΔΟΠΟΥΛΟΣ") == 200
+
+        write_schedule(schedule, "ΝΙΚΟΛΑΟΥ")
+        os.utime(schedule, ns=(0, 10 ** 9))
+        wait_for(lambda: "Serving the updated calendars of 1 employees" in messages)
+        assert status_of(port, "ΝΙΚΟΛΑΟΥ") == 200
+        assert status_of(port, "ΠΑΠΑΔΟΠΟΥΛΟΣ") == 404
+    finally:
+        stop.set()
+        server.join()
+
+
+def test_stalled_clients_are_dropped(monkeypatch):
+    monkeypatch.setattr(CalendarRequestHandler, "timeout", 0.2)
+    server = CalendarServer(("127.0.0.1", 0), CalendarFeeds(), workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with socket.create_connection(server.server_address, timeout=10) as stalled:
+            stalled.sendall(b"GET /calendars/")
+            # The only worker gives up on the stalled request and closes it
+            assert stalled.recv(1) == b""
+    finally:
+        server.shutdown()
+        server.server_close()